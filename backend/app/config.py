@@ -1,6 +1,15 @@
 import os
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
+
+class EncodeProfile(BaseModel):
+    """Video encoder settings for burned-in exports"""
+    video_codec: str = "libx264"
+    preset: str = "medium"
+    crf: int = 23
+    height: Optional[int] = None    # Scale to this height, keeping the aspect ratio
+    threads: Optional[int] = None   # Encoder threads, None lets FFmpeg decide
 
 class Settings(BaseSettings):
     # API Settings
@@ -17,6 +26,83 @@ class Settings(BaseSettings):
     outputs_dir: str = "outputs"
     data_dir: str = "data"
     
+    # Resumable uploads
+    upload_write_buffer_bytes: int = 1024 * 1024
+    upload_expiry_hours: int = 24
+    
+    # Transcription prefetch
+    transcription_prefetch_enabled: bool = False
+    transcription_prefetch_workers: int = 1
+    transcription_prefetch_max_pending: int = 4
+    
+    # Editor proxies
+    proxy_enabled: bool = True
+    proxy_height: int = 480
+    proxy_keyframe_seconds: float = 1.0
+    proxy_workers: int = 1
+    
+    # Preview frames
+    preview_cache_entries: int = 256
+    
+    # Subtitle interval indexes, cached per edit
+    subtitle_index_cache_entries: int = 64
+    
+    # Waveform peaks: 10 ms per peak at the finest level, each level 4x coarser
+    waveform_sample_rate: int = 16000
+    waveform_samples_per_peak: int = 160
+    waveform_levels: int = 4
+    waveform_level_factor: int = 4
+    waveform_chunk_seconds: float = 10.0
+    waveform_workers: int = 1
+    
+    # Scene cuts: consecutive frames, scaled down to grayscale, whose mean
+    # absolute difference (0-1) passes the threshold
+    scene_width: int = 64
+    scene_height: int = 36
+    scene_threshold: float = 0.12
+    scene_min_seconds: float = 0.5
+    scene_chunk_frames: int = 256
+    scene_workers: int = 1
+    scene_snap_tolerance: float = 0.25
+    
+    # Export jobs
+    export_max_workers: int = 2
+    export_max_pending_jobs: int = 16
+    export_job_history: int = 200
+    
+    # Segment-parallel export
+    export_parallel_workers: int = os.cpu_count() or 1
+    export_segment_min_seconds: float = 10.0
+    export_segment_max_seconds: float = 60.0
+    # Keep each session's segments so a re-export only re-encodes those
+    # whose subtitles changed, parallel or not
+    export_segments_reuse: bool = True
+    export_segments_max_bytes: int = 20 * 1024 ** 3
+    
+    # Encode profiles
+    encode_profiles: Dict[str, EncodeProfile] = {
+        "draft": EncodeProfile(preset="ultrafast", crf=30, height=360),
+        "standard": EncodeProfile(preset="medium", crf=23),
+        "archive": EncodeProfile(preset="slow", crf=18)
+    }
+    default_encode_profile: str = "standard"
+    
+    # HLS exports
+    export_hls_segment_seconds: float = 4.0
+    
+    # Export cache
+    export_cache_enabled: bool = True
+    export_cache_max_bytes: int = 20 * 1024 ** 3
+    
+    # Response compression
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Media serving: internal nginx location for X-Accel-Redirect, e.g.
+    # "/internal", with the uploads and outputs directories below it
+    media_accel_redirect: Optional[str] = None
+    
     # CORS
     cors_origins: list = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -1,5 +1,7 @@
 from .video_controller import router as video_router
 from .chat_controller import router as chat_router
 from .export_controller import router as export_router
+from .subtitle_controller import router as subtitle_router
+from .search_controller import router as search_router
 
-__all__ = ["video_router", "chat_router", "export_router"]
\ No newline at end of file
+__all__ = ["video_router", "chat_router", "export_router", "subtitle_router", "search_router"]
\ No newline at end of file
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 from app.repositories import storage_repo
-from app.services import get_llm_service
-from app.models import SubtitleSegment, StyleConfig
+from app.services import get_llm_service, media_service
+from app.models import SubtitleSegment, StyleConfig, Edit
+from app.responses import JSONResponse
 
 router = APIRouter()
 
@@ -18,6 +19,7 @@ class ChatMessageResponse(BaseModel):
     response: str
     subtitles: List[SubtitleSegment]
     style: StyleConfig
+    preview_url: Optional[str] = Field(default=None, description="Styled frame of the edit at its first subtitle")
 
 @router.post("/message", response_model=ChatMessageResponse)
 async def process_chat_message(request: ChatMessageRequest):
@@ -38,12 +40,13 @@ async def process_chat_message(request: ChatMessageRequest):
     
     try:
         # Get previous edits for context
-        previous_edits = storage_repo.get_edits_by_session(request.session_id)
+        previous_edits = storage_repo.get_edit_records(request.session_id)
         
+        # Stored records are already plain dicts, so no model round trip
         previous_edits_data = [
             {
-                "subtitles": [s.model_dump() for s in edit.subtitle_data],
-                "style": edit.style_config.model_dump()
+                "subtitles": edit["subtitle_data"],
+                "style": edit["style_config"]
             }
             for edit in previous_edits
         ]
@@ -56,19 +59,26 @@ async def process_chat_message(request: ChatMessageRequest):
             previous_edits=previous_edits_data
         )
         
+        # Keep subtitles within the video
+        media_info = media_service.find_media_info(session)
+        if media_info:
+            result["subtitles"] = media_service.clamp_subtitles(result["subtitles"], media_info.duration)
+        
         # Save edit to storage
-        storage_repo.create_edit(
+        edit = storage_repo.create_edit(
             session_id=request.session_id,
             user_message=request.message,
             subtitle_data=result["subtitles"],
             style_config=result["style"]
         )
         
-        return ChatMessageResponse(
-            response=result["response"],
-            subtitles=result["subtitles"],
-            style=result["style"]
-        )
+        # Returned directly so segments skip FastAPI's re-encoding
+        return JSONResponse({
+            "response": result["response"],
+            "subtitles": result["subtitles"],
+            "style": result["style"],
+            "preview_url": _preview_url(edit)
+        })
         
     except Exception as e:
         import traceback
@@ -96,22 +106,22 @@ async def get_chat_history(session_id: int):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    edits = storage_repo.get_edits_by_session(session_id)
+    edits = storage_repo.get_edit_records(session_id)
     
-    return {
+    return JSONResponse({
         "session_id": session_id,
         "total_edits": len(edits),
         "edits": [
             {
-                "id": edit.id,
-                "user_message": edit.user_message,
-                "subtitle_data": edit.subtitle_data,
-                "style_config": edit.style_config,
-                "created_at": edit.created_at
+                "id": edit["id"],
+                "user_message": edit["user_message"],
+                "subtitle_data": edit["subtitle_data"],
+                "style_config": edit["style_config"],
+                "created_at": edit["created_at"]
             }
             for edit in edits
         ]
-    }
+    })
 
 
 @router.get("/{session_id}/latest", response_model=dict)
@@ -130,16 +140,24 @@ async def get_latest_edit(session_id: int):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    edit = storage_repo.get_latest_edit(session_id)
+    edit = storage_repo.get_latest_edit_record(session_id)
     
     if not edit:
         raise HTTPException(status_code=404, detail="No edits found for this session")
     
-    return {
-        "id": edit.id,
-        "session_id": edit.session_id,
-        "user_message": edit.user_message,
-        "subtitle_data": edit.subtitle_data,
-        "style_config": edit.style_config,
-        "created_at": edit.created_at
-    }
\ No newline at end of file
+    return JSONResponse({
+        "id": edit["id"],
+        "session_id": edit["session_id"],
+        "user_message": edit["user_message"],
+        "subtitle_data": edit["subtitle_data"],
+        "style_config": edit["style_config"],
+        "created_at": edit["created_at"]
+    })
+
+
+def _preview_url(edit: Edit) -> Optional[str]:
+    """Preview frame URL showing the edit's first subtitle"""
+    if not edit.subtitle_data:
+        return None
+    first = min(edit.subtitle_data, key=lambda sub: sub.start)
+    return f"/api/video/{edit.session_id}/preview?t={first.start:.3f}&edit_id={edit.id}"
\ No newline at end of file
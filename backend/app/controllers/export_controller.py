@@ -1,29 +1,31 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-import uuid
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+import json
 import os
 
-from app.repositories import storage_repo
-from app.services import video_service
 from app.config import settings
+from app.repositories import storage_repo
+from app.services import export_service, progress_broker, ExportQueueFullError
+from app.models import ExportJob, ExportOptions
 
 router = APIRouter()
 
-class ExportResponse(BaseModel):
-    """Response model for export"""
-    message: str
-    download_url: str
-
-@router.post("/{session_id}/export", response_model=ExportResponse)
-async def export_video(session_id: int):
+@router.post("/{session_id}/export", response_model=ExportJob, status_code=202)
+async def export_video(session_id: int, options: Optional[ExportOptions] = None):
     """
-    Export video with burned subtitles
+    Queue an export of the video with its subtitles burned in or muxed
+    
+    A newer export of the same session supersedes any export still
+    queued or running for it.
     
     Args:
         session_id: Session ID to export
-        
+        options: Export settings, e.g. soft subtitles, renditions or parallel
+            segment encoding
+    
     Returns:
-        Download URL for the exported video
+        The queued export job; poll it for progress and the download URL
     """
     # Validate session
     session = storage_repo.get_session_by_id(session_id)
@@ -35,55 +37,125 @@ async def export_video(session_id: int):
     
     if not latest_edit:
         raise HTTPException(
-            status_code=400, 
+            status_code=400,
             detail="No edits found. Please add subtitles first."
         )
     
+    if options:
+        profiles = [options.profile] + [rendition.profile for rendition in options.renditions]
+        unknown = [name for name in profiles if name and name not in settings.encode_profiles]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown encode profile '{unknown[0]}'. Available: {', '.join(settings.encode_profiles)}"
+            )
+    
     # Validate video file exists
     if not os.path.exists(session.video_path):
         raise HTTPException(status_code=404, detail="Video file not found")
     
     try:
-        # Generate output filename
-        output_filename = f"{uuid.uuid4()}.mp4"
-        output_path = os.path.join(settings.outputs_dir, output_filename)
-        
-        # Ensure outputs directory exists
-        os.makedirs(settings.outputs_dir, exist_ok=True)
-        
-        # Process video with FFmpeg
-        video_service.overlay_subtitles(
-            video_path=session.video_path,
-            subtitles=latest_edit.subtitle_data,
-            style=latest_edit.style_config,
-            output_path=output_path
-        )
-        
-        return ExportResponse(
-            message="Video exported successfully",
-            download_url=f"/{settings.outputs_dir}/{output_filename}"
-        )
+        return export_service.submit(session, latest_edit, options)
+    except ExportQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJob)
+async def get_export_job(job_id: str):
+    """
+    Get an export job's status and progress
+    
+    Args:
+        job_id: Export job ID
+    
+    Returns:
+        Export job details
+    """
+    job = export_service.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_export_job_events(job_id: str, request: Request):
+    """
+    Stream an export job's progress as Server-Sent Events
+    
+    The stream ends once the job is done, failed or cancelled.
+    
+    Args:
+        job_id: Export job ID
         
-    except Exception as e:
-        # Clean up output file if it exists
-        output_path = os.path.join(settings.outputs_dir, output_filename)
-        if os.path.exists(output_path):
-            os.remove(output_path)
+    Returns:
+        text/event-stream of job snapshots
+    """
+    job = export_service.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return _event_stream(request, f"export:{job_id}", job)
+
+
+@router.delete("/jobs/{job_id}", response_model=ExportJob)
+async def cancel_export_job(job_id: str):
+    """
+    Cancel a queued or running export job
+    
+    Args:
+        job_id: Export job ID
+    
+    Returns:
+        Export job details after cancellation
+    """
+    job = export_service.cancel(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return job
+
+
+@router.get("/metrics", response_model=dict)
+async def get_export_metrics():
+    """
+    Get export outcome counts and encode speed statistics
+    
+    Returns:
+        Export metrics, with encode speed in multiples of realtime
+    """
+    return export_service.get_metrics()
+
+
+@router.get("/{session_id}/events")
+async def stream_session_export_events(session_id: int, request: Request):
+    """
+    Stream progress of all exports of a session as Server-Sent Events
+    
+    Args:
+        session_id: Session ID
         
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Video processing failed: {str(e)}"
-        )
+    Returns:
+        text/event-stream of job snapshots
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return _event_stream(request, f"session:{session_id}")
 
 
 @router.get("/{session_id}/status", response_model=dict)
 async def get_export_status(session_id: int):
     """
-    Check if a session is ready for export
+    Check if a session is ready for export and report its latest export
     
     Args:
         session_id: Session ID
-        
+    
     Returns:
         Export status information
     """
@@ -91,11 +163,45 @@ async def get_export_status(session_id: int):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    latest_edit = storage_repo.get_latest_edit(session_id)
+    latest_edit = storage_repo.get_latest_edit_record(session_id)
     
     return {
         "session_id": session_id,
         "ready_for_export": latest_edit is not None,
-        "has_subtitles": latest_edit is not None and len(latest_edit.subtitle_data) > 0,
-        "subtitle_count": len(latest_edit.subtitle_data) if latest_edit else 0
-    }
\ No newline at end of file
+        "has_subtitles": latest_edit is not None and len(latest_edit["subtitle_data"]) > 0,
+        "subtitle_count": len(latest_edit["subtitle_data"]) if latest_edit else 0,
+        "export": export_service.get_latest_job(session_id)
+    }
+
+
+
+def _event_stream(
+    request: Request,
+    channel: str,
+    job: Optional[ExportJob] = None
+) -> StreamingResponse:
+    """Build an SSE response from a progress channel"""
+    async def events() -> AsyncIterator[str]:
+        # A job that already finished has nothing more to report
+        if job is not None and not job.is_active:
+            yield f"data: {job.model_dump_json()}\n\n"
+            return
+        
+        async for event in progress_broker.subscribe(channel):
+            if await request.is_disconnected():
+                break
+            
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield f"data: {json.dumps(event)}\n\n"
+            
+            if job is not None and event["status"] not in ("queued", "running"):
+                break
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.repositories import search_repo
+
+router = APIRouter()
+
+@router.get("")
+async def search_subtitles(
+    q: str = Query(..., min_length=1, max_length=500, description="Words or \"quoted phrases\" to find"),
+    limit: int = Query(default=50, ge=1, le=500, description="Maximum number of hits"),
+    session_id: Optional[int] = Query(default=None, description="Only search this session")
+):
+    """
+    Search the latest subtitles of every session
+    
+    Hits contain every word of the query, ignoring case and accents, and
+    come in session and time order. Each session's latest edit is indexed as it is
+    saved, so a search is an index lookup rather than a scan of every edit.
+    
+    Args:
+        q: Search text; words in double quotes match as a phrase
+        limit: Maximum number of hits
+        session_id: Only search this session
+        
+    Returns:
+        Hits with the session, edit, subtitle index, times and text
+    """
+    try:
+        hits = await run_in_threadpool(search_repo.search, q, limit, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "query": q,
+        "total": len(hits),
+        "hits": hits
+    }
\ No newline at end of file
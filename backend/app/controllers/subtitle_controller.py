@@ -0,0 +1,495 @@
+from enum import Enum
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import os
+import unicodedata
+from urllib.parse import quote
+import numpy as np
+
+from app.repositories import storage_repo
+from app.services import (
+    SubtitleService, SubtitleIndex, SubtitleImportService, SubtitleImportError, TimingService,
+    SceneDetectionError, media_service, scene_service, subtitle_index_service
+)
+from app.responses import JSONResponse
+from app.models import VideoSession, StyleConfig, Edit
+from app.config import settings
+
+router = APIRouter()
+
+class SubtitleFormat(str, Enum):
+    """Downloadable subtitle file formats"""
+    SRT = "srt"
+    VTT = "vtt"
+    ASS = "ass"
+
+class ShiftRequest(BaseModel):
+    """Request to move subtitles earlier or later"""
+    offset: float = Field(..., description="Seconds to add; negative moves subtitles earlier")
+    start: Optional[float] = Field(default=None, ge=0, description="Only shift subtitles starting at or after this time")
+    end: Optional[float] = Field(default=None, gt=0, description="Only shift subtitles starting before this time")
+
+class StretchRequest(BaseModel):
+    """Request to stretch subtitles so two anchor times land on new times"""
+    source_start: float = Field(..., ge=0, description="Current time of the first anchor")
+    source_end: float = Field(..., gt=0, description="Current time of the second anchor")
+    target_start: float = Field(..., ge=0, description="Where the first anchor should be")
+    target_end: float = Field(..., gt=0, description="Where the second anchor should be")
+
+class RetimeRequest(BaseModel):
+    """Request to convert subtitles between frame rates"""
+    source_fps: float = Field(..., gt=0, description="Frame rate the subtitles were timed for, e.g. 23.976")
+    target_fps: float = Field(..., gt=0, description="Frame rate of the video now, e.g. 25")
+
+class SnapRequest(BaseModel):
+    """Request to move subtitle boundaries onto nearby scene cuts"""
+    tolerance: float = Field(default=settings.scene_snap_tolerance, ge=0, le=2, description="Furthest a boundary may move, in seconds")
+    retry: bool = Field(default=False, description="Detect scene cuts again if an earlier detection failed")
+
+# Starlette appends the UTF-8 charset to text/* types itself
+MEDIA_TYPES = {
+    SubtitleFormat.SRT: "application/x-subrip; charset=utf-8",
+    SubtitleFormat.VTT: "text/vtt",
+    SubtitleFormat.ASS: "text/x-ssa"
+}
+
+@router.get("/{session_id}.{subtitle_format}")
+async def download_subtitles(session_id: int, subtitle_format: SubtitleFormat, request: Request):
+    """
+    Download the session's latest subtitles as SRT, WebVTT or styled ASS
+    
+    Files are generated in-process from the latest edit, so no export is
+    needed. The ETag is a hash of the session, format, subtitles and
+    style the file is generated from; send it back in If-None-Match to
+    get a 304 when the subtitles have not changed.
+    
+    Args:
+        session_id: Session ID
+        subtitle_format: srt, vtt or ass
+    
+    Returns:
+        The subtitle file as an attachment
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    edit_data = storage_repo.get_latest_edit_record(session_id)
+    if not edit_data:
+        raise HTTPException(
+            status_code=404,
+            detail="No edits found. Please add subtitles first."
+        )
+    
+    etag = _subtitles_etag(session_id, subtitle_format, edit_data)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache"
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    latest_edit = Edit(**edit_data)
+    if subtitle_format == SubtitleFormat.SRT:
+        content = SubtitleService.build_srt(latest_edit.subtitle_data)
+    elif subtitle_format == SubtitleFormat.VTT:
+        content = SubtitleService.build_webvtt(latest_edit.subtitle_data, latest_edit.style_config)
+    else:
+        content = SubtitleService.build_ass(latest_edit.subtitle_data, latest_edit.style_config)
+    
+    filename = f"{os.path.splitext(session.video_filename)[0]}.{subtitle_format.value}"
+    headers["Content-Disposition"] = _content_disposition(filename)
+    
+    return Response(
+        content=content.encode('utf-8'),
+        media_type=MEDIA_TYPES[subtitle_format],
+        headers=headers
+    )
+
+
+
+
+@router.post("/{session_id}/import")
+async def import_subtitles(
+    session_id: int,
+    file: UploadFile = File(...),
+    subtitle_format: Optional[SubtitleFormat] = Form(None)
+):
+    """
+    Import an SRT, WebVTT or ASS file as a new edit
+    
+    The file is parsed as it is read, without the LLM. Malformed cues are
+    skipped and counted; subtitles keep the session's current style.
+    
+    Args:
+        session_id: Session ID
+        file: Subtitle file
+        subtitle_format: srt, vtt or ass; detected from the file when left out
+        
+    Returns:
+        The new edit's subtitles and style, with import counts
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    filename = file.filename or ""
+    try:
+        track, skipped, detected_format = await run_in_threadpool(
+            SubtitleImportService.parse,
+            file.file,
+            filename,
+            subtitle_format.value if subtitle_format else None
+        )
+    except SubtitleImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_info = media_service.find_media_info(session)
+    if media_info:
+        track = TimingService.fit(track, media_info.duration)
+    
+    latest_edit = storage_repo.get_latest_edit_record(session_id)
+    style_config = latest_edit["style_config"] if latest_edit else StyleConfig().model_dump()
+    
+    summary = f"Imported {len(track)} subtitle{'s' if len(track) != 1 else ''} from {filename or 'file'}"
+    if skipped:
+        summary += f", skipping {skipped} malformed cue{'s' if skipped != 1 else ''}"
+    
+    new_edit = storage_repo.create_edit_record(
+        session_id=session_id,
+        user_message=summary + ".",
+        subtitle_data=track.to_records(),
+        style_config=style_config
+    )
+    
+    return {
+        "edit_id": new_edit["id"],
+        "response": new_edit["user_message"],
+        "format": detected_format,
+        "imported": len(track),
+        "skipped": skipped,
+        "subtitles": new_edit["subtitle_data"],
+        "style": new_edit["style_config"]
+    }
+
+# ========== TIME QUERIES ==========
+# Answered from an interval index over the edit's subtitles, built once per
+# edit. Cues carry their index in the edit's subtitle_data.
+
+@router.get("/{session_id}/at")
+async def get_subtitles_at(
+    session_id: int,
+    t: float = Query(..., ge=0, description="Time in seconds"),
+    edit_id: Optional[int] = Query(default=None, description="Edit to query, the latest by default")
+):
+    """
+    Get the subtitles showing at a point in time
+    
+    Args:
+        session_id: Session ID
+        t: Time in seconds
+        edit_id: Edit to query; defaults to the latest edit
+        
+    Returns:
+        The subtitles showing at t
+    """
+    _, edit, index = _get_index(session_id, edit_id)
+    
+    return {
+        "edit_id": edit["id"],
+        "time": t,
+        "subtitles": _cues(index, index.at(t))
+    }
+
+
+@router.get("/{session_id}/range")
+async def get_subtitles_in_range(
+    session_id: int,
+    start: float = Query(..., ge=0, description="Range start in seconds"),
+    end: float = Query(..., gt=0, description="Range end in seconds"),
+    contained: bool = Query(default=False, description="Only subtitles entirely within the range"),
+    edit_id: Optional[int] = Query(default=None, description="Edit to query, the latest by default")
+):
+    """
+    Get the subtitles showing at some point between two times
+    
+    Args:
+        session_id: Session ID
+        start: Range start in seconds
+        end: Range end in seconds, exclusive
+        contained: Only return subtitles lying entirely within the range
+        edit_id: Edit to query; defaults to the latest edit
+        
+    Returns:
+        The subtitles in the range, in edit order
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    
+    _, edit, index = _get_index(session_id, edit_id)
+    
+    return {
+        "edit_id": edit["id"],
+        "start": start,
+        "end": end,
+        "subtitles": _cues(index, index.between(start, end, contained))
+    }
+
+
+@router.get("/{session_id}/overlaps")
+async def get_subtitle_overlaps(
+    session_id: int,
+    edit_id: Optional[int] = Query(default=None, description="Edit to query, the latest by default")
+):
+    """
+    Get every pair of subtitles showing at the same time
+    
+    Args:
+        session_id: Session ID
+        edit_id: Edit to query; defaults to the latest edit
+        
+    Returns:
+        Overlapping pairs with the time they share
+    """
+    _, edit, index = _get_index(session_id, edit_id)
+    
+    pairs = index.overlaps()
+    track = index.track
+    firsts = _cues(index, pairs[:, 0])
+    seconds = _cues(index, pairs[:, 1])
+    overlap_starts = np.maximum(track.starts[pairs[:, 0]], track.starts[pairs[:, 1]]).tolist()
+    overlap_ends = np.minimum(track.ends[pairs[:, 0]], track.ends[pairs[:, 1]]).tolist()
+    
+    return {
+        "edit_id": edit["id"],
+        "total_overlaps": len(pairs),
+        "overlaps": [
+            {"first": first, "second": second, "start": overlap_start, "end": overlap_end}
+            for first, second, overlap_start, overlap_end in zip(firsts, seconds, overlap_starts, overlap_ends)
+        ]
+    }
+
+
+@router.get("/{session_id}/gaps")
+async def get_subtitle_gaps(
+    session_id: int,
+    start: float = Query(default=0.0, ge=0, description="Range start in seconds"),
+    end: Optional[float] = Query(default=None, gt=0, description="Range end in seconds, the video duration by default"),
+    min_duration: float = Query(default=0.0, ge=0, description="Shortest gap to report in seconds"),
+    edit_id: Optional[int] = Query(default=None, description="Edit to query, the latest by default")
+):
+    """
+    Get the stretches of the video with no subtitle showing
+    
+    Args:
+        session_id: Session ID
+        start: Range start in seconds
+        end: Range end in seconds; defaults to the video duration
+        min_duration: Shortest gap to report in seconds
+        edit_id: Edit to query; defaults to the latest edit
+        
+    Returns:
+        The gaps, in time order
+    """
+    session, edit, index = _get_index(session_id, edit_id)
+    
+    if end is None:
+        media_info = media_service.find_media_info(session)
+        end = media_info.duration if media_info else None
+    if end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    
+    gaps = index.gaps(start, end, min_duration)
+    
+    return {
+        "edit_id": edit["id"],
+        "start": start,
+        "end": end,
+        "gaps": [
+            {"start": gap_start, "end": gap_end, "duration": gap_end - gap_start}
+            for gap_start, gap_end in gaps.tolist()
+        ]
+    }
+
+
+
+# ========== TIMING ==========
+# Bulk timing changes to the latest edit, saved as a new edit
+
+@router.post("/{session_id}/timing/shift")
+async def shift_subtitles(session_id: int, request: ShiftRequest):
+    """
+    Move all subtitles, or those starting in a range, earlier or later
+    
+    Args:
+        session_id: Session ID
+        request: Offset and optional range
+        
+    Returns:
+        The new edit's subtitles and style
+    """
+    return _apply_timing(session_id, "shift", request.model_dump())
+
+
+@router.post("/{session_id}/timing/stretch")
+async def stretch_subtitles(session_id: int, request: StretchRequest):
+    """
+    Stretch subtitles linearly to fix drift
+    
+    Args:
+        session_id: Session ID
+        request: Two anchor times and where they should be
+        
+    Returns:
+        The new edit's subtitles and style
+    """
+    return _apply_timing(session_id, "stretch", request.model_dump())
+
+
+@router.post("/{session_id}/timing/retime")
+async def retime_subtitles(session_id: int, request: RetimeRequest):
+    """
+    Convert subtitles between frame rates, e.g. 23.976 and 25 fps
+    
+    Args:
+        session_id: Session ID
+        request: Source and target frame rates
+        
+    Returns:
+        The new edit's subtitles and style
+    """
+    return _apply_timing(session_id, "retime", request.model_dump())
+
+
+@router.post("/{session_id}/timing/snap")
+async def snap_subtitles(session_id: int, request: Optional[SnapRequest] = None):
+    """
+    Move subtitle starts and ends onto scene cuts within a tolerance
+    
+    Uses the video's cached scene cuts; if they have not been detected
+    yet, detection starts and 202 is returned. If detection failed, 422
+    is returned until the request asks for a retry.
+    
+    Args:
+        session_id: Session ID
+        request: How far a boundary may move, and whether to retry a failed detection
+        
+    Returns:
+        The new edit's subtitles and style, or 202 while cuts are being detected
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    request = request or SnapRequest()
+    try:
+        cuts = scene_service.get_cuts(session, retry=request.retry)
+    except SceneDetectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if cuts is None:
+        return JSONResponse(
+            status_code=202,
+            content={"status": "pending"},
+            headers={"Retry-After": "1"}
+        )
+    
+    return _apply_timing(session_id, "snap", {"cuts": cuts, "tolerance": request.tolerance})
+
+def _get_index(session_id: int, edit_id: Optional[int]) -> Tuple[VideoSession, dict, SubtitleIndex]:
+    """Session, edit record and subtitle index for a query, or raise 404"""
+    session = storage_repo.get_session_by_id(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if edit_id is not None:
+        edit = storage_repo.get_edit_record(edit_id)
+        if not edit or edit["session_id"] != session_id:
+            raise HTTPException(status_code=404, detail="Edit not found")
+        return session, edit, subtitle_index_service.get(edit)
+    
+    latest = subtitle_index_service.get_latest(session_id)
+    if not latest:
+        raise HTTPException(status_code=404, detail="No edits found for this session")
+    edit, index = latest
+    return session, edit, index
+
+
+
+def _apply_timing(session_id: int, operation: str, params: dict) -> dict:
+    """Apply a timing change to the latest edit and save the result as a new edit"""
+    session, edit, index = _get_index(session_id, None)
+    
+    try:
+        track, summary = TimingService.apply(index.track, operation, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    media_info = media_service.find_media_info(session)
+    if media_info:
+        track = TimingService.fit(track, media_info.duration)
+    
+    new_edit = storage_repo.create_edit_record(
+        session_id=session_id,
+        user_message=summary,
+        subtitle_data=track.to_records(),
+        style_config=edit["style_config"]
+    )
+    
+    return {
+        "edit_id": new_edit["id"],
+        "response": summary,
+        "subtitles": new_edit["subtitle_data"],
+        "style": new_edit["style_config"]
+    }
+
+def _cues(index: SubtitleIndex, indices: np.ndarray) -> List[dict]:
+    """Subtitles at `indices` of an index's track, with their index"""
+    track = index.track
+    return [
+        {"index": i, "start": start, "end": end, "text": track.texts[i]}
+        for i, start, end in zip(indices.tolist(), track.starts[indices].tolist(), track.ends[indices].tolist())
+    ]
+
+def _content_disposition(filename: str) -> str:
+    """
+    Attachment header for a filename that may not be ASCII
+    
+    Header values are sent as Latin-1, so the name itself goes in the
+    RFC 5987 filename* parameter, percent-encoded UTF-8, and filename
+    carries an ASCII approximation for clients that do not read it.
+    """
+    fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    fallback = "".join("_" if c in '"\\' or not c.isprintable() else c for c in fallback)
+    stem, dot, extension = fallback.rpartition(".")
+    if dot and not stem.strip():
+        fallback = f"subtitles.{extension}"
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename, safe="")}'
+
+def _subtitles_etag(session_id: int, subtitle_format: SubtitleFormat, edit_data: dict) -> str:
+    """
+    ETag of a subtitle file, from what it is generated from
+    
+    Not the edit ID: IDs are reused once edits are deleted, and the same
+    ID would then match different subtitles.
+    """
+    content = json.dumps(
+        [edit_data["subtitle_data"], edit_data["style_config"]],
+        sort_keys=True, ensure_ascii=False
+    )
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+    return f'"{session_id}-{subtitle_format.value}-{digest}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in candidates
+    )
\ No newline at end of file
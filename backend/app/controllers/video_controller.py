@@ -1,24 +1,50 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from pathlib import Path
-from typing import List
-import shutil
-import uuid
+from typing import List, Optional
 import os
 
-from app.repositories import storage_repo
-from app.services import video_service
-from app.models import VideoSession
+from app.repositories import storage_repo, upload_repo, blob_repo
+from app.services import (
+    video_service, transcription_service, export_service, media_service,
+    preview_service, waveform_service, scene_service, upload_service, subtitle_index_service,
+    VideoService, SubtitleIndex, UploadConflictError, UploadIntegrityError, SceneDetectionError,
+    WaveformError
+)
+from app.media import range_response
+from app.responses import JSONResponse
+from app.models import VideoSession, StyleConfig, SubtitleTrack, Upload
 from app.config import settings
 
 router = APIRouter()
 
+class UploadCreateRequest(BaseModel):
+    """Request model for starting a resumable upload"""
+    filename: str = Field(..., min_length=1, description="Original filename")
+    sha256: Optional[str] = Field(default=None, pattern=r"^[0-9a-fA-F]{64}$", description="Hex SHA-256 of the whole file, checked on finalize")
+    length: Optional[int] = Field(default=None, ge=1, description="Total size in bytes, so finalize can check that nothing is missing")
+
+class UploadFinalizeRequest(BaseModel):
+    """Request model for finishing a resumable upload"""
+    sha256: Optional[str] = Field(default=None, pattern=r"^[0-9a-fA-F]{64}$", description="Hex SHA-256 of the whole file, checked before the session is created")
+    prefetch_transcription: Optional[bool] = Field(default=None, description="Start transcribing right away (defaults to the server setting)")
+
 @router.post("/upload", response_model=dict)
-async def upload_video(file: UploadFile = File(...)):
+async def upload_video(
+    file: UploadFile = File(...),
+    prefetch_transcription: Optional[bool] = Form(None)
+):
     """
     Upload a video file and create a new editing session
     
+    For large files prefer the resumable /uploads endpoints, which avoid
+    spooling the body and survive dropped connections.
+    
     Args:
         file: Video file to upload
+        prefetch_transcription: Start transcribing in the background right
+            after upload (defaults to the server setting)
         
     Returns:
         Session details with video URL
@@ -34,36 +60,133 @@ async def upload_video(file: UploadFile = File(...)):
         )
     
     try:
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(settings.uploads_dir, unique_filename)
+        # Stored under its content hash; a repeat upload is not written again
+        file_path, content_hash = await run_in_threadpool(
+            upload_service.store_file, file.file, file.filename
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    return await _start_session(file.filename, file_path, content_hash, prefetch_transcription)
+
+
+# ========== RESUMABLE UPLOADS ==========
+
+@router.post("/uploads", status_code=201, response_model=dict)
+async def create_upload(request: UploadCreateRequest, response: Response):
+    """
+    Start a resumable upload
+    
+    Send the file with PATCH requests carrying an Upload-Offset header,
+    check the offset after a dropped connection with HEAD, then finalize
+    to create the session. A video that is already stored is recognised
+    on finalize and not stored twice.
+    
+    Args:
+        request: Filename and, ideally, total length
         
-        # Ensure uploads directory exists
-        os.makedirs(settings.uploads_dir, exist_ok=True)
+    Returns:
+        Upload ID and current offset
+    """
+    if not video_service.validate_video_file(request.filename):
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid video format. Supported: mp4, avi, mov, mkv, webm"
+        )
+    
+    upload = upload_service.create(request.filename, request.length, request.sha256)
+    response.headers["Location"] = f"/api/video/uploads/{upload.id}"
+    
+    return _upload_status(upload)
+
+
+@router.head("/uploads/{upload_id}")
+async def get_upload_offset(upload_id: str):
+    """
+    Get how many bytes of an upload have been received
+    
+    Args:
+        upload_id: Upload ID
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+    Returns:
+        Empty response with Upload-Offset and, if declared, Upload-Length
+    """
+    upload = _get_upload(upload_id)
+    return Response(status_code=200, headers=_upload_headers(upload))
+
+
+@router.patch("/uploads/{upload_id}")
+async def append_upload(upload_id: str, request: Request):
+    """
+    Append the request body to an upload
+    
+    The Upload-Offset header must equal the current offset. The body is
+    written as it arrives; after a dropped connection, HEAD the upload and
+    continue from the returned offset.
+    
+    Args:
+        upload_id: Upload ID
         
-        # Create session
-        session = storage_repo.create_session(
-            video_filename=file.filename,
-            video_path=file_path
-        )
+    Returns:
+        204 with the new Upload-Offset
+    """
+    upload = _get_upload(upload_id)
+    
+    try:
+        offset = int(request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset header is required")
+    
+    try:
+        upload = await upload_service.append(upload, offset, request.stream())
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return Response(status_code=204, headers=_upload_headers(upload))
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=dict)
+async def finalize_upload(upload_id: str, request: UploadFinalizeRequest):
+    """
+    Finish an upload and create an editing session from it
+    
+    Args:
+        upload_id: Upload ID
+        request: Optional checksum and transcription prefetch
         
-        return {
-            "id": session.id,
-            "video_filename": session.video_filename,
-            "video_url": f"/{settings.uploads_dir}/{unique_filename}",
-            "created_at": session.created_at
-        }
+    Returns:
+        Session details with video URL, as for /upload
+    """
+    upload = _get_upload(upload_id)
+    
+    if upload.offset == 0:
+        raise HTTPException(status_code=409, detail="No bytes have been uploaded")
+    
+    try:
+        upload = await upload_service.finalize(upload, request.sha256)
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadIntegrityError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return await _start_session(
+        upload.filename, upload.path, upload.content_hash, request.prefetch_transcription
+    )
+
+
+@router.delete("/uploads/{upload_id}", response_model=dict)
+async def abort_upload(upload_id: str):
+    """
+    Abandon an upload and delete the bytes received so far
+    
+    Args:
+        upload_id: Upload ID
         
-    except Exception as e:
-        # Clean up file if session creation fails
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    Returns:
+        Success message
+    """
+    upload_service.abort(_get_upload(upload_id))
+    return {"message": "Upload deleted successfully"}
 
 
 @router.get("/{session_id}", response_model=dict)
@@ -88,7 +211,9 @@ async def get_video_session(session_id: int):
         "id": session.id,
         "video_filename": session.video_filename,
         "video_url": f"/{settings.uploads_dir}/{video_filename}",
-        "created_at": session.created_at
+        "proxy_url": media_service.proxy_url(session),
+        "created_at": session.created_at,
+        "media_info": _media_summary(session)
     }
 
 
@@ -107,12 +232,151 @@ async def get_all_sessions():
             "id": s.id,
             "video_filename": s.video_filename,
             "video_url": f"/{settings.uploads_dir}/{Path(s.video_path).name}",
-            "created_at": s.created_at
+            "proxy_url": media_service.proxy_url(s),
+            "created_at": s.created_at,
+            "media_info": _media_summary(s)
         }
         for s in sessions
     ]
 
 
+@router.get("/{session_id}/preview")
+async def get_preview_frame(
+    session_id: int,
+    t: float = Query(..., ge=0, description="Frame position in seconds"),
+    edit_id: Optional[int] = Query(None, description="Edit to preview, the latest if omitted")
+):
+    """
+    Render one frame with the edit's subtitles and style burned in
+    
+    Shows what an export will look like at `t` without running one.
+    
+    Args:
+        session_id: Session ID
+        t: Frame position in seconds
+        edit_id: Edit to preview; without any edits the bare frame is shown
+        
+    Returns:
+        The frame as a JPEG
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Read as stored and indexed once per edit: only the subtitles showing at t become models
+    if edit_id is not None:
+        edit = storage_repo.get_edit_record(edit_id)
+        if not edit or edit["session_id"] != session_id:
+            raise HTTPException(status_code=404, detail="Edit not found")
+    else:
+        latest = subtitle_index_service.get_latest(session_id)
+        edit = latest[0] if latest else None
+    
+    media_info = media_service.find_media_info(session)
+    if media_info and t >= media_info.duration:
+        raise HTTPException(status_code=400, detail=f"t must be less than the duration ({media_info.duration:.3f}s)")
+    
+    subtitles = subtitle_index_service.get(edit) if edit else SubtitleIndex(SubtitleTrack([], [], []))
+    style = StyleConfig(**edit["style_config"]) if edit else StyleConfig()
+    
+    try:
+        frame = await run_in_threadpool(preview_service.render, session, subtitles, style, t)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
+    
+    return Response(
+        content=frame,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/{session_id}/waveform")
+async def get_waveform(
+    session_id: int,
+    request: Request,
+    retry: bool = Query(default=False, description="Compute again if an earlier computation failed")
+):
+    """
+    Get the audio waveform peaks for the editor timeline
+    
+    The .peaks file starts with a header and a table of zoom levels, so
+    clients can fetch those first and then request a single level with a
+    Range header. A failed computation is kept, and only run again when
+    retry is set.
+    
+    Args:
+        session_id: Session ID
+        retry: Compute again if an earlier computation failed
+        
+    Returns:
+        The binary peaks file, or 202 while it is being computed
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Sessions uploaded before waveforms existed are computed on first request
+    try:
+        peaks_path = waveform_service.get_peaks(session, retry=retry)
+    except WaveformError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if peaks_path is None:
+        return JSONResponse(
+            status_code=202,
+            content={"status": "pending"},
+            headers={"Retry-After": "1"}
+        )
+    
+    return range_response(
+        peaks_path,
+        request.headers.get("range"),
+        "application/octet-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/{session_id}/scenes")
+async def get_scene_cuts(session_id: int, retry: bool = Query(default=False, description="Detect again if an earlier detection failed")):
+    """
+    Get the scene cuts detected in the video
+    
+    Cuts are detected once per video, in the background after upload,
+    and kept for every later request and snap. A failed detection is
+    kept too, and only run again when retry is set.
+    
+    Args:
+        session_id: Session ID
+        retry: Detect again if an earlier detection failed
+        
+    Returns:
+        Cut times in seconds, or 202 while they are being detected
+    """
+    session = storage_repo.get_session_by_id(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Sessions uploaded before scene detection existed are detected on first request
+    try:
+        cuts = scene_service.get_cuts(session, retry=retry)
+    except SceneDetectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if cuts is None:
+        return JSONResponse(
+            status_code=202,
+            content={"status": "pending"},
+            headers={"Retry-After": "1"}
+        )
+    
+    return {
+        "count": len(cuts),
+        "cuts": cuts.tolist()
+    }
+
+
 @router.delete("/{session_id}", response_model=dict)
 async def delete_session(session_id: int):
     """
@@ -129,9 +393,20 @@ async def delete_session(session_id: int):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Delete video file
-    if os.path.exists(session.video_path):
-        os.remove(session.video_path)
+    # Stop background work for the session
+    transcription_service.discard_prefetch(session_id)
+    export_service.discard_session(session_id)
+    
+    # Delete the video and what is derived from it, unless other sessions
+    # share the same upload
+    if _release_video(session):
+        media_service.discard_proxy(session)
+        media_service.discard_keyframes(session)
+        waveform_service.discard(session)
+        scene_service.discard(session)
+        preview_service.discard_video(session.video_path)
+        if session.proxy_path:
+            preview_service.discard_video(session.proxy_path)
     
     # Delete edits
     storage_repo.delete_edits_by_session(session_id)
@@ -139,4 +414,118 @@ async def delete_session(session_id: int):
     # Delete session
     storage_repo.delete_session(session_id)
     
-    return {"message": "Session deleted successfully"}
\ No newline at end of file
+    return {"message": "Session deleted successfully"}
+
+
+def _media_summary(session: VideoSession) -> Optional[dict]:
+    """Media info for API responses, without the bulky keyframe index"""
+    if session.media_info is None:
+        return None
+    return session.media_info.model_dump(exclude={"keyframes"})
+
+
+async def _start_session(
+    filename: str,
+    file_path: str,
+    content_hash: str,
+    prefetch_transcription: Optional[bool]
+) -> dict:
+    """
+    Create a session for a stored upload and start its background work
+    
+    The caller's reference to the blob is released if the file cannot be
+    read as a video or the session cannot be created.
+    """
+    try:
+        # Probe once per distinct video; later steps read the stored media info
+        existing = storage_repo.find_session_by_content_hash(content_hash)
+        if existing and existing.media_info:
+            media_info = existing.media_info
+        else:
+            try:
+                media_info = await run_in_threadpool(VideoService.probe_media, file_path)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Could not read video: {str(e)}")
+            media_service.store_keyframes(file_path, media_info.keyframes)
+        
+        # Create session
+        session = storage_repo.create_session(
+            video_filename=filename,
+            video_path=file_path,
+            media_info=media_info,
+            content_hash=content_hash
+        )
+        
+        # Optionally start transcription before the first chat message
+        if prefetch_transcription is None:
+            prefetch_transcription = settings.transcription_prefetch_enabled
+        
+        transcription_prefetched = (
+            prefetch_transcription
+            and transcription_service.prefetch(session.id, file_path)
+        )
+        
+        # Small proxy for the editor player, generated after we respond
+        proxy_pending = media_service.schedule_proxy(session)
+        waveform_service.schedule(session)
+        scene_service.schedule(session)
+        
+        # A proxy made for an earlier upload of the same video is attached at once
+        if not proxy_pending:
+            session = storage_repo.get_session_by_id(session.id) or session
+        
+        return {
+            "id": session.id,
+            "video_filename": session.video_filename,
+            "video_url": f"/{settings.uploads_dir}/{Path(file_path).name}",
+            "created_at": session.created_at,
+            "proxy_url": media_service.proxy_url(session),
+            "proxy_pending": proxy_pending,
+            "media_info": _media_summary(session),
+            "transcription_prefetched": transcription_prefetched
+        }
+        
+    except Exception as e:
+        # Release the upload if session creation fails
+        blob_repo.release(content_hash)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+def _release_video(session: VideoSession) -> bool:
+    """Drop a session's reference to its video; True if the file was deleted"""
+    if session.content_hash:
+        return blob_repo.release(session.content_hash)
+    
+    # Sessions from before uploads were content-addressed own their file
+    if os.path.exists(session.video_path):
+        os.remove(session.video_path)
+    return True
+
+
+def _get_upload(upload_id: str) -> Upload:
+    """Look up an upload or raise 404"""
+    upload = upload_repo.get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def _upload_headers(upload: Upload) -> dict:
+    """Offset headers of an upload, as in the tus protocol"""
+    headers = {"Upload-Offset": str(upload.offset), "Cache-Control": "no-store"}
+    if upload.length is not None:
+        headers["Upload-Length"] = str(upload.length)
+    return headers
+
+
+def _upload_status(upload: Upload) -> dict:
+    """Upload details for API responses"""
+    return {
+        "id": upload.id,
+        "filename": upload.filename,
+        "offset": upload.offset,
+        "length": upload.length,
+        "upload_url": f"/api/video/uploads/{upload.id}"
+    }
\ No newline at end of file
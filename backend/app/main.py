@@ -1,17 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+import mimetypes
 import os
 
 from app.config import settings
-from app.controllers import video_router, chat_router, export_router
+from app.media import MediaFiles
+from app.middleware import CompressionMiddleware
+from app.responses import JSONResponse
+from app.controllers import video_router, chat_router, export_router, subtitle_router, search_router
 
 # Create FastAPI application
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
-    description="AI-powered chat-based video editing API"
+    description="AI-powered chat-based video editing API",
+    default_response_class=JSONResponse
 )
 
 # CORS middleware
@@ -23,20 +26,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli or gzip for JSON and subtitle responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality
+)
+
 # Create necessary directories
 os.makedirs(settings.uploads_dir, exist_ok=True)
 os.makedirs(settings.outputs_dir, exist_ok=True)
 os.makedirs(settings.data_dir, exist_ok=True)
 
-# Mount static file directories
+# HLS exports: playlists and fMP4 media segments
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/iso.segment", ".m4s")
+
+# Mount media directories; uploads are stored under their content hash
+accel_redirect = settings.media_accel_redirect.rstrip("/") if settings.media_accel_redirect else None
 app.mount(
     f"/{settings.uploads_dir}", 
-    StaticFiles(directory=settings.uploads_dir), 
+    MediaFiles(
+        directory=settings.uploads_dir,
+        content_addressed=True,
+        accel_redirect=f"{accel_redirect}/{settings.uploads_dir}" if accel_redirect else None
+    ), 
     name="uploads"
 )
 app.mount(
     f"/{settings.outputs_dir}", 
-    StaticFiles(directory=settings.outputs_dir), 
+    MediaFiles(
+        directory=settings.outputs_dir,
+        accel_redirect=f"{accel_redirect}/{settings.outputs_dir}" if accel_redirect else None
+    ), 
     name="outputs"
 )
 
@@ -44,6 +67,8 @@ app.mount(
 app.include_router(video_router, prefix="/api/video", tags=["Video Management"])
 app.include_router(chat_router, prefix="/api/chat", tags=["Chat & Editing"])
 app.include_router(export_router, prefix="/api/export", tags=["Export"])
+app.include_router(subtitle_router, prefix="/api/subtitles", tags=["Subtitles"])
+app.include_router(search_router, prefix="/api/search", tags=["Search"])
 
 # Root endpoint
 @app.get("/", tags=["Root"])
@@ -0,0 +1,4 @@
+from .ranges import RangeNotSatisfiableError, parse_range, iter_file, range_response
+from .files import MediaFiles
+
+__all__ = ["RangeNotSatisfiableError", "parse_range", "iter_file", "range_response", "MediaFiles"]
\ No newline at end of file
@@ -0,0 +1,219 @@
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from .ranges import RangeNotSatisfiableError, parse_range
+
+# Bytes read per chunk when the server cannot send the file itself
+CHUNK_SIZE = 256 * 1024
+
+# Uploads stored under their SHA-256, e.g. "<64 hex digits>.mp4"
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}\.[A-Za-z0-9]+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+class MediaFiles:
+    """
+    ASGI app serving media files with byte ranges and HTTP caching
+    
+    Unlike StaticFiles it answers Range requests with 206 responses, so
+    players can seek without downloading whole videos, and supports
+    If-None-Match, If-Modified-Since and If-Range. Files named by their
+    SHA-256 get the hash as a strong ETag and are cached as immutable;
+    everything else is revalidated against a size and mtime ETag.
+    
+    File bytes are handed to the server with the ASGI zerocopysend
+    extension where available, or to a fronting nginx with
+    X-Accel-Redirect when configured, and otherwise read in a worker
+    thread with pread.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        content_addressed: bool = False,
+        accel_redirect: Optional[str] = None
+    ):
+        """
+        Args:
+            directory: Directory to serve
+            content_addressed: Whether top-level files named by a SHA-256
+                are content-addressed and may be cached forever
+            accel_redirect: Internal nginx location mapped to `directory`;
+                if set, nginx sends the bytes
+        """
+        self.directory = os.path.realpath(directory)
+        self.content_addressed = content_addressed
+        self.accel_redirect = accel_redirect.rstrip("/") if accel_redirect else None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = await self.get_response(scope)
+        await response(scope, receive, send)
+    
+    async def get_response(self, scope: Scope) -> Response:
+        """Build the response to a request for a file"""
+        if scope["method"] not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        
+        relative_path = self._relative_path(scope)
+        full_path = os.path.realpath(os.path.join(self.directory, relative_path))
+        if os.path.commonpath([full_path, self.directory]) != self.directory:
+            return PlainTextResponse("Not Found", status_code=404)
+        
+        try:
+            file_stat = await run_in_threadpool(os.stat, full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return PlainTextResponse("Not Found", status_code=404)
+        if not stat.S_ISREG(file_stat.st_mode):
+            return PlainTextResponse("Not Found", status_code=404)
+        
+        request_headers = Headers(scope=scope)
+        etag, last_modified = self._validators(relative_path, file_stat)
+        cache_headers = {
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Cache-Control": self._cache_control(relative_path)
+        }
+        
+        if self._not_modified(request_headers, etag, file_stat.st_mtime):
+            return Response(status_code=304, headers=cache_headers)
+        
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        headers = {**cache_headers, "Accept-Ranges": "bytes"}
+        
+        # nginx handles ranges itself for internal redirects
+        if self.accel_redirect:
+            headers["X-Accel-Redirect"] = f"{self.accel_redirect}/{relative_path}"
+            return Response(status_code=200, media_type=media_type, headers=headers)
+        
+        size = file_stat.st_size
+        start, length, status_code = 0, size, 200
+        if self._range_applies(request_headers, etag, last_modified):
+            try:
+                byte_range = parse_range(request_headers.get("range"), size)
+            except RangeNotSatisfiableError:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+            
+            if byte_range is not None:
+                start, end = byte_range
+                length, status_code = end - start + 1, 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        
+        headers["Content-Length"] = str(length)
+        if scope["method"] == "HEAD":
+            return Response(status_code=status_code, media_type=media_type, headers=headers)
+        
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            return ZeroCopyFileResponse(full_path, start, length, status_code, media_type, headers)
+        
+        return StreamingResponse(
+            self._read_chunks(full_path, start, length),
+            status_code=status_code,
+            media_type=media_type,
+            headers=headers
+        )
+    
+    def _relative_path(self, scope: Scope) -> str:
+        """Path of the requested file below the mount point"""
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return os.path.normpath(path.lstrip("/"))
+    
+    def _validators(self, relative_path: str, file_stat: os.stat_result) -> Tuple[str, str]:
+        """Strong ETag and Last-Modified date of a file"""
+        if self._is_immutable(relative_path):
+            etag = f'"{os.path.splitext(relative_path)[0]}"'
+        else:
+            etag = f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+        return etag, formatdate(file_stat.st_mtime, usegmt=True)
+    
+    def _cache_control(self, relative_path: str) -> str:
+        """Cache-Control of a file"""
+        return IMMUTABLE if self._is_immutable(relative_path) else REVALIDATE
+    
+    def _is_immutable(self, relative_path: str) -> bool:
+        """Whether a file is named by its content and can never change"""
+        return self.content_addressed and bool(CONTENT_ADDRESSED_NAME.match(relative_path))
+    
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        """Evaluate If-None-Match, or If-Modified-Since without it"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in candidates or etag in (
+                tag[2:] if tag.startswith("W/") else tag for tag in candidates
+            )
+        
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    @staticmethod
+    def _range_applies(request_headers: Headers, etag: str, last_modified: str) -> bool:
+        """Whether to honour a Range header, given If-Range"""
+        if "range" not in request_headers:
+            return False
+        if_range = request_headers.get("if-range")
+        return if_range is None or if_range in (etag, last_modified)
+    
+    @staticmethod
+    async def _read_chunks(path: str, start: int, length: int) -> AsyncIterator[bytes]:
+        """Read part of a file with pread in a worker thread"""
+        fd = await run_in_threadpool(os.open, path, os.O_RDONLY)
+        try:
+            offset, remaining = start, length
+            while remaining > 0:
+                chunk = await run_in_threadpool(os.pread, fd, min(CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+
+class ZeroCopyFileResponse(Response):
+    """Response whose body the ASGI server sends straight from the file descriptor"""
+    
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        length: int,
+        status_code: int,
+        media_type: str,
+        headers: dict
+    ):
+        super().__init__(status_code=status_code, media_type=media_type, headers=headers)
+        self.path = path
+        self.start = start
+        self.length = length
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        with open(self.path, 'rb') as f:
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": f.fileno(),
+                "offset": self.start,
+                "count": self.length,
+                "more_body": False
+            })
\ No newline at end of file
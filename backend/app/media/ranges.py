@@ -0,0 +1,100 @@
+import os
+from typing import Iterator, Optional, Tuple
+from fastapi.responses import Response, StreamingResponse
+
+# Bytes read from disk per streamed chunk
+CHUNK_SIZE = 64 * 1024
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when a Range header lies entirely past the end of the file"""
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range from a Range header
+    
+    Malformed headers and multi-range requests are ignored, which per
+    RFC 9110 means the whole file is sent.
+    
+    Args:
+        header: Range header value, e.g. "bytes=0-1023" or "bytes=-500"
+        size: File size in bytes
+    
+    Returns:
+        Inclusive (first, last) byte offsets, or None for the whole file
+    
+    Raises:
+        RangeNotSatisfiableError: If the range starts past the end
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            # Suffix range: the final N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    
+    if start >= size:
+        raise RangeNotSatisfiableError(f"Range starts at {start}, file has {size} bytes")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+def iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    """Read `length` bytes of a file from `start` in chunks"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def range_response(
+    path: str,
+    range_header: Optional[str],
+    media_type: str,
+    headers: Optional[dict] = None
+) -> Response:
+    """
+    Stream a file, or the byte range a request asked for
+    
+    Args:
+        path: File path
+        range_header: The request's Range header, if any
+        media_type: Content type of the file
+        headers: Extra response headers, e.g. caching
+    
+    Returns:
+        A 200 response with the whole file, a 206 with the range, or a 416
+    """
+    size = os.path.getsize(path)
+    headers = {"Accept-Ranges": "bytes", **(headers or {})}
+    
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file(path, start, end - start + 1),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
\ No newline at end of file
@@ -0,0 +1,184 @@
+import gzip
+import zlib
+from typing import Optional
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Content types worth compressing; media is already compressed
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/vnd.apple.mpegurl",
+    "application/x-subrip",
+    "application/xml",
+    "image/svg+xml",
+    "text/"
+)
+
+# Server-sent events must reach the client as they are sent, not when a
+# compressor's buffer fills
+UNBUFFERED_TYPES = ("text/event-stream",)
+
+class CompressionMiddleware:
+    """
+    Compress text responses with Brotli or gzip, as the client prefers
+    
+    Only responses of a compressible type are touched. Responses that are
+    partial, already encoded, event streams or smaller than `minimum_size`
+    pass through unchanged. Other streaming responses are compressed chunk
+    by chunk.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+    
+    @staticmethod
+    def negotiate(accept_encoding: str) -> Optional[str]:
+        """
+        Pick br or gzip from an Accept-Encoding header
+        
+        Args:
+            accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+        
+        Returns:
+            "br", "gzip" or None if the client accepts neither
+        """
+        qualities = {}
+        for item in accept_encoding.lower().split(","):
+            name, _, params = item.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            qualities[name.strip()] = quality
+        
+        wildcard = qualities.get("*", 0.0)
+        best = None
+        for encoding in ("br", "gzip"):
+            quality = qualities.get(encoding, wildcard)
+            if quality > 0 and (best is None or quality > best[1]):
+                best = (encoding, quality)
+        return best[0] if best else None
+    
+    def compressor(self, encoding: str):
+        """A streaming compressor with compress() and flush()"""
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        # wbits 31 writes the gzip header and trailer
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        """Compress a whole body"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+class _BrotliCompressor:
+    """brotli.Compressor with the zlib compressobj interface"""
+    
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+    
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+class _CompressionResponder:
+    """Wraps `send` for one response, deciding on its first body message"""
+    
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressible = False
+        self.started = False
+        self.compressor = None
+    
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body shows whether to compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.compressible = (
+                message["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and "content-range" not in headers
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+                and not content_type.startswith(UNBUFFERED_TYPES)
+            )
+            return
+        
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            
+            if not self.compressible or (not more_body and len(body) < self.middleware.minimum_size):
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            
+            # The encoded bytes differ from the identity representation
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            
+            if not more_body:
+                body = self.middleware.compress(self.encoding, body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            
+            # Streamed: the compressed length is not known up front
+            del headers["Content-Length"]
+            self.compressor = self.middleware.compressor(self.encoding)
+            await self._send(self.start_message)
+        
+        if self.compressor is None:
+            await self._send(message)
+            return
+        
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
\ No newline at end of file
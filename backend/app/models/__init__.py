@@ -1,9 +1,22 @@
-from .video import VideoSession, SubtitleSegment, StyleConfig
+from .video import VideoSession, SubtitleSegment, StyleConfig, MediaInfo
 from .edit import Edit
+from .subtitle_track import SubtitleTrack
+from .upload import Upload
+from .export_job import ExportJob, ExportOptions, ExportStatus, ExportMode, ExportContainer, ExportRendition, ExportOutput
 
 __all__ = [
     "VideoSession",
     "SubtitleSegment", 
     "StyleConfig",
-    "Edit"
+    "MediaInfo",
+    "Edit",
+    "SubtitleTrack",
+    "Upload",
+    "ExportJob",
+    "ExportOptions",
+    "ExportStatus",
+    "ExportMode",
+    "ExportContainer",
+    "ExportRendition",
+    "ExportOutput"
 ]
\ No newline at end of file
@@ -0,0 +1,129 @@
+from enum import Enum
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+class ExportStatus(str, Enum):
+    """Lifecycle states of an export job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class ExportMode(str, Enum):
+    """How subtitles end up in the exported video"""
+    BURN = "burn"
+    SOFT = "soft"
+
+class ExportContainer(str, Enum):
+    """Container of the exported video"""
+    MP4 = "mp4"
+    MKV = "mkv"
+    WEBM = "webm"
+    HLS = "hls"
+
+class ExportRendition(BaseModel):
+    """One output of a multi-rendition export"""
+    name: str = Field(..., pattern=r"^[a-z0-9_-]{1,32}$", description="Rendition name, used in the output filename")
+    height: Optional[int] = Field(default=None, ge=144, le=4320, description="Output height; overrides the profile's height")
+    profile: Optional[str] = Field(default=None, description="Encode profile, the export's profile if omitted")
+
+class ExportOutput(BaseModel):
+    """A file produced by an export"""
+    name: str
+    download_url: str
+
+class ExportOptions(BaseModel):
+    """Per-request export settings"""
+    mode: ExportMode = Field(default=ExportMode.BURN, description="burn: re-encode with subtitles drawn into the picture; soft: mux a subtitle track without re-encoding")
+    container: ExportContainer = Field(default=ExportContainer.MP4, description="Output container: mp4, mkv, webm (soft mode, WebM-compatible source) or hls (fMP4 segments; renditions become variants)")
+    profile: Optional[str] = Field(default=None, description="Encode profile for burned-in exports, e.g. draft, standard or archive")
+    renditions: List[ExportRendition] = Field(default_factory=list, max_length=8, description="Several outputs from one decode and subtitle render; parallel is ignored")
+    parallel: bool = Field(default=False, description="Burn subtitles into keyframe-aligned segments in parallel")
+    
+    @model_validator(mode="after")
+    def check_container(self) -> "ExportOptions":
+        """Burned-in exports copy the source audio, which WebM cannot carry in general; HLS is always re-encoded"""
+        if self.mode == ExportMode.BURN and self.container == ExportContainer.WEBM:
+            raise ValueError("webm exports require mode 'soft'")
+        if self.mode != ExportMode.BURN and self.container == ExportContainer.HLS:
+            raise ValueError("hls exports require mode 'burn'")
+        return self
+    
+    @model_validator(mode="after")
+    def check_renditions(self) -> "ExportOptions":
+        """Renditions are re-encodes with unique names"""
+        if self.renditions and self.mode != ExportMode.BURN:
+            raise ValueError("renditions require mode 'burn'")
+        names = [rendition.name for rendition in self.renditions]
+        if len(names) != len(set(names)):
+            raise ValueError("rendition names must be unique")
+        if self.container == ExportContainer.HLS and "audio" in names:
+            raise ValueError("'audio' is reserved for the HLS audio rendition")
+        return self
+    
+    def output_settings(self) -> dict:
+        """Settings that change the exported file, as opposed to how it is produced"""
+        return self.model_dump(mode="json", exclude={"parallel"})
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "mode": "burn",
+                "container": "mp4",
+                "profile": "standard",
+                "renditions": [
+                    {"name": "1080p", "height": 1080},
+                    {"name": "720p", "height": 720},
+                    {"name": "mobile", "height": 360, "profile": "draft"}
+                ]
+            }
+        }
+
+class ExportJob(BaseModel):
+    """Background export job for a video session"""
+    id: str
+    session_id: int
+    edit_id: int
+    status: ExportStatus = Field(default=ExportStatus.QUEUED, description="Current job state")
+    progress: float = Field(default=0.0, ge=0, le=1, description="Fraction of the export completed")
+    out_time: Optional[float] = Field(default=None, description="Seconds of output encoded so far")
+    fps: Optional[float] = Field(default=None, description="Current encoding frame rate")
+    speed: Optional[float] = Field(default=None, description="Current encoding speed (x realtime)")
+    encode_speed: Optional[float] = Field(default=None, description="Overall encoding speed (x realtime) once done")
+    download_url: Optional[str] = Field(default=None, description="Exported video URL once done; the first rendition's for multi-rendition exports")
+    outputs: List[ExportOutput] = Field(default_factory=list, description="Every exported file once done")
+    cached: bool = Field(default=False, description="Whether an identical earlier export was reused")
+    error: Optional[str] = Field(default=None, description="Failure reason if the job failed")
+    superseded_by: Optional[str] = Field(default=None, description="Newer job that replaced this one")
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    
+    @property
+    def is_active(self) -> bool:
+        """Whether the job is still queued or running"""
+        return self.status in (ExportStatus.QUEUED, ExportStatus.RUNNING)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "3f1c2e0a9b8d4c7e8f6a5b4c3d2e1f00",
+                "session_id": 1,
+                "edit_id": 4,
+                "status": "running",
+                "progress": 0.42,
+                "out_time": 25.2,
+                "fps": 96.0,
+                "speed": 3.8,
+                "encode_speed": None,
+                "download_url": None,
+                "outputs": [],
+                "cached": False,
+                "error": None,
+                "superseded_by": None,
+                "created_at": "2025-11-07T10:35:00",
+                "started_at": "2025-11-07T10:35:01",
+                "finished_at": None
+            }
+        }
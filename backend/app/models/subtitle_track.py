@@ -0,0 +1,182 @@
+from typing import Iterable, List, Sequence
+import numpy as np
+from pydantic import TypeAdapter
+from .video import SubtitleSegment
+
+# Validates a whole list in pydantic-core, well ahead of a model per cue in Python
+_SEGMENT_LIST = TypeAdapter(List[SubtitleSegment])
+
+class SubtitleTrack:
+    """
+    Subtitles stored column by column
+    
+    Start and end times live in two float64 arrays and the texts in one
+    list, instead of a pydantic model per cue. A long transcript takes a
+    fraction of the memory, and checks and edits over every cue run as
+    array operations. Convert to SubtitleSegment lists at the API boundary
+    with from_segments() and to_segments().
+    """
+    
+    __slots__ = ("starts", "ends", "texts")
+    
+    def __init__(self, starts: Sequence[float], ends: Sequence[float], texts: List[str]):
+        """
+        Args:
+            starts: Start time of each cue in seconds
+            ends: End time of each cue in seconds
+            texts: Text of each cue
+        
+        Raises:
+            ValueError: If the columns differ in length
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.texts = list(texts)
+        
+        if not (self.starts.ndim == self.ends.ndim == 1 and len(self.starts) == len(self.ends) == len(self.texts)):
+            raise ValueError(
+                f"Subtitle columns differ in length: {self.starts.shape}, {self.ends.shape}, {len(self.texts)}"
+            )
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __repr__(self) -> str:
+        return f"SubtitleTrack({len(self)} cues)"
+    
+    # ========== CONVERSION ==========
+    
+    @classmethod
+    def from_segments(cls, segments: Iterable[SubtitleSegment]) -> "SubtitleTrack":
+        """Build a track from subtitle segments"""
+        segments = list(segments)
+        count = len(segments)
+        return cls(
+            np.fromiter((sub.start for sub in segments), np.float64, count),
+            np.fromiter((sub.end for sub in segments), np.float64, count),
+            [sub.text for sub in segments]
+        )
+    
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "SubtitleTrack":
+        """
+        Build a track from stored {"start", "end", "text"} dicts
+        
+        Raises:
+            ValueError: If a record lacks a field or has a non-numeric time
+        """
+        records = list(records)
+        count = len(records)
+        try:
+            return cls(
+                np.fromiter((record["start"] for record in records), np.float64, count),
+                np.fromiter((record["end"] for record in records), np.float64, count),
+                [record["text"] for record in records]
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed subtitle record: {e}")
+    
+    def to_segments(self) -> List[SubtitleSegment]:
+        """
+        Subtitle segments for the API
+        
+        Raises:
+            pydantic.ValidationError: If a cue breaks SubtitleSegment's
+                constraints
+        """
+        return _SEGMENT_LIST.validate_python(self.to_records())
+    
+    def to_records(self) -> List[dict]:
+        """{"start", "end", "text"} dicts, as stored and sent as JSON"""
+        return [
+            {"start": start, "end": end, "text": text}
+            for start, end, text in zip(self.starts.tolist(), self.ends.tolist(), self.texts)
+        ]
+    
+    # ========== VALIDATION ==========
+    
+    def invalid(self, strict: bool = True) -> np.ndarray:
+        """
+        Indices of cues breaking SubtitleSegment's constraints
+        
+        Args:
+            strict: Also flag cues that do not end after they start
+        
+        Returns:
+            Sorted indices of invalid cues
+        """
+        bad = ~(np.isfinite(self.starts) & np.isfinite(self.ends))
+        bad |= self.starts < 0
+        bad |= self.ends <= (self.starts if strict else 0)
+        bad |= np.fromiter((not text for text in self.texts), bool, len(self.texts))
+        return np.flatnonzero(bad)
+    
+    def validate(self, strict: bool = True) -> "SubtitleTrack":
+        """
+        Check every cue at once
+        
+        Args:
+            strict: Require each cue to end after it starts, not only
+                after zero as SubtitleSegment does
+        
+        Returns:
+            The track itself
+        
+        Raises:
+            ValueError: Describing the first invalid cue
+        """
+        invalid = self.invalid(strict)
+        if len(invalid):
+            index = int(invalid[0])
+            raise ValueError(
+                f"Invalid subtitle {index} ({len(invalid)} in total): start={self.starts[index]}, "
+                f"end={self.ends[index]}, text={self.texts[index]!r}"
+            )
+        return self
+    
+    def overlaps(self) -> np.ndarray:
+        """
+        Cues overlapping the cue that starts next
+        
+        Returns:
+            (n, 2) array of index pairs; the first cue of each pair ends
+            after the second starts
+        """
+        order = np.argsort(self.starts, kind="stable")
+        overlapping = np.flatnonzero(self.ends[order[:-1]] > self.starts[order[1:]])
+        return np.column_stack((order[overlapping], order[overlapping + 1]))
+    
+    # ========== TRANSFORMS ==========
+    
+    def take(self, indices: np.ndarray) -> "SubtitleTrack":
+        """A track of the cues at `indices` or where a boolean mask is set"""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            # Keeping every cue, as transforms usually do, needs no text lookups
+            if indices.all():
+                return SubtitleTrack(self.starts.copy(), self.ends.copy(), self.texts)
+            indices = np.flatnonzero(indices)
+        return SubtitleTrack(
+            self.starts[indices],
+            self.ends[indices],
+            [self.texts[index] for index in indices.tolist()]
+        )
+    
+    def at(self, time: float) -> "SubtitleTrack":
+        """Cues showing at `time`, in track order"""
+        return self.take((self.starts <= time) & (time < self.ends))
+    
+    def sorted(self) -> "SubtitleTrack":
+        """The track in start-time order"""
+        return self.take(np.argsort(self.starts, kind="stable"))
+    
+    def clamp(self, duration: float) -> "SubtitleTrack":
+        """
+        Fit the track to a video's duration
+        
+        Cues starting at or after `duration` are dropped and cues running
+        past it are cut short.
+        """
+        clamped = self.take(self.starts < duration)
+        np.minimum(clamped.ends, duration, out=clamped.ends)
+        return clamped
\ No newline at end of file
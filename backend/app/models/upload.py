@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class Upload(BaseModel):
+    """Resumable upload in progress"""
+    id: str
+    filename: str = Field(..., description="Original filename")
+    path: str = Field(..., description="Final video path the chunks are written to")
+    length: Optional[int] = Field(default=None, ge=0, description="Total size in bytes, if declared up front")
+    offset: int = Field(default=0, ge=0, description="Bytes received so far")
+    sha256: Optional[str] = Field(default=None, description="Hex SHA-256 declared on creation, checked on finalize")
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of a stored video this upload was deduplicated against on creation, by earlier versions")
+    created_at: str
+    updated_at: str
+    
+    @property
+    def is_complete(self) -> bool:
+        """Whether every declared byte has been received"""
+        return self.length is not None and self.offset == self.length
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "9c4f0b6e2d1a4e3f8b7c6d5e4f3a2b1c",
+                "filename": "my_video.mp4",
+                "path": "uploads/0b1c2d3e-4f50-6172-8394-a5b6c7d8e9f0.mp4",
+                "length": 4294967296,
+                "offset": 1073741824,
+                "created_at": "2025-11-07T10:30:00",
+                "updated_at": "2025-11-07T10:41:12"
+            }
+        }
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class SubtitleSegment(BaseModel):
@@ -42,12 +42,38 @@ class StyleConfig(BaseModel):
             }
         }
 
+class MediaInfo(BaseModel):
+    """Media properties probed once at upload"""
+    duration: float = Field(..., ge=0, description="Duration in seconds")
+    width: int = Field(..., description="Video width in pixels")
+    height: int = Field(..., description="Video height in pixels")
+    fps: Optional[float] = Field(default=None, description="Average video frame rate")
+    video_codec: str = Field(..., description="Video codec name, e.g. h264")
+    video_profile: Optional[str] = Field(default=None, description="Video codec profile, e.g. High")
+    video_level: Optional[int] = Field(default=None, description="Video codec level as ffprobe reports it, e.g. 40 for H.264 level 4.0")
+    pix_fmt: Optional[str] = Field(default=None, description="Video pixel format, e.g. yuv420p")
+    sample_aspect_ratio: Optional[str] = Field(default=None, description="Video sample aspect ratio, e.g. 1:1")
+    audio_codec: Optional[str] = Field(default=None, description="Audio codec name, None without audio")
+    bit_rate: Optional[int] = Field(default=None, description="Overall bitrate in bits per second")
+    size: int = Field(..., description="File size in bytes")
+    # Kept in a per-video sidecar file rather than every session record,
+    # see MediaService.get_keyframes()
+    keyframes: List[float] = Field(default_factory=list, exclude=True, description="Video keyframe timestamps in seconds")
+    
+    @property
+    def has_audio(self) -> bool:
+        """Whether the file has an audio stream"""
+        return self.audio_codec is not None
+
 class VideoSession(BaseModel):
     """Video editing session"""
     id: int
     video_filename: str
     video_path: str
     created_at: str
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of the video, which may be shared with other sessions")
+    media_info: Optional[MediaInfo] = Field(default=None, description="Probed media properties")
+    proxy_path: Optional[str] = Field(default=None, description="Low-resolution copy for the editor player, once generated")
     
     class Config:
         json_schema_extra = {
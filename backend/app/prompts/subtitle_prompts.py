@@ -10,8 +10,9 @@ Intents:
 - add_subtitles: User wants to add new subtitles manually with specific text and timing
 - modify_style: User wants to change font, color, size, position, background, or outline
 - modify_content: User wants to edit existing subtitle text
+- adjust_timing: User wants to delay, advance, stretch or re-sync existing subtitles, snap them to scene cuts, or convert them between frame rates, without changing their text
 
-Return ONLY one of these four words: transcribe_audio, add_subtitles, modify_style, or modify_content"""
+Return ONLY one of these five words: transcribe_audio, add_subtitles, modify_style, modify_content, or adjust_timing"""
 
 # Subtitle Generation Prompt
 SUBTITLE_GENERATION_PROMPT = """You are a subtitle generator. Extract subtitle information from the user's message.
@@ -125,4 +126,25 @@ Instructions:
 Return ONLY a valid JSON array of the updated subtitles in this exact format:
 [{{"start": 0.0, "end": 2.0, "text": "Updated text"}}]
 
-Do not include any explanation, only return the JSON array"""
\ No newline at end of file
+Do not include any explanation, only return the JSON array"""
+
+# Timing Adjustment Prompt
+TIMING_ADJUSTMENT_PROMPT = """You are a subtitle timing editor. Turn the user's request into exactly one timing operation.
+
+Operations:
+- shift: move subtitles earlier or later
+  {{"operation": "shift", "offset": 1.5, "start": null, "end": null}}
+  offset is in seconds, negative to move earlier. start and end limit the shift to subtitles starting in that range; use null for all subtitles.
+- stretch: fix subtitles that drift out of sync by moving two anchor times
+  {{"operation": "stretch", "source_start": 10.0, "source_end": 600.0, "target_start": 10.5, "target_end": 603.0}}
+- retime: convert subtitles between frame rates
+  {{"operation": "retime", "source_fps": 23.976, "target_fps": 25}}
+- snap: line subtitle starts and ends up with the video's scene cuts (shot changes)
+  {{"operation": "snap", "tolerance": null}}
+  tolerance is how far in seconds a subtitle may move; use null unless the user gives one.
+
+Rules:
+- times are in seconds; convert minutes:seconds such as 5:31 to 331.0
+- "delay" means a positive offset, "earlier" or "ahead" a negative one
+
+Return ONLY the JSON object, do not include any explanation"""
\ No newline at end of file
@@ -1,6 +1,25 @@
 from .storage_repository import StorageRepository
+from .export_cache_repository import ExportCacheRepository
+from .upload_repository import UploadRepository
+from .blob_repository import BlobRepository
+from .search_repository import SearchRepository
 
-# Singleton instance
-storage_repo = StorageRepository()
+# Singleton instances
+search_repo = SearchRepository()
+storage_repo = StorageRepository(search_repo=search_repo)
+export_cache_repo = ExportCacheRepository()
+upload_repo = UploadRepository()
+blob_repo = BlobRepository()
 
-__all__ = ["storage_repo", "StorageRepository"]
\ No newline at end of file
+__all__ = [
+    "storage_repo",
+    "export_cache_repo",
+    "upload_repo",
+    "blob_repo",
+    "search_repo",
+    "StorageRepository",
+    "ExportCacheRepository",
+    "UploadRepository",
+    "BlobRepository",
+    "SearchRepository"
+]
\ No newline at end of file
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from typing import Optional
+from datetime import datetime
+from app.config import settings
+
+class BlobRepository:
+    """Reference-counted index of uploaded videos stored under their SHA-256"""
+    
+    def __init__(self):
+        self.uploads_dir = settings.uploads_dir
+        self.index_file = os.path.join(settings.data_dir, "blobs.json")
+        self._lock = threading.Lock()
+        
+        os.makedirs(settings.data_dir, exist_ok=True)
+        
+        if not os.path.exists(self.index_file):
+            self._write_index({})
+    
+    def _read_index(self) -> dict:
+        """Read blob index"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _write_index(self, index: dict):
+        """Write blob index"""
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+    
+    # ========== BLOB OPERATIONS ==========
+    
+    def acquire(
+        self,
+        content_hash: str,
+        source_path: Optional[str] = None,
+        extension: str = ""
+    ) -> Optional[str]:
+        """
+        Take a reference to a blob, storing it first if it is new
+        
+        Args:
+            content_hash: Hex SHA-256 of the content
+            source_path: File with that content; moved into place if the
+                blob is new and deleted if it already exists
+            extension: Extension of a new blob's file, e.g. ".mp4"
+        
+        Returns:
+            Path of the blob, or None if it does not exist and no source
+            was given
+        """
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(content_hash)
+            
+            if entry is not None and os.path.exists(entry["path"]):
+                entry["refcount"] += 1
+                if source_path and os.path.abspath(source_path) != os.path.abspath(entry["path"]):
+                    os.remove(source_path)
+            
+            elif source_path:
+                path = os.path.join(self.uploads_dir, f"{content_hash}{extension.lower()}")
+                os.replace(source_path, path)
+                entry = {
+                    "path": path,
+                    "size": os.path.getsize(path),
+                    "refcount": 1,
+                    "created_at": datetime.utcnow().isoformat()
+                }
+                index[content_hash] = entry
+            
+            else:
+                return None
+            
+            self._write_index(index)
+            return entry["path"]
+    
+    def release(self, content_hash: str) -> bool:
+        """
+        Drop a reference to a blob, deleting it with the last one
+        
+        Args:
+            content_hash: Hex SHA-256 of the content
+        
+        Returns:
+            True if the blob was deleted
+        """
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(content_hash)
+            
+            if entry is None:
+                return False
+            
+            entry["refcount"] -= 1
+            if entry["refcount"] > 0:
+                self._write_index(index)
+                return False
+            
+            del index[content_hash]
+            self._write_index(index)
+            
+            # Still under the lock, or an acquire of the same content could
+            # move a new blob into this path first and lose it
+            if os.path.exists(entry["path"]):
+                os.remove(entry["path"])
+        return True
\ No newline at end of file
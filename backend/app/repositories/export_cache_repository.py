@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import threading
+from typing import List, Optional
+from datetime import datetime
+from app.config import settings
+
+class ExportCacheRepository:
+    """Size-bounded LRU index of exported files, keyed by content hash"""
+    
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.outputs_dir = settings.outputs_dir
+        self.index_file = os.path.join(settings.data_dir, "export_cache.json")
+        self.max_bytes = max_bytes if max_bytes is not None else settings.export_cache_max_bytes
+        self._lock = threading.Lock()
+        
+        os.makedirs(settings.data_dir, exist_ok=True)
+        
+        if not os.path.exists(self.index_file):
+            self._write_index({})
+    
+    def _read_index(self) -> dict:
+        """Read cache index"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _write_index(self, index: dict):
+        """Write cache index"""
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+    
+    def _path(self, filename: str) -> str:
+        """Absolute location of a cached file"""
+        return os.path.join(self.outputs_dir, filename)
+    
+    # ========== CACHE OPERATIONS ==========
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached export and mark it as recently used
+        
+        Args:
+            key: Export cache key
+        
+        Returns:
+            Cache entry with the output filenames, or None on a miss
+        """
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(key)
+            
+            if entry is None:
+                return None
+            
+            # Files removed behind our back invalidate the entry
+            if not all(os.path.exists(self._path(name)) for name in entry["files"]):
+                del index[key]
+                self._write_index(index)
+                return None
+            
+            entry["last_used_at"] = datetime.utcnow().isoformat()
+            self._write_index(index)
+            return entry
+    
+    def put(self, key: str, files: List[str]) -> dict:
+        """
+        Add exported files to the cache, evicting least recently used entries
+        
+        Args:
+            key: Export cache key
+            files: Output filenames, relative to the outputs directory
+        
+        Returns:
+            The new cache entry
+        """
+        now = datetime.utcnow().isoformat()
+        entry = {
+            "files": files,
+            "size": sum(self._size(self._path(name)) for name in files),
+            "created_at": now,
+            "last_used_at": now
+        }
+        
+        with self._lock:
+            index = self._read_index()
+            index[key] = entry
+            self._evict(index, keep=key)
+            self._write_index(index)
+        
+        return entry
+    
+    def total_size(self) -> int:
+        """Total bytes held by cached exports"""
+        with self._lock:
+            return sum(entry["size"] for entry in self._read_index().values())
+    
+    def _evict(self, index: dict, keep: str):
+        """Delete least recently used entries until the cache fits its budget"""
+        total = sum(entry["size"] for entry in index.values())
+        
+        for key in sorted(index, key=lambda k: index[k]["last_used_at"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            
+            entry = index.pop(key)
+            total -= entry["size"]
+            for name in entry["files"]:
+                path = self._path(name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+    
+    @staticmethod
+    def _size(path: str) -> int:
+        """Size of a file or directory tree in bytes, or 0 if missing"""
+        if os.path.isdir(path):
+            return sum(
+                ExportCacheRepository._size(os.path.join(root, name))
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
@@ -0,0 +1,175 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from app.config import settings
+
+# Row IDs pack the session ID above the segment index, so a session's rows
+# form one contiguous range that can be replaced without a table scan
+SEGMENT_BITS = 32
+
+# Quoted phrases and bare words of a search query
+QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+class SearchRepository:
+    """Full-text index of each session's latest subtitles, in SQLite FTS5"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.data_dir, "search.db")
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        # The index can be rebuilt from edits.json, so it skips syncing to
+        # disk on every commit
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_sessions "
+                "(session_id INTEGER PRIMARY KEY, edit_id INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5("
+                "text, edit_id UNINDEXED, start UNINDEXED, end UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+    
+    # ========== INDEX OPERATIONS ==========
+    
+    def index_session(self, session_id: int, edit_id: int, subtitle_data: List[dict]) -> bool:
+        """
+        Replace a session's indexed subtitles with those of an edit
+        
+        Args:
+            session_id: Session ID
+            edit_id: ID of the session's latest edit
+            subtitle_data: The edit's subtitles as stored
+        
+        Returns:
+            False if a later edit of the session is already indexed
+        """
+        base = session_id << SEGMENT_BITS
+        rows = [
+            (base + index, sub["text"], edit_id, sub["start"], sub["end"])
+            for index, sub in enumerate(subtitle_data)
+        ]
+        
+        with self._lock, self._connection:
+            indexed = self._connection.execute(
+                "SELECT edit_id FROM indexed_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            # Edit IDs only grow within a session
+            if indexed and indexed[0] > edit_id:
+                return False
+            
+            self._delete_rows(session_id)
+            self._connection.executemany(
+                "INSERT INTO segments (rowid, text, edit_id, start, end) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO indexed_sessions (session_id, edit_id) VALUES (?, ?)",
+                (session_id, edit_id)
+            )
+        return True
+    
+    def remove_session(self, session_id: int) -> None:
+        """Drop a session from the index"""
+        with self._lock, self._connection:
+            self._delete_rows(session_id)
+            self._connection.execute("DELETE FROM indexed_sessions WHERE session_id = ?", (session_id,))
+    
+    def sync(self, latest_edits: Dict[int, dict]) -> int:
+        """
+        Bring the index in line with every session's latest edit
+        
+        Only sessions whose latest edit is not the one indexed are
+        reindexed, so this is cheap once the index is built.
+        
+        Args:
+            latest_edits: Latest edit record of each session, by session ID
+        
+        Returns:
+            Number of sessions reindexed or removed
+        """
+        with self._lock:
+            indexed = dict(self._connection.execute("SELECT session_id, edit_id FROM indexed_sessions"))
+        
+        changed = 0
+        for session_id in indexed.keys() - latest_edits.keys():
+            self.remove_session(session_id)
+            changed += 1
+        for session_id, edit in latest_edits.items():
+            if indexed.get(session_id) != edit["id"]:
+                self.index_session(session_id, edit["id"], edit["subtitle_data"])
+                changed += 1
+        return changed
+    
+    def _delete_rows(self, session_id: int) -> None:
+        """Delete a session's segments; the caller holds the lock and transaction"""
+        base = session_id << SEGMENT_BITS
+        self._connection.execute(
+            "DELETE FROM segments WHERE rowid BETWEEN ? AND ?",
+            (base, base + (1 << SEGMENT_BITS) - 1)
+        )
+    
+    # ========== SEARCH ==========
+    
+    def search(self, query: str, limit: int = 50, session_id: Optional[int] = None) -> List[dict]:
+        """
+        Find subtitles containing every word of a query
+        
+        Words match whole tokens, ignoring case and accents; text in double
+        quotes matches as a phrase. Hits come in session and time order,
+        which lets SQLite stop at `limit` rather than rank every match.
+        
+        Args:
+            query: Search text
+            limit: Maximum number of hits
+            session_id: Only search this session
+        
+        Returns:
+            Hits with session_id, edit_id, index, start, end and text
+        
+        Raises:
+            ValueError: If the query has no words
+        """
+        expression = self._match_expression(query)
+        sql = "SELECT rowid, edit_id, start, end, text FROM segments WHERE segments MATCH ?"
+        params: list = [expression]
+        if session_id is not None:
+            base = session_id << SEGMENT_BITS
+            sql += " AND rowid BETWEEN ? AND ?"
+            params += [base, base + (1 << SEGMENT_BITS) - 1]
+        sql += " ORDER BY rowid LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        
+        mask = (1 << SEGMENT_BITS) - 1
+        return [
+            {
+                "session_id": rowid >> SEGMENT_BITS,
+                "edit_id": edit_id,
+                "index": rowid & mask,
+                "start": start,
+                "end": end,
+                "text": text
+            }
+            for rowid, edit_id, start, end, text in rows
+        ]
+    
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """FTS5 expression for a free-text query, safe from its syntax"""
+        terms = []
+        for phrase, word in QUERY_TERM.findall(query):
+            term = (phrase or word).strip()
+            if term:
+                terms.append('"' + term.replace('"', '""') + '"')
+        if not terms:
+            raise ValueError("Search query is empty")
+        return " ".join(terms)
\ No newline at end of file
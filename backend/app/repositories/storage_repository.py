@@ -1,26 +1,51 @@
 import json
 import os
-from typing import List, Optional
+import sqlite3
+import threading
+from typing import Dict, List, Optional
 from datetime import datetime
-from app.models import VideoSession, Edit, SubtitleSegment, StyleConfig
+from app.models import VideoSession, Edit, SubtitleSegment, StyleConfig, MediaInfo
 from app.config import settings
+from .search_repository import SearchRepository
+
+# Serializes read-modify-write of the JSON files, which background workers
+# update as well as request handlers
+_FILES_LOCK = threading.Lock()
 
 class StorageRepository:
     """Repository for file-based storage operations"""
     
-    def __init__(self):
+    def __init__(self, search_repo: Optional[SearchRepository] = None):
+        """
+        Args:
+            search_repo: Full-text index to keep up to date with each
+                session's latest edit
+        """
         self.data_dir = settings.data_dir
         self.sessions_file = os.path.join(self.data_dir, "sessions.json")
         self.edits_file = os.path.join(self.data_dir, "edits.json")
+        self.search_repo = search_repo
+        
+        # Bumped whenever a session's edits change, so readers can cache
+        # what they read from edits.json until then
+        self._edit_revisions: Dict[int, int] = {}
+        self._revision = 0
         
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
         
         # Initialize files if they don't exist
-        if not os.path.exists(self.sessions_file):
-            self._write_json(self.sessions_file, [])
-        if not os.path.exists(self.edits_file):
-            self._write_json(self.edits_file, [])
+        with _FILES_LOCK:
+            if not os.path.exists(self.sessions_file):
+                self._write_json(self.sessions_file, [])
+            if not os.path.exists(self.edits_file):
+                self._write_json(self.edits_file, [])
+        
+        # Index edits made before search existed or while it was failing
+        if self.search_repo:
+            changed = self.search_repo.sync(self.get_latest_edit_records())
+            if changed:
+                print(f"Search index: reindexed {changed} session(s)")
     
     def _read_json(self, filepath: str) -> List[dict]:
         """Read JSON file"""
@@ -31,30 +56,50 @@ class StorageRepository:
             return []
     
     def _write_json(self, filepath: str, data: List[dict]):
-        """Write JSON file"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """
+        Write JSON file
+        
+        The data goes to a temporary file that then replaces the old one,
+        so readers never see a half-written file.
+        """
+        part_path = filepath + ".part"
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(part_path, filepath)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
     
     # ========== SESSION OPERATIONS ==========
     
-    def create_session(self, video_filename: str, video_path: str) -> VideoSession:
+    def create_session(
+        self,
+        video_filename: str,
+        video_path: str,
+        media_info: Optional[MediaInfo] = None,
+        content_hash: Optional[str] = None
+    ) -> VideoSession:
         """Create a new video session"""
-        sessions = self._read_json(self.sessions_file)
-        
-        # Generate new ID
-        new_id = max([s.get('id', 0) for s in sessions], default=0) + 1
-        
-        # Create new session
-        session = VideoSession(
-            id=new_id,
-            video_filename=video_filename,
-            video_path=video_path,
-            created_at=datetime.utcnow().isoformat()
-        )
-        
-        # Add to sessions
-        sessions.append(session.model_dump())
-        self._write_json(self.sessions_file, sessions)
+        with _FILES_LOCK:
+            sessions = self._read_json(self.sessions_file)
+            
+            # Generate new ID
+            new_id = max([s.get('id', 0) for s in sessions], default=0) + 1
+            
+            # Create new session
+            session = VideoSession(
+                id=new_id,
+                video_filename=video_filename,
+                video_path=video_path,
+                created_at=datetime.utcnow().isoformat(),
+                content_hash=content_hash,
+                media_info=media_info
+            )
+            
+            # Add to sessions
+            sessions.append(session.model_dump())
+            self._write_json(self.sessions_file, sessions)
         
         return session
     
@@ -73,15 +118,40 @@ class StorageRepository:
         sessions = self._read_json(self.sessions_file)
         return [VideoSession(**s) for s in sessions]
     
-    def delete_session(self, session_id: int) -> bool:
-        """Delete a session"""
+    def find_session_by_content_hash(self, content_hash: str) -> Optional[VideoSession]:
+        """Get the most recent session of a video, by content hash"""
         sessions = self._read_json(self.sessions_file)
-        original_length = len(sessions)
-        sessions = [s for s in sessions if s['id'] != session_id]
         
-        if len(sessions) < original_length:
-            self._write_json(self.sessions_file, sessions)
-            return True
+        for session_data in reversed(sessions):
+            if session_data.get('content_hash') == content_hash:
+                return VideoSession(**session_data)
+        
+        return None
+    
+    def update_session(self, session_id: int, **fields) -> Optional[VideoSession]:
+        """Update fields of a session"""
+        with _FILES_LOCK:
+            sessions = self._read_json(self.sessions_file)
+            
+            for index, session_data in enumerate(sessions):
+                if session_data['id'] == session_id:
+                    session = VideoSession(**{**session_data, **fields})
+                    sessions[index] = session.model_dump()
+                    self._write_json(self.sessions_file, sessions)
+                    return session
+        
+        return None
+    
+    def delete_session(self, session_id: int) -> bool:
+        """Delete a session"""
+        with _FILES_LOCK:
+            sessions = self._read_json(self.sessions_file)
+            original_length = len(sessions)
+            sessions = [s for s in sessions if s['id'] != session_id]
+            
+            if len(sessions) < original_length:
+                self._write_json(self.sessions_file, sessions)
+                return True
         return False
     
     # ========== EDIT OPERATIONS ==========
@@ -94,68 +164,168 @@ class StorageRepository:
         style_config: StyleConfig
     ) -> Edit:
         """Create a new edit"""
-        edits = self._read_json(self.edits_file)
+        with _FILES_LOCK:
+            edits = self._read_json(self.edits_file)
+            
+            # Generate new ID
+            new_id = max([e.get('id', 0) for e in edits], default=0) + 1
+            
+            # Create new edit
+            edit = Edit(
+                id=new_id,
+                session_id=session_id,
+                user_message=user_message,
+                subtitle_data=subtitle_data,
+                style_config=style_config,
+                created_at=datetime.utcnow().isoformat()
+            )
+            
+            # Add to edits
+            edit_data = edit.model_dump()
+            edits.append(edit_data)
+            self._write_json(self.edits_file, edits)
+            self._bump_edit_revision(session_id)
         
-        # Generate new ID
-        new_id = max([e.get('id', 0) for e in edits], default=0) + 1
+        self._index_edit(edit_data)
         
-        # Create new edit
-        edit = Edit(
-            id=new_id,
-            session_id=session_id,
-            user_message=user_message,
-            subtitle_data=subtitle_data,
-            style_config=style_config,
-            created_at=datetime.utcnow().isoformat()
-        )
+        return edit
+    
+    def create_edit_record(
+        self,
+        session_id: int,
+        user_message: str,
+        subtitle_data: List[dict],
+        style_config: dict
+    ) -> dict:
+        """
+        Create a new edit from subtitles and style already in stored form
         
-        # Add to edits
-        edits.append(edit.model_dump())
-        self._write_json(self.edits_file, edits)
+        For subtitles that were validated as a SubtitleTrack, which would
+        otherwise be turned into a model per subtitle and back.
+        """
+        with _FILES_LOCK:
+            edits = self._read_json(self.edits_file)
+            
+            # Generate new ID
+            new_id = max([e.get('id', 0) for e in edits], default=0) + 1
+            
+            edit_data = {
+                'id': new_id,
+                'session_id': session_id,
+                'user_message': user_message,
+                'subtitle_data': subtitle_data,
+                'style_config': style_config,
+                'created_at': datetime.utcnow().isoformat()
+            }
+            
+            # Add to edits
+            edits.append(edit_data)
+            self._write_json(self.edits_file, edits)
+            self._bump_edit_revision(session_id)
         
-        return edit
+        self._index_edit(edit_data)
+        
+        return edit_data
     
     def get_edits_by_session(self, session_id: int) -> List[Edit]:
         """Get all edits for a session"""
+        return [Edit(**e) for e in self.get_edit_records(session_id)]
+    
+    def get_edit_records(self, session_id: int) -> List[dict]:
+        """
+        Get all edits for a session as stored, oldest first
+        
+        Callers that only pass edits on as JSON, or read subtitles into a
+        SubtitleTrack, skip building a model per subtitle.
+        """
         edits = self._read_json(self.edits_file)
         
-        session_edits = [
-            Edit(**e) for e in edits 
-            if e['session_id'] == session_id
-        ]
+        session_edits = [e for e in edits if e['session_id'] == session_id]
         
         # Sort by created_at
-        session_edits.sort(key=lambda x: x.created_at)
+        session_edits.sort(key=lambda x: x['created_at'])
         
         return session_edits
     
     def get_latest_edit(self, session_id: int) -> Optional[Edit]:
         """Get the most recent edit for a session"""
-        edits = self.get_edits_by_session(session_id)
+        edit_data = self.get_latest_edit_record(session_id)
+        return Edit(**edit_data) if edit_data else None
+    
+    def get_latest_edit_record(self, session_id: int) -> Optional[dict]:
+        """Get the most recent edit for a session as stored"""
+        edits = self.get_edit_records(session_id)
         
         if edits:
             return edits[-1]  # Last edit (most recent)
         
         return None
     
+    def get_latest_edit_records(self) -> Dict[int, dict]:
+        """Get the most recent edit of every session as stored, by session ID"""
+        latest = {}
+        for edit_data in self._read_json(self.edits_file):
+            current = latest.get(edit_data['session_id'])
+            if current is None or edit_data['created_at'] >= current['created_at']:
+                latest[edit_data['session_id']] = edit_data
+        return latest
+    
     def get_edit_by_id(self, edit_id: int) -> Optional[Edit]:
         """Get a specific edit by ID"""
+        edit_data = self.get_edit_record(edit_id)
+        return Edit(**edit_data) if edit_data else None
+    
+    def get_edit_record(self, edit_id: int) -> Optional[dict]:
+        """Get a specific edit by ID as stored"""
         edits = self._read_json(self.edits_file)
         
         for edit_data in edits:
             if edit_data['id'] == edit_id:
-                return Edit(**edit_data)
+                return edit_data
         
         return None
     
+    def get_edit_revision(self, session_id: int) -> int:
+        """
+        Revision of a session's edits, held in memory
+        
+        It changes every time an edit of the session is saved or deleted,
+        and is never reused, so it can key anything derived from them.
+        """
+        return self._edit_revisions.get(session_id, 0)
+    
+    def _bump_edit_revision(self, session_id: int):
+        """Mark a session's edits as changed; the caller holds _FILES_LOCK"""
+        self._revision += 1
+        self._edit_revisions[session_id] = self._revision
+    
     def delete_edits_by_session(self, session_id: int) -> int:
         """Delete all edits for a session"""
-        edits = self._read_json(self.edits_file)
-        original_length = len(edits)
-        edits = [e for e in edits if e['session_id'] != session_id]
+        with _FILES_LOCK:
+            edits = self._read_json(self.edits_file)
+            original_length = len(edits)
+            edits = [e for e in edits if e['session_id'] != session_id]
+            
+            deleted_count = original_length - len(edits)
+            if deleted_count > 0:
+                self._write_json(self.edits_file, edits)
+            self._bump_edit_revision(session_id)
         
-        deleted_count = original_length - len(edits)
-        if deleted_count > 0:
-            self._write_json(self.edits_file, edits)
+        if self.search_repo:
+            try:
+                self.search_repo.remove_session(session_id)
+            except sqlite3.Error as e:
+                print(f"Search index: failed to remove session {session_id}: {e}")
         
-        return deleted_count
\ No newline at end of file
+        return deleted_count
+    
+    def _index_edit(self, edit_data: dict):
+        """Make a new edit its session's searchable subtitles"""
+        if not self.search_repo:
+            return
+        
+        # The edit is saved either way; the next startup sync catches up
+        try:
+            self.search_repo.index_session(edit_data['session_id'], edit_data['id'], edit_data['subtitle_data'])
+        except sqlite3.Error as e:
+            print(f"Search index: failed to index edit {edit_data['id']}: {e}")
\ No newline at end of file
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from typing import List, Optional
+from datetime import datetime
+from app.models import Upload
+from app.config import settings
+
+class UploadRepository:
+    """Repository for the state of resumable uploads"""
+    
+    def __init__(self):
+        self.uploads_file = os.path.join(settings.data_dir, "uploads.json")
+        self._lock = threading.Lock()
+        
+        os.makedirs(settings.data_dir, exist_ok=True)
+        
+        if not os.path.exists(self.uploads_file):
+            self._write_json([])
+    
+    def _read_json(self) -> List[dict]:
+        """Read uploads file"""
+        try:
+            with open(self.uploads_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+    
+    def _write_json(self, data: List[dict]):
+        """
+        Write uploads file
+        
+        The data goes to a temporary file that then replaces the old one,
+        so a crash mid-write cannot lose every upload in progress.
+        """
+        part_path = self.uploads_file + ".part"
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(part_path, self.uploads_file)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    def create_upload(
+        self,
+        upload_id: str,
+        filename: str,
+        path: str,
+        length: Optional[int],
+        sha256: Optional[str] = None
+    ) -> Upload:
+        """Create a new upload"""
+        now = datetime.utcnow().isoformat()
+        upload = Upload(
+            id=upload_id,
+            filename=filename,
+            path=path,
+            length=length,
+            sha256=sha256,
+            created_at=now,
+            updated_at=now
+        )
+        
+        with self._lock:
+            uploads = self._read_json()
+            uploads.append(upload.model_dump())
+            self._write_json(uploads)
+        
+        return upload
+    
+    def get_upload(self, upload_id: str) -> Optional[Upload]:
+        """Get an upload by ID"""
+        for upload_data in self._read_json():
+            if upload_data['id'] == upload_id:
+                return Upload(**upload_data)
+        return None
+    
+    def get_all_uploads(self) -> List[Upload]:
+        """Get all uploads"""
+        return [Upload(**u) for u in self._read_json()]
+    
+    def update_upload(self, upload_id: str, **fields) -> Optional[Upload]:
+        """Update fields of an upload"""
+        with self._lock:
+            uploads = self._read_json()
+            
+            for index, upload_data in enumerate(uploads):
+                if upload_data['id'] == upload_id:
+                    upload = Upload(**{
+                        **upload_data,
+                        **fields,
+                        "updated_at": datetime.utcnow().isoformat()
+                    })
+                    uploads[index] = upload.model_dump()
+                    self._write_json(uploads)
+                    return upload
+        
+        return None
+    
+    def delete_upload(self, upload_id: str) -> bool:
+        """Delete an upload"""
+        with self._lock:
+            uploads = self._read_json()
+            remaining = [u for u in uploads if u['id'] != upload_id]
+            
+            if len(remaining) < len(uploads):
+                self._write_json(remaining)
+                return True
+            return False
\ No newline at end of file
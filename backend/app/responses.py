@@ -0,0 +1,26 @@
+from typing import Any
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def _default(obj: Any) -> Any:
+    """Serialize what orjson does not know natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class JSONResponse(ORJSONResponse):
+    """
+    orjson-rendered JSON response that also accepts pydantic models
+    
+    It is the app's default response class. Endpoints with large payloads,
+    such as subtitle tracks, return it directly, which skips FastAPI's
+    jsonable_encoder pass over every segment.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
\ No newline at end of file
@@ -1,8 +1,21 @@
 from .video_service import VideoService
+from .subtitle_service import SubtitleService
 from .transcription_service import TranscriptionService, transcription_service
+from .media_service import MediaService, media_service
+from .preview_service import PreviewService, preview_service
+from .subtitle_index_service import SubtitleIndex, SubtitleIndexService, subtitle_index_service
+from .timing_service import TimingService
+from .subtitle_import_service import SubtitleImportService, SubtitleImportError
+from .waveform_service import WaveformService, WaveformError, waveform_service
+from .scene_service import SceneService, SceneDetectionError, scene_service
+from .upload_service import UploadService, UploadConflictError, UploadIntegrityError, upload_service
 from .llm_service import LLMService
+from .segmented_export_service import SegmentedExportService
+from .export_service import ExportService, ExportQueueFullError
+from .progress_service import ProgressBroker, progress_broker
 
 video_service = VideoService()
+export_service = ExportService()
 # Lazy load LLM service to avoid initialization errors
 llm_service = None
 
@@ -16,7 +29,34 @@ __all__ = [
     "video_service", 
     "get_llm_service", 
     "transcription_service",
+    "export_service",
+    "media_service",
+    "preview_service",
+    "subtitle_index_service",
+    "waveform_service",
+    "scene_service",
+    "upload_service",
+    "progress_broker",
     "VideoService", 
+    "SubtitleService",
     "LLMService",
-    "TranscriptionService"
+    "TranscriptionService",
+    "ExportService",
+    "MediaService",
+    "PreviewService",
+    "SubtitleIndex",
+    "SubtitleIndexService",
+    "TimingService",
+    "SubtitleImportService",
+    "WaveformService",
+    "SceneService",
+    "UploadService",
+    "SegmentedExportService",
+    "ExportQueueFullError",
+    "UploadConflictError",
+    "UploadIntegrityError",
+    "SubtitleImportError",
+    "SceneDetectionError",
+    "WaveformError",
+    "ProgressBroker"
 ]
\ No newline at end of file
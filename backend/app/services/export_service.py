@@ -0,0 +1,546 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.models import VideoSession, Edit, ExportJob, ExportOptions, ExportOutput, ExportStatus, ExportMode, ExportContainer
+from app.config import settings, EncodeProfile
+from app.repositories import export_cache_repo, storage_repo
+from .video_service import VideoService
+from .segmented_export_service import SegmentedExportService
+from .progress_service import progress_broker
+from .media_service import media_service
+
+# Part of every cache key; bump when the export pipeline changes its output
+ENCODE_SETTINGS = {
+    "audio": "copy",
+    "version": 2
+}
+
+class ExportQueueFullError(Exception):
+    """Raised when no more export jobs can be queued"""
+
+class ExportService:
+    """Service for running video exports as background jobs"""
+    
+    def __init__(self):
+        # FFmpeg does the heavy lifting in its own process, so a thread per
+        # running export is enough to bound how many encodes run at once
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.export_max_workers,
+            thread_name_prefix="export"
+        )
+        self._segmented = SegmentedExportService()
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._processes: Dict[str, List[subprocess.Popen]] = {}
+        self._latest_by_session: Dict[int, str] = {}
+        self._cache_keys: Dict[str, str] = {}
+        
+        # Encode speed samples (x realtime) for capacity planning
+        self._encode_speeds: deque = deque(maxlen=500)
+        self._outcomes = {status: 0 for status in ExportStatus}
+    
+    # ========== JOB OPERATIONS ==========
+    
+    def submit(
+        self,
+        session: VideoSession,
+        edit: Edit,
+        options: Optional[ExportOptions] = None
+    ) -> ExportJob:
+        """
+        Queue an export of a session's edit
+        
+        An identical export (same video, subtitles, style and encode
+        settings) is served from the export cache, or joined if it is
+        already running for the session. Any other export of the same
+        session that is still queued or running is cancelled and marked as
+        superseded by the new job.
+        
+        Args:
+            session: Session to export
+            edit: Edit whose subtitles and style are burned in
+            options: Export settings, defaults if omitted
+        
+        Returns:
+            The queued export job, already done on a cache hit
+        """
+        options = options or ExportOptions()
+        key = self._cache_key(session, edit, options)
+        cached = export_cache_repo.get(key) if settings.export_cache_enabled else None
+        
+        with self._lock:
+            previous = self._jobs.get(self._latest_by_session.get(session.id, ""))
+            previous_active = previous is not None and previous.is_active
+            
+            # Repeated click while the same export is still running
+            if previous_active and self._cache_keys.get(previous.id) == key:
+                return previous.model_copy()
+            
+            active = sum(1 for job in self._jobs.values() if job.is_active)
+            if previous_active:
+                active -= 1
+            
+            if cached is None and active >= settings.export_max_pending_jobs:
+                raise ExportQueueFullError("Too many exports in progress. Please try again shortly.")
+            
+            now = datetime.utcnow().isoformat()
+            job = ExportJob(
+                id=uuid.uuid4().hex,
+                session_id=session.id,
+                edit_id=edit.id,
+                created_at=now
+            )
+            self._jobs[job.id] = job
+            self._cache_keys[job.id] = key
+            self._latest_by_session[session.id] = job.id
+            
+            if cached is not None:
+                job.status = ExportStatus.DONE
+                job.progress = 1.0
+                job.outputs = self._outputs(key, options)
+                job.download_url = job.outputs[0].download_url
+                job.cached = True
+                job.started_at = now
+                job.finished_at = now
+                self._outcomes[ExportStatus.DONE] += 1
+            else:
+                self._futures[job.id] = self._executor.submit(
+                    self._run,
+                    job.id,
+                    session,
+                    edit,
+                    options,
+                    key
+                )
+            
+            self._prune()
+            snapshot = job.model_copy()
+        
+        self._publish(snapshot)
+        
+        if previous_active:
+            self.cancel(previous.id, superseded_by=job.id)
+        
+        return snapshot
+    
+    def get_job(self, job_id: str) -> Optional[ExportJob]:
+        """Get a job by ID"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+    
+    def get_latest_job(self, session_id: int) -> Optional[ExportJob]:
+        """Get the most recent job for a session"""
+        with self._lock:
+            job = self._jobs.get(self._latest_by_session.get(session_id, ""))
+            return job.model_copy() if job else None
+    
+    def cancel(self, job_id: str, superseded_by: Optional[str] = None) -> Optional[ExportJob]:
+        """
+        Cancel a queued or running job
+        
+        Args:
+            job_id: Job to cancel
+            superseded_by: ID of the job replacing this one, if any
+        
+        Returns:
+            The job after cancellation, or None if it does not exist
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            
+            if not job.is_active:
+                return job.model_copy()
+            
+            job.status = ExportStatus.CANCELLED
+            job.superseded_by = superseded_by
+            job.finished_at = datetime.utcnow().isoformat()
+            self._outcomes[ExportStatus.CANCELLED] += 1
+            
+            future = self._futures.get(job_id)
+            processes = list(self._processes.get(job_id, []))
+            snapshot = job.model_copy()
+        
+        self._publish(snapshot)
+        
+        if future is not None:
+            future.cancel()
+        
+        for process in processes:
+            self._terminate(process)
+        
+        return snapshot
+    
+    def cancel_session(self, session_id: int) -> None:
+        """Cancel the active export of a session, if any"""
+        job = self.get_latest_job(session_id)
+        if job is not None and job.is_active:
+            self.cancel(job.id)
+    
+    def discard_session(self, session_id: int) -> None:
+        """Cancel a session's active export and delete its cached segments"""
+        self.cancel_session(session_id)
+        self._segmented.discard_session(session_id)
+    
+    def get_metrics(self) -> dict:
+        """
+        Summarize export outcomes and encode speed
+        
+        Returns:
+            Job counts by outcome and encode speed statistics (x realtime)
+        """
+        with self._lock:
+            speeds = sorted(self._encode_speeds)
+            outcomes = {status.value: count for status, count in self._outcomes.items()}
+            active = sum(1 for job in self._jobs.values() if job.is_active)
+        
+        def percentile(fraction: float) -> Optional[float]:
+            if not speeds:
+                return None
+            return speeds[min(int(fraction * len(speeds)), len(speeds) - 1)]
+        
+        return {
+            "active_jobs": active,
+            "outcomes": {
+                status: count for status, count in outcomes.items()
+                if status not in (ExportStatus.QUEUED.value, ExportStatus.RUNNING.value)
+            },
+            "encode_speed": {
+                "samples": len(speeds),
+                "mean": sum(speeds) / len(speeds) if speeds else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "last": self._encode_speeds[-1] if self._encode_speeds else None
+            }
+        }
+    
+    # ========== WORKER ==========
+    
+    def _run(
+        self,
+        job_id: str,
+        session: VideoSession,
+        edit: Edit,
+        options: ExportOptions,
+        key: str
+    ) -> None:
+        """Run an export job on a worker thread"""
+        video_path = session.video_path
+        
+        # Encode under a job-specific name and publish under the cache key
+        # only once complete, so a partial file is never served
+        extension = options.container.value
+        output_files = self._output_files(key, options)
+        part_paths = [
+            os.path.join(settings.outputs_dir, f"{job_id}.part.{index}.{extension}")
+            for index in range(len(output_files))
+        ]
+        output_path = part_paths[0]
+        
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status != ExportStatus.QUEUED:
+                return
+            job.status = ExportStatus.RUNNING
+            job.started_at = datetime.utcnow().isoformat()
+            snapshot = job.model_copy()
+        
+        self._publish(snapshot)
+        started = time.monotonic()
+        
+        try:
+            os.makedirs(settings.outputs_dir, exist_ok=True)
+            
+            media_info = media_service.find_media_info(session)
+            duration = media_info.duration if media_info else None
+            
+            on_process = lambda process: self._track_process(job_id, process)
+            on_progress = lambda report: self._report_progress(job_id, report)
+            profile = self.get_profile(options.profile)
+            
+            if options.container == ExportContainer.HLS:
+                variants = [
+                    (rendition.name, rendition_profile)
+                    for rendition, rendition_profile in zip(options.renditions, self._rendition_profiles(options))
+                ]
+                VideoService.render_hls(
+                    video_path=video_path,
+                    subtitles=edit.subtitle_data,
+                    style=edit.style_config,
+                    output_dir=output_path,
+                    variants=variants or [("video", profile)],
+                    segment_seconds=settings.export_hls_segment_seconds,
+                    has_audio=media_info.has_audio if media_info else None,
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    duration=duration
+                )
+            elif options.renditions:
+                VideoService.render_renditions(
+                    video_path=video_path,
+                    subtitles=edit.subtitle_data,
+                    style=edit.style_config,
+                    outputs=list(zip(part_paths, self._rendition_profiles(options))),
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    duration=duration
+                )
+            elif options.mode == ExportMode.SOFT:
+                VideoService.mux_subtitles(
+                    video_path=video_path,
+                    subtitles=edit.subtitle_data,
+                    style=edit.style_config,
+                    output_path=output_path,
+                    container=extension,
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    duration=duration
+                )
+            elif (options.parallel or settings.export_segments_reuse) and duration:
+                self._segmented.export(
+                    video_path=video_path,
+                    subtitles=edit.subtitle_data,
+                    style=edit.style_config,
+                    output_path=output_path,
+                    duration=duration,
+                    workers=None if options.parallel else 1,
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    session_id=edit.session_id,
+                    encode_settings=self._encode_settings(options),
+                    profile=profile,
+                    media_info=media_info.model_copy(
+                        update={"keyframes": media_service.get_keyframes(session)}
+                    ) if media_info else None
+                )
+                self._segmented.prune(
+                    {s.id for s in storage_repo.get_all_sessions()},
+                    keep=edit.session_id
+                )
+            else:
+                VideoService.overlay_subtitles(
+                    video_path=video_path,
+                    subtitles=edit.subtitle_data,
+                    style=edit.style_config,
+                    output_path=output_path,
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    duration=duration,
+                    profile=profile
+                )
+        
+        except Exception as e:
+            for part_path in part_paths:
+                self._remove_file(part_path)
+            self._finish(
+                job_id,
+                ExportStatus.FAILED,
+                error=f"Video processing failed: {str(e)}"
+            )
+            return
+        
+        finally:
+            with self._lock:
+                self._processes.pop(job_id, None)
+        
+        elapsed = time.monotonic() - started
+        encode_speed = duration / elapsed if duration and elapsed > 0 else None
+        
+        # Keep the result even if the job was cancelled meanwhile; it is a
+        # valid export for the next identical request
+        for part_path, (_, filename) in zip(part_paths, output_files):
+            target = os.path.join(settings.outputs_dir, filename)
+            self._remove_file(target)
+            os.replace(part_path, target)
+        if settings.export_cache_enabled:
+            export_cache_repo.put(key, [filename for _, filename in output_files])
+        
+        outputs = self._outputs(key, options)
+        self._finish(
+            job_id,
+            ExportStatus.DONE,
+            progress=1.0,
+            download_url=outputs[0].download_url,
+            outputs=outputs,
+            encode_speed=encode_speed
+        )
+    
+    def _report_progress(self, job_id: str, report: dict) -> None:
+        """Apply an FFmpeg progress report to a running job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != ExportStatus.RUNNING:
+                return
+            
+            if report["progress"] is not None:
+                # Keep the final 100% for when the output is actually ready
+                job.progress = min(report["progress"], 0.99)
+            job.out_time = report["out_time"]
+            job.fps = report["fps"]
+            job.speed = report["speed"]
+            snapshot = job.model_copy()
+        
+        self._publish(snapshot)
+    
+    def _finish(self, job_id: str, status: ExportStatus, **fields) -> bool:
+        """
+        Move a running job to a final state
+        
+        Returns:
+            False if the job was cancelled in the meantime
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status == ExportStatus.CANCELLED:
+                return False
+            
+            job.status = status
+            job.finished_at = datetime.utcnow().isoformat()
+            for name, value in fields.items():
+                setattr(job, name, value)
+            
+            self._outcomes[status] += 1
+            if status == ExportStatus.DONE and job.encode_speed is not None:
+                self._encode_speeds.append(job.encode_speed)
+            snapshot = job.model_copy()
+        
+        self._publish(snapshot)
+        return True
+    
+    @staticmethod
+    def get_profile(name: Optional[str] = None) -> EncodeProfile:
+        """
+        Look up an encode profile
+        
+        Args:
+            name: Profile name, the configured default if omitted
+        
+        Returns:
+            The encode profile
+        """
+        name = name or settings.default_encode_profile
+        if name not in settings.encode_profiles:
+            raise Exception(f"Unknown encode profile: {name}")
+        return settings.encode_profiles[name]
+    
+    @staticmethod
+    def _encode_settings(options: ExportOptions) -> dict:
+        """Everything besides the source, subtitles and style that shapes the output"""
+        encode_settings = {**ENCODE_SETTINGS, **options.output_settings()}
+        
+        # Soft exports copy the video, so the profile does not apply to them
+        if options.mode == ExportMode.BURN:
+            encode_settings["profile"] = ExportService.get_profile(options.profile).model_dump()
+            encode_settings["renditions"] = [
+                profile.model_dump() for profile in ExportService._rendition_profiles(options)
+            ]
+        else:
+            encode_settings["profile"] = None
+        
+        return encode_settings
+    
+    @staticmethod
+    def _rendition_profiles(options: ExportOptions) -> List[EncodeProfile]:
+        """Encode profile of each requested rendition, with its height applied"""
+        profiles = []
+        for rendition in options.renditions:
+            profile = ExportService.get_profile(rendition.profile or options.profile)
+            if rendition.height:
+                profile = profile.model_copy(update={"height": rendition.height})
+            profiles.append(profile)
+        return profiles
+    
+    @staticmethod
+    def _output_files(key: str, options: ExportOptions) -> List[Tuple[str, str]]:
+        """Name and output filename of each file an export produces"""
+        extension = options.container.value
+        if options.container == ExportContainer.HLS:
+            # One directory holding the master playlist and every variant
+            return [("hls", f"{key}_hls")]
+        if not options.renditions:
+            return [("video", f"{key}.{extension}")]
+        return [
+            (rendition.name, f"{key}_{rendition.name}.{extension}")
+            for rendition in options.renditions
+        ]
+    
+    @staticmethod
+    def _outputs(key: str, options: ExportOptions) -> List[ExportOutput]:
+        """Downloadable outputs of an export"""
+        playlist = "/master.m3u8" if options.container == ExportContainer.HLS else ""
+        return [
+            ExportOutput(name=name, download_url=ExportService._download_url(filename) + playlist)
+            for name, filename in ExportService._output_files(key, options)
+        ]
+    
+    @staticmethod
+    def _cache_key(session: VideoSession, edit: Edit, options: ExportOptions) -> str:
+        """Hash of the source video identity, subtitles, style and encode settings"""
+        payload = {
+            "video": VideoService.file_identity(session.video_path),
+            "subtitles": [s.model_dump() for s in edit.subtitle_data],
+            "style": edit.style_config.model_dump(),
+            "encode": ExportService._encode_settings(options)
+        }
+        serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _download_url(filename: str) -> str:
+        """Public URL of a file in the outputs directory"""
+        return f"/{settings.outputs_dir}/{filename}"
+    
+    @staticmethod
+    def _publish(job: ExportJob) -> None:
+        """Publish a job snapshot to its job and session progress channels"""
+        event = job.model_dump(mode="json")
+        progress_broker.publish(f"export:{job.id}", event)
+        progress_broker.publish(f"session:{job.session_id}", event)
+    
+    def _track_process(self, job_id: str, process: subprocess.Popen) -> None:
+        """Remember a job's FFmpeg process so it can be cancelled"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            cancelled = job is None or job.status == ExportStatus.CANCELLED
+            if not cancelled:
+                self._processes.setdefault(job_id, []).append(process)
+        
+        if cancelled:
+            self._terminate(process)
+    
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        excess = len(self._jobs) - settings.export_job_history
+        
+        for job_id in finished[:max(excess, 0)]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+            self._cache_keys.pop(job_id, None)
+    
+    @staticmethod
+    def _terminate(process: subprocess.Popen) -> None:
+        """Stop an FFmpeg process if it is still running"""
+        if process.poll() is None:
+            process.terminate()
+    
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Delete a file, or an HLS output directory, if it exists"""
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
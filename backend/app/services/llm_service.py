@@ -2,14 +2,17 @@ from typing import TypedDict, List, Annotated
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from app.models import SubtitleSegment, StyleConfig
+from app.models import SubtitleSegment, SubtitleTrack, StyleConfig
 from app.config import settings
 from app.repositories import storage_repo
+from .timing_service import TimingService
+from .scene_service import scene_service, SceneDetectionError
 from app.prompts import (
     INTENT_DETECTION_PROMPT,
     SUBTITLE_GENERATION_PROMPT,
     STYLE_MODIFICATION_PROMPT,
     CONTENT_MODIFICATION_PROMPT,
+    TIMING_ADJUSTMENT_PROMPT,
 )
 import json
 import re
@@ -49,6 +52,7 @@ class LLMService:
         workflow.add_node("transcribe_audio", self._transcribe_audio)
         workflow.add_node("modify_style", self._modify_style)
         workflow.add_node("modify_content", self._modify_content)
+        workflow.add_node("adjust_timing", self._adjust_timing)
         workflow.add_node("format_response", self._format_response)
         
         # Define edges
@@ -61,7 +65,8 @@ class LLMService:
                 "add_subtitles": "generate_subtitles",
                 "transcribe_audio": "transcribe_audio",
                 "modify_style": "modify_style",
-                "modify_content": "modify_content"
+                "modify_content": "modify_content",
+                "adjust_timing": "adjust_timing"
             }
         )
         
@@ -69,6 +74,7 @@ class LLMService:
         workflow.add_edge("transcribe_audio", "format_response")
         workflow.add_edge("modify_style", "format_response")
         workflow.add_edge("modify_content", "format_response")
+        workflow.add_edge("adjust_timing", "format_response")
         workflow.add_edge("format_response", END)
         
         return workflow.compile()
@@ -84,7 +90,7 @@ class LLMService:
         intent = response.content.strip().lower()
         
         # Ensure valid intent
-        valid_intents = ["transcribe_audio", "add_subtitles", "modify_style", "modify_content"]
+        valid_intents = ["transcribe_audio", "add_subtitles", "modify_style", "modify_content", "adjust_timing"]
         if intent not in valid_intents:
             intent = "add_subtitles"  # Default
         
@@ -156,8 +162,10 @@ class LLMService:
             if not video_path:
                 raise ValueError("Video path not provided")
             
-            # Generate subtitles from audio
-            subtitles = transcription_service.generate_subtitles_from_video(video_path)
+            # Generate subtitles from audio, reusing an upload-time prefetch
+            subtitles = transcription_service.get_subtitles_for_session(
+                state["session_id"], video_path
+            )
             state["subtitles"] = subtitles
             
             # Set default style
@@ -262,6 +270,56 @@ class LLMService:
         
         return state
     
+    def _adjust_timing(self, state: VideoEditState) -> VideoEditState:
+        """Shift, stretch, retime or snap existing subtitles without rewriting them"""
+        if state.get("previous_edits") and len(state["previous_edits"]) > 0:
+            last_edit = state["previous_edits"][-1]
+            track = SubtitleTrack.from_records(last_edit["subtitles"])
+            current_style = StyleConfig(**last_edit["style"])
+        else:
+            track = SubtitleTrack([], [], [])
+            current_style = StyleConfig()
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", TIMING_ADJUSTMENT_PROMPT),
+            ("user", "{message}")
+        ])
+        
+        # The LLM only reads the parameters; TimingService moves every subtitle
+        response = self.llm.invoke(prompt.format_messages(message=state["user_message"]))
+        
+        try:
+            content = response.content.strip()
+            # Remove markdown code blocks if present
+            content = re.sub(r'\s*|\s*```', '', content)
+            json_match = re.search(r'\{.*?\}', content, re.DOTALL)
+            if json_match:
+                content = json_match.group(0)
+            
+            params = json.loads(content)
+            summary = None
+            if params.get("operation") == "snap":
+                session = storage_repo.get_session_by_id(state["session_id"])
+                try:
+                    params["cuts"] = scene_service.get_cuts(session) if session else []
+                except SceneDetectionError:
+                    params["cuts"] = None
+                    summary = "Scene cuts could not be detected for this video, so the subtitles are unchanged."
+                if params.get("tolerance") is None:
+                    params["tolerance"] = settings.scene_snap_tolerance
+                if params["cuts"] is None and summary is None:
+                    summary = "Scene cuts are still being detected for this video, so the subtitles are unchanged. Try again in a moment."
+            if summary is None:
+                track, summary = TimingService.apply(track, params.get("operation"), params)
+            state["ai_response"] = summary
+        except Exception as e:
+            state["ai_response"] = "I couldn't work out that timing change, so the subtitles are unchanged."
+        
+        state["subtitles"] = track.to_segments()
+        state["style"] = current_style
+        
+        return state
+    
     def _format_response(self, state: VideoEditState) -> VideoEditState:
         """Format AI response to user"""
         if state["intent"] == "add_subtitles":
@@ -295,6 +353,9 @@ class LLMService:
                 parts.append(f"Outline: {style.outline_width}px {style.outline_color}")
             
             state["ai_response"] = "Style updated:\n" + "\n".join(parts)
+        elif state["intent"] == "adjust_timing":
+            # Summarised by _adjust_timing
+            pass
         else:
             state["ai_response"] = "Subtitles updated successfully!"
         
@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.models import VideoSession, MediaInfo, SubtitleSegment
+from app.config import settings
+from app.repositories import storage_repo
+from .video_service import VideoService
+
+class MediaService:
+    """Service for the probed media properties and derived media of sessions"""
+    
+    def __init__(self):
+        self.proxies_dir = os.path.join(settings.uploads_dir, "proxies")
+        self._proxy_executor = ThreadPoolExecutor(
+            max_workers=settings.proxy_workers,
+            thread_name_prefix="proxy"
+        )
+        # Keyed by video path, which sessions of the same upload share
+        self._proxy_jobs: Dict[str, Future] = {}
+        self._proxy_lock = threading.Lock()
+        # Next to the segment manifests, which are built from them
+        self.keyframes_dir = os.path.join(settings.data_dir, "segments", "keyframes")
+    
+    def get_media_info(self, session: VideoSession) -> MediaInfo:
+        """
+        Get a session's media info without re-probing the file
+        
+        Sessions created before uploads were probed are probed once here
+        and the result is stored on the session.
+        
+        Args:
+            session: Video session
+        
+        Returns:
+            The session's media info
+        """
+        if session.media_info is not None:
+            return session.media_info
+        
+        media_info = VideoService.probe_media(session.video_path)
+        self.store_keyframes(session.video_path, media_info.keyframes)
+        storage_repo.update_session(session.id, media_info=media_info)
+        return media_info
+    
+    def find_media_info(self, session: VideoSession) -> Optional[MediaInfo]:
+        """Get a session's media info, or None if the file cannot be probed"""
+        try:
+            return self.get_media_info(session)
+        except Exception as e:
+            print(f"Could not probe video of session {session.id}: {e}")
+            return None
+    
+    # ========== KEYFRAME OPERATIONS ==========
+    
+    def get_keyframes(self, session: VideoSession) -> List[float]:
+        """
+        Get the keyframe timestamps of a session's video
+        
+        The keyframe index can run to tens of thousands of entries, so it
+        is kept in a sidecar file per video instead of in sessions.json.
+        Videos without one are indexed once here.
+        
+        Args:
+            session: Video session
+        
+        Returns:
+            Sorted keyframe timestamps in seconds
+        """
+        try:
+            with open(self._keyframes_path(session.video_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        
+        # Sessions stored before the sidecar existed still carry the index
+        if session.media_info and session.media_info.keyframes:
+            keyframes = session.media_info.keyframes
+        else:
+            keyframes = VideoService.get_keyframe_times(session.video_path)
+        self.store_keyframes(session.video_path, keyframes)
+        return keyframes
+    
+    def store_keyframes(self, video_path: str, keyframes: List[float]) -> None:
+        """Write a video's keyframe sidecar"""
+        os.makedirs(self.keyframes_dir, exist_ok=True)
+        path = self._keyframes_path(video_path)
+        # Unique per thread, as uploads of the same video may race to write it
+        part_path = f"{path}.{threading.get_ident()}.part"
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                json.dump(keyframes, f)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    def discard_keyframes(self, session: VideoSession) -> None:
+        """Delete a video's keyframe sidecar, once the video itself is deleted"""
+        path = self._keyframes_path(session.video_path)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def _keyframes_path(self, video_path: str) -> str:
+        """Where the keyframe sidecar of a video is written"""
+        return os.path.join(self.keyframes_dir, f"{Path(video_path).stem}.json")
+    
+    # ========== PROXY OPERATIONS ==========
+    
+    def schedule_proxy(self, session: VideoSession) -> bool:
+        """
+        Start generating a session's editor proxy in the background
+        
+        Sources no taller than the proxy height are played as they are, and
+        a proxy made for another session of the same video is reused.
+        
+        Args:
+            session: Video session, with its media info
+        
+        Returns:
+            True if a proxy is being generated
+        """
+        media_info = session.media_info
+        if not settings.proxy_enabled or media_info is None or media_info.height <= settings.proxy_height:
+            return False
+        
+        proxy_path = self._proxy_path(session.video_path)
+        if os.path.exists(proxy_path):
+            storage_repo.update_session(session.id, proxy_path=proxy_path)
+            return False
+        
+        with self._proxy_lock:
+            if session.video_path not in self._proxy_jobs:
+                self._proxy_jobs[session.video_path] = self._proxy_executor.submit(
+                    self._build_proxy, session.video_path
+                )
+        return True
+    
+    def proxy_url(self, session: VideoSession) -> Optional[str]:
+        """Public URL of a session's proxy, or None if there is none yet"""
+        if not session.proxy_path or not os.path.exists(session.proxy_path):
+            return None
+        return f"/{settings.uploads_dir}/proxies/{Path(session.proxy_path).name}"
+    
+    def discard_proxy(self, session: VideoSession) -> None:
+        """Cancel a pending proxy and delete a generated one, once the video itself is deleted"""
+        with self._proxy_lock:
+            job = self._proxy_jobs.pop(session.video_path, None)
+        if job is not None:
+            job.cancel()
+        
+        proxy_path = session.proxy_path or self._proxy_path(session.video_path)
+        if os.path.exists(proxy_path):
+            os.remove(proxy_path)
+    
+    def _proxy_path(self, video_path: str) -> str:
+        """Where the proxy of a video is written"""
+        return os.path.join(self.proxies_dir, f"{Path(video_path).stem}.mp4")
+    
+    def _build_proxy(self, video_path: str) -> None:
+        """Encode a proxy and attach it to every session of the video"""
+        os.makedirs(self.proxies_dir, exist_ok=True)
+        proxy_path = self._proxy_path(video_path)
+        part_path = os.path.join(self.proxies_dir, f"{Path(video_path).stem}.part.mp4")
+        
+        try:
+            VideoService.create_proxy(
+                video_path,
+                part_path,
+                settings.proxy_height,
+                settings.proxy_keyframe_seconds
+            )
+            os.replace(part_path, proxy_path)
+            
+            # The sessions may have been deleted while encoding
+            sessions = [s for s in storage_repo.get_all_sessions() if s.video_path == video_path]
+            for session in sessions:
+                storage_repo.update_session(session.id, proxy_path=proxy_path)
+            if not sessions:
+                os.remove(proxy_path)
+        
+        except Exception as e:
+            print(f"Proxy generation failed for {video_path}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        
+        finally:
+            with self._proxy_lock:
+                self._proxy_jobs.pop(video_path, None)
+    
+    # ========== HELPERS ==========
+    
+    @staticmethod
+    def clamp_subtitles(
+        subtitles: List[SubtitleSegment],
+        duration: float
+    ) -> List[SubtitleSegment]:
+        """
+        Fit subtitles to a video's duration
+        
+        Subtitles starting at or after the end are dropped and subtitles
+        running past it are cut short.
+        
+        Args:
+            subtitles: Subtitle segments
+            duration: Video duration in seconds
+        
+        Returns:
+            Subtitles that lie within the video
+        """
+        return [
+            sub if sub.end <= duration else SubtitleSegment(start=sub.start, end=duration, text=sub.text)
+            for sub in subtitles
+            if sub.start < duration
+        ]
+
+# Singleton instance
+media_service = MediaService()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from app.models import VideoSession, SubtitleSegment, StyleConfig
+from app.config import settings
+from .subtitle_index_service import SubtitleIndex
+from .video_service import VideoService
+
+class PreviewService:
+    """Service for single styled preview frames, kept in an in-memory LRU cache"""
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else settings.preview_cache_entries
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def render(
+        self,
+        session: VideoSession,
+        subtitles: SubtitleIndex,
+        style: StyleConfig,
+        time: float
+    ) -> bytes:
+        """
+        Render the frame at `time` with the subtitles showing then burned in
+        
+        The editor proxy is used when there is one, since its short keyframe
+        interval keeps the decode after seeking to a few frames. Frames are
+        cached by video, time, the subtitles showing and the style, so
+        edits elsewhere in the video do not invalidate them.
+        
+        Args:
+            session: Video session
+            subtitles: Index of the edit's subtitles
+            style: Subtitle styling
+            time: Frame position in seconds
+        
+        Returns:
+            The frame as a JPEG
+        """
+        video_path = session.proxy_path
+        if not video_path or not os.path.exists(video_path):
+            video_path = session.video_path
+        
+        time = round(time, 3)
+        active = subtitles.track.take(subtitles.at(time)).to_segments()
+        key = self._cache_key(video_path, time, active, style)
+        
+        with self._lock:
+            frame = self._cache.get(key)
+            if frame is not None:
+                self._cache.move_to_end(key)
+                return frame
+        
+        # The seeked frame is at timestamp 0, so shift what is showing there
+        shifted = [
+            SubtitleSegment(start=0.0, end=sub.end - time, text=sub.text)
+            for sub in active
+        ]
+        fd, srt_path = tempfile.mkstemp(suffix='.srt')
+        os.close(fd)
+        frame = VideoService.render_frame(video_path, shifted, style, time, srt_path)
+        
+        with self._lock:
+            self._cache[key] = frame
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        
+        return frame
+    
+    def discard_video(self, video_path: str) -> None:
+        """Drop cached frames of a video, e.g. when its session is deleted"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == video_path]:
+                del self._cache[key]
+    
+    @staticmethod
+    def _cache_key(
+        video_path: str,
+        time: float,
+        active: List[SubtitleSegment],
+        style: StyleConfig
+    ) -> Tuple:
+        """Everything the rendered frame depends on"""
+        identity = VideoService.file_identity(video_path)
+        style_hash = hashlib.sha256(style.model_dump_json().encode('utf-8')).hexdigest()
+        return (
+            video_path,
+            identity["size"],
+            identity["mtime_ns"],
+            time,
+            tuple(sub.text for sub in active),
+            style_hash
+        )
+
+# Singleton instance
+preview_service = PreviewService()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+class ProgressBroker:
+    """In-process publish/subscribe hub for progress events"""
+    
+    def __init__(self, queue_size: int = 100, retained_channels: int = 1000):
+        self.queue_size = queue_size
+        self.retained_channels = retained_channels
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._last_events: "OrderedDict[str, dict]" = OrderedDict()
+    
+    def publish(self, channel: str, event: dict) -> None:
+        """
+        Publish an event to a channel
+        
+        Safe to call from worker threads; events are handed to each
+        subscriber's event loop. The latest event is retained so new
+        subscribers start from the current state.
+        
+        Args:
+            channel: Channel name, e.g. "export:<job_id>"
+            event: JSON-serializable event payload
+        """
+        with self._lock:
+            self._last_events[channel] = event
+            self._last_events.move_to_end(channel)
+            while len(self._last_events) > self.retained_channels:
+                self._last_events.popitem(last=False)
+            
+            subscribers = list(self._subscribers.get(channel, []))
+        
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+    
+    def last_event(self, channel: str) -> Optional[dict]:
+        """Get the most recent event published to a channel"""
+        with self._lock:
+            return self._last_events.get(channel)
+    
+    async def subscribe(
+        self,
+        channel: str,
+        heartbeat: float = 15.0
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        Stream events from a channel
+        
+        Args:
+            channel: Channel name
+            heartbeat: Seconds of silence after which None is yielded so
+                callers can keep the connection alive
+        
+        Yields:
+            Events as they are published, or None on heartbeat
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (loop, queue)
+        
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(subscriber)
+            last_event = self._last_events.get(channel)
+        
+        try:
+            if last_event is not None:
+                yield last_event
+            
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel, [])
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(channel, None)
+    
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        """Queue an event, dropping the oldest one if the subscriber lags"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+# Singleton instance
+progress_broker = ProgressBroker()
@@ -0,0 +1,208 @@
+import bisect
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+import ffmpeg
+import numpy as np
+from app.models import VideoSession
+from app.config import settings
+from app.repositories import storage_repo
+
+# Frame rate assumed when the video's could not be probed
+DEFAULT_FPS = 25.0
+
+class SceneDetectionError(Exception):
+    """Raised when a video's scene cuts could not be detected"""
+    pass
+
+class SceneService:
+    """Service for detecting scene cuts, once per video"""
+    
+    def __init__(self):
+        self.scenes_dir = os.path.join(settings.data_dir, "scenes")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.scene_workers,
+            thread_name_prefix="scenes"
+        )
+        # Keyed by cuts path, which sessions of the same upload share
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def cuts_path(self, session: VideoSession) -> str:
+        """Path of a session's scene cuts file, whether or not it exists yet"""
+        return os.path.join(self.scenes_dir, f"{Path(session.video_path).stem}.cuts.npy")
+    
+    @staticmethod
+    def _failure_path(cuts_path: str) -> str:
+        """Path of the marker recording why detecting a cuts file failed"""
+        return os.path.splitext(cuts_path)[0] + ".failed"
+    
+    def schedule(self, session: VideoSession) -> bool:
+        """
+        Start detecting a session's scene cuts in the background
+        
+        Args:
+            session: Video session
+        
+        Returns:
+            True if the cuts are being detected, False if they already
+            exist or detection failed
+        """
+        path = self.cuts_path(session)
+        if os.path.exists(path) or os.path.exists(self._failure_path(path)):
+            return False
+        
+        fps = session.media_info.fps if session.media_info and session.media_info.fps else DEFAULT_FPS
+        with self._lock:
+            if path not in self._jobs:
+                self._jobs[path] = self._executor.submit(self._build, session.video_path, path, fps)
+        return True
+    
+    def get_cuts(self, session: VideoSession, retry: bool = False) -> Optional[np.ndarray]:
+        """
+        A session's scene cuts, detecting them in the background if needed
+        
+        A failed detection is remembered, so a video FFmpeg cannot decode
+        is not decoded again on every request; it is only run again when
+        a retry is asked for.
+        
+        Args:
+            session: Video session
+            retry: Detect again if an earlier detection failed
+        
+        Returns:
+            Cut times in seconds, in increasing order, or None while they
+            are being detected
+        
+        Raises:
+            SceneDetectionError: If detection failed and no retry was asked for
+        """
+        path = self.cuts_path(session)
+        failure_path = self._failure_path(path)
+        if retry and os.path.exists(failure_path):
+            os.remove(failure_path)
+        
+        if self.schedule(session):
+            return None
+        if os.path.exists(path):
+            return np.load(path)
+        
+        with open(failure_path, 'r', encoding='utf-8') as f:
+            raise SceneDetectionError(f"Scene detection failed: {f.read()}")
+    
+    def discard(self, session: VideoSession) -> None:
+        """Cancel pending detection and delete detected cuts, once the video itself is deleted"""
+        path = self.cuts_path(session)
+        with self._lock:
+            job = self._jobs.pop(path, None)
+        if job is not None:
+            job.cancel()
+        
+        for stale in (path, self._failure_path(path)):
+            if os.path.exists(stale):
+                os.remove(stale)
+    
+    def _build(self, video_path: str, output_path: str, fps: float) -> None:
+        """Detect and write cuts for a background job, or the reason it failed"""
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        try:
+            try:
+                cuts = self.detect_cuts(video_path, fps)
+                written = output_path
+                with open(output_path + ".part", 'wb') as f:
+                    np.save(f, cuts)
+            except Exception as e:
+                written = self._failure_path(output_path)
+                with open(output_path + ".part", 'w', encoding='utf-8') as f:
+                    f.write(str(e) or type(e).__name__)
+            os.replace(output_path + ".part", written)
+            
+            # The video may have been deleted while detecting
+            if not any(s.video_path == video_path for s in storage_repo.get_all_sessions()):
+                os.remove(written)
+        finally:
+            with self._lock:
+                self._jobs.pop(output_path, None)
+    
+    # ========== DETECTION ==========
+    
+    def detect_cuts(self, video_path: str, fps: float) -> np.ndarray:
+        """
+        Find hard cuts by comparing consecutive frames
+        
+        FFmpeg decodes the video to tiny grayscale frames at a constant
+        frame rate, so frame i is shown at i / fps. Frames are read in
+        fixed-size chunks and each chunk is compared with the frame before
+        it in one array operation: a cut is a frame whose mean absolute
+        difference from the previous one passes the threshold. Of cuts
+        closer than the minimum scene length, only the strongest is kept,
+        which drops flashes and fast motion.
+        
+        Args:
+            video_path: Source video path
+            fps: Video frame rate
+        
+        Returns:
+            Cut times in seconds, in increasing order
+        """
+        width, height = settings.scene_width, settings.scene_height
+        frame_size = width * height
+        
+        process = (
+            ffmpeg
+            .input(video_path)
+            .filter('fps', fps=fps)
+            .filter('scale', width, height)
+            .output('pipe:', format='rawvideo', pix_fmt='gray', an=None)
+            .global_args('-v', 'error')
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+        
+        scores = []
+        previous = None
+        try:
+            while True:
+                data = process.stdout.read(settings.scene_chunk_frames * frame_size)
+                if len(data) < frame_size:
+                    break
+                frames = np.frombuffer(data[:len(data) // frame_size * frame_size], dtype=np.uint8)
+                frames = frames.reshape(-1, frame_size).astype(np.int16)
+                if previous is not None:
+                    frames = np.concatenate((previous, frames))
+                
+                scores.append(np.abs(np.diff(frames, axis=0)).mean(axis=1) / 255)
+                previous = frames[-1:]
+            
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise Exception(f"FFmpeg error: {stderr.decode(errors='replace').strip()}")
+        
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        
+        # scores[i] compares frames i and i + 1, so a cut there starts frame i + 1
+        scores = np.concatenate(scores) if scores else np.empty(0)
+        candidates = np.flatnonzero(scores >= settings.scene_threshold)
+        frames = self._strongest(candidates, scores[candidates], max(1, round(settings.scene_min_seconds * fps)))
+        return (frames + 1) / fps
+    
+    @staticmethod
+    def _strongest(frames: np.ndarray, scores: np.ndarray, min_gap: int) -> np.ndarray:
+        """Frames of the strongest cuts, greedily, so that no two are within min_gap"""
+        kept = []
+        for index in np.argsort(-scores, kind="stable").tolist():
+            frame = int(frames[index])
+            position = bisect.bisect_left(kept, frame)
+            if position > 0 and frame - kept[position - 1] < min_gap:
+                continue
+            if position < len(kept) and kept[position] - frame < min_gap:
+                continue
+            kept.insert(position, frame)
+        return np.array(kept, dtype=np.int64)
+
+# Singleton instance
+scene_service = SceneService()
\ No newline at end of file
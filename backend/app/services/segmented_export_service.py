@@ -0,0 +1,535 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import ffmpeg
+
+from app.models import SubtitleSegment, StyleConfig, MediaInfo
+from app.config import settings, EncodeProfile
+from .video_service import VideoService
+
+# Intermediate segment container, see VideoService.split_at_keyframes
+SEGMENT_FORMAT = "mpegts"
+SEGMENT_EXTENSION = ".ts"
+
+# Bump when the manifest layout changes so older manifests are re-split
+MANIFEST_VERSION = 3
+
+# H.264 profiles, as ffprobe names them, that libx264 can encode from
+# 8-bit 4:2:0 video, with the libx264 options that produce them. x264
+# signals the lowest profile its tools allow, so fast presets that turn
+# off CABAC or 8x8 transforms would otherwise come out as a lower profile
+COPYABLE_H264_PROFILES = {
+    "Constrained Baseline": {"profile:v": "baseline"},
+    "Baseline": {"profile:v": "baseline"},
+    "Main": {"profile:v": "main", "x264-params": "cabac=1"},
+    "High": {"profile:v": "high", "x264-params": "cabac=1:8x8dct=1"}
+}
+
+# Re-encoded segments are joined with H.264 segments copied from the
+# source, so they are H.264 even without a profile; FFmpeg would otherwise
+# pick MPEG-2, the MPEG-TS default
+DEFAULT_SEGMENT_PROFILE = EncodeProfile(video_codec="libx264", preset="medium", crf=23)
+
+class SegmentedExportService:
+    """Service for burning subtitles into keyframe-aligned segments in parallel"""
+    
+    def __init__(self):
+        self.segments_dir = os.path.join(settings.data_dir, "segments")
+        self._locks_guard = threading.Lock()
+        self._session_locks: Dict[int, threading.Lock] = {}
+    
+    @staticmethod
+    def plan_boundaries(
+        keyframes: List[float],
+        duration: float,
+        segment_count: int
+    ) -> List[float]:
+        """
+        Pick keyframes that split a video into roughly equal segments
+        
+        Args:
+            keyframes: Sorted keyframe timestamps in seconds
+            duration: Video duration in seconds
+            segment_count: Desired number of segments
+        
+        Returns:
+            Segment boundaries, starting at 0 and ending at the duration
+        """
+        candidates = [t for t in keyframes if 0 < t < duration]
+        cuts = set()
+        
+        for i in range(1, segment_count):
+            target = duration * i / segment_count
+            if candidates:
+                cuts.add(min(candidates, key=lambda t: abs(t - target)))
+        
+        return [0.0] + sorted(cuts) + [duration]
+    
+    @staticmethod
+    def shift_subtitles(
+        subtitles: List[SubtitleSegment],
+        start: float,
+        end: float
+    ) -> List[SubtitleSegment]:
+        """Subtitles visible within [start, end), re-timed relative to start"""
+        return [
+            SubtitleSegment(
+                start=max(sub.start, start) - start,
+                end=min(sub.end, end) - start,
+                text=sub.text
+            )
+            for sub in subtitles
+            if sub.end > start and sub.start < end
+        ]
+    
+    def export(
+        self,
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        output_path: str,
+        duration: float,
+        workers: Optional[int] = None,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        session_id: Optional[int] = None,
+        encode_settings: Optional[dict] = None,
+        profile: Optional[EncodeProfile] = None,
+        media_info: Optional[MediaInfo] = None
+    ) -> None:
+        """
+        Burn subtitles in parallel across keyframe-aligned segments
+        
+        The source is split losslessly at keyframes, segments with
+        subtitles are re-encoded concurrently with their subtitle times
+        shifted to the segment start, segments without subtitles are
+        stream-copied where the re-encoded ones can match their codec
+        parameters, and everything is concatenated without re-encoding.
+        
+        With a session_id, the split and the rendered segments are kept
+        under data/segments/ so the next export of the session re-encodes
+        only the segments whose subtitles, style or encode settings changed,
+        until prune() deletes them.
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitle segments to burn in
+            style: Subtitle styling
+            output_path: Destination video path
+            duration: Source duration in seconds
+            workers: Number of concurrent FFmpeg encodes
+            on_process: Called with every FFmpeg process started
+            on_progress: Called with aggregated progress reports
+            session_id: Session whose segments are reused between exports
+            encode_settings: Output settings that affect rendered segments
+            profile: Encode profile for re-encoded segments; H.264 at
+                DEFAULT_SEGMENT_PROFILE if omitted
+            media_info: Probed source properties; keyframes and codec are
+                probed if omitted
+        """
+        workers = workers or settings.export_parallel_workers
+        profile = profile or DEFAULT_SEGMENT_PROFILE
+        args = (video_path, subtitles, style, output_path, duration,
+                workers, encode_settings or {}, profile, media_info, on_process, on_progress)
+        
+        if session_id is None:
+            work_dir = tempfile.mkdtemp(prefix="videoable-export-")
+            try:
+                self._export_segments(work_dir, None, *args)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            return
+        
+        work_dir = self._session_dir(session_id)
+        with self._session_lock(session_id):
+            self._export_segments(work_dir, self._read_manifest(work_dir), *args)
+    
+    def discard_session(self, session_id: int) -> None:
+        """
+        Delete the segments kept for a session
+        
+        Args:
+            session_id: Session ID
+        """
+        with self._session_lock(session_id):
+            shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+        
+        with self._locks_guard:
+            self._session_locks.pop(session_id, None)
+    
+    def prune(self, live_sessions: Set[int], keep: Optional[int] = None) -> int:
+        """
+        Delete kept segments that are no longer worth their space
+        
+        Segments of sessions that no longer exist always go; then those of
+        the least recently exported sessions until the rest fit in
+        export_segments_max_bytes. Sessions being exported are skipped.
+        
+        Args:
+            live_sessions: IDs of existing sessions
+            keep: Session whose segments are kept regardless of size
+        
+        Returns:
+            Number of sessions whose segments were deleted
+        """
+        if not os.path.isdir(self.segments_dir):
+            return 0
+        
+        kept = []
+        for name in os.listdir(self.segments_dir):
+            # Other data lives alongside, e.g. keyframes/
+            if not name.isdigit():
+                continue
+            work_dir = self._session_dir(int(name))
+            manifest_path = os.path.join(work_dir, "manifest.json")
+            last_used = os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else 0.0
+            size = sum(
+                os.path.getsize(os.path.join(root, file))
+                for root, _, files in os.walk(work_dir)
+                for file in files
+            )
+            kept.append((last_used, int(name), size))
+        
+        total = sum(size for _, _, size in kept)
+        removed = 0
+        for _, session_id, size in sorted(kept):
+            if session_id in live_sessions and (total <= settings.export_segments_max_bytes or session_id == keep):
+                continue
+            
+            lock = self._session_lock(session_id)
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+            finally:
+                lock.release()
+            total -= size
+            removed += 1
+        return removed
+    
+    def _export_segments(
+        self,
+        work_dir: str,
+        manifest: Optional[dict],
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        output_path: str,
+        duration: float,
+        workers: int,
+        encode_settings: dict,
+        profile: EncodeProfile,
+        media_info: Optional[MediaInfo],
+        on_process: Optional[Callable[[subprocess.Popen], None]],
+        on_progress: Optional[Callable[[dict], None]]
+    ) -> None:
+        """Split the source (unless the previous split still applies), render and concatenate"""
+        source = VideoService.file_identity(video_path)
+        
+        if (
+            manifest
+            and manifest.get("version") == MANIFEST_VERSION
+            and manifest["source"] == source
+            and manifest["format"] == SEGMENT_FORMAT
+        ):
+            boundaries = manifest["boundaries"]
+            stream = manifest["stream"]
+            previous = {segment["index"]: segment for segment in manifest["segments"]}
+        else:
+            boundaries = self._plan_for(video_path, duration, workers, media_info)
+            
+            if len(boundaries) <= 2:
+                # Too short or too few keyframes to split; encode in one go
+                VideoService.overlay_subtitles(
+                    video_path=video_path,
+                    subtitles=subtitles,
+                    style=style,
+                    output_path=output_path,
+                    on_process=on_process,
+                    on_progress=on_progress,
+                    duration=duration,
+                    profile=profile
+                )
+                return
+            
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir, exist_ok=True)
+            
+            VideoService.split_at_keyframes(
+                video_path,
+                boundaries[1:-1],
+                os.path.join(work_dir, f"source_%04d{SEGMENT_EXTENSION}"),
+                SEGMENT_FORMAT
+            )
+            stream = self._stream_params(video_path, media_info)
+            previous = {}
+        
+        # Untouched source segments are only copied if re-encoded ones can
+        # be made to match them
+        output_options = self._matching_options(stream, profile)
+        
+        segments = [
+            (index, start, end)
+            for index, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+        ]
+        rendered = self._render_segments(
+            work_dir,
+            segments,
+            subtitles,
+            style,
+            workers,
+            duration,
+            output_options,
+            {**encode_settings, "output_options": output_options},
+            profile,
+            previous,
+            on_process,
+            on_progress
+        )
+        
+        VideoService.concat_segments(
+            [os.path.join(work_dir, segment["output"]) for segment in rendered],
+            output_path
+        )
+        
+        self._write_manifest(work_dir, {
+            "version": MANIFEST_VERSION,
+            "source": source,
+            "format": SEGMENT_FORMAT,
+            "boundaries": boundaries,
+            "stream": stream,
+            "segments": rendered
+        })
+        self._remove_stale_renders(work_dir, rendered)
+    
+    @staticmethod
+    def _plan_for(
+        video_path: str,
+        duration: float,
+        workers: int,
+        media_info: Optional[MediaInfo] = None
+    ) -> List[float]:
+        """
+        Segment boundaries for a source
+        
+        One segment per worker for throughput, but never longer than
+        export_segment_max_seconds so that a single edit re-renders only
+        a short stretch of video.
+        """
+        segment_count = max(
+            min(workers, int(duration // settings.export_segment_min_seconds)),
+            math.ceil(duration / settings.export_segment_max_seconds),
+            1
+        )
+        
+        if segment_count <= 1:
+            keyframes = []
+        elif media_info and media_info.keyframes:
+            keyframes = media_info.keyframes
+        else:
+            keyframes = VideoService.get_keyframe_times(video_path)
+        return SegmentedExportService.plan_boundaries(keyframes, duration, segment_count)
+    
+    @staticmethod
+    def _stream_params(video_path: str, media_info: Optional[MediaInfo] = None) -> dict:
+        """Codec parameters of a source's video stream, which its copied segments carry"""
+        if media_info and media_info.pix_fmt:
+            return {
+                "codec": media_info.video_codec,
+                "profile": media_info.video_profile,
+                "level": media_info.video_level,
+                "pix_fmt": media_info.pix_fmt,
+                "width": media_info.width,
+                "height": media_info.height,
+                "sample_aspect_ratio": media_info.sample_aspect_ratio
+            }
+        
+        # Sessions probed before these were recorded
+        try:
+            probe = ffmpeg.probe(video_path, select_streams='v:0')
+            video = probe['streams'][0]
+        except Exception:
+            return {}
+        return {
+            "codec": video.get('codec_name'),
+            "profile": video.get('profile'),
+            "level": video.get('level'),
+            "pix_fmt": video.get('pix_fmt'),
+            "width": video.get('width'),
+            "height": video.get('height'),
+            "sample_aspect_ratio": video.get('sample_aspect_ratio')
+        }
+    
+    @staticmethod
+    def _matching_options(stream: dict, profile: EncodeProfile) -> Optional[dict]:
+        """
+        FFmpeg options that make re-encoded segments match copied ones
+        
+        Segments are joined with the concat demuxer without re-encoding,
+        which players only accept if every segment has the same codec,
+        profile, level, pixel format, size and sample aspect ratio. The
+        encode keeps the source's size and aspect ratio unless the profile
+        scales, and always writes yuv420p, so the source must be 8-bit
+        4:2:0 H.264 in a profile libx264 can produce; its profile, the
+        tools that profile is signalled by, and level are then requested
+        explicitly.
+        
+        Args:
+            stream: Source parameters from _stream_params()
+            profile: Encode profile of re-encoded segments
+        
+        Returns:
+            Output options for re-encoded segments, or None if they cannot
+            match the source and every segment must be re-encoded
+        """
+        profile_options = COPYABLE_H264_PROFILES.get(stream.get("profile"))
+        level = stream.get("level")
+        width, height = stream.get("width") or 0, stream.get("height") or 0
+        
+        if (
+            stream.get("codec") != "h264"
+            or profile.video_codec != "libx264"
+            or profile.height
+            or stream.get("pix_fmt") != "yuv420p"
+            or profile_options is None
+            or not level or level <= 0
+            # libx264 cannot encode odd sizes at 4:2:0 without scaling
+            or not width or not height or width % 2 or height % 2
+        ):
+            return None
+        
+        return {**profile_options, "level": f"{level // 10}.{level % 10}"}
+    
+    def _render_segments(
+        self,
+        work_dir: str,
+        segments: List[Tuple[int, float, float]],
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        workers: int,
+        duration: float,
+        output_options: Optional[dict],
+        encode_settings: dict,
+        profile: EncodeProfile,
+        previous: Dict[int, dict],
+        on_process: Optional[Callable[[subprocess.Popen], None]],
+        on_progress: Optional[Callable[[dict], None]]
+    ) -> List[dict]:
+        """
+        Burn subtitles into each segment that changed, returning manifest entries in order
+        
+        Segments without subtitles are copied as they are if output_options
+        are given to make the re-encoded ones match them, and re-encoded
+        otherwise.
+        """
+        lock = threading.Lock()
+        encoded = {}
+        
+        def report(index: int, seconds: float):
+            if not on_progress:
+                return
+            with lock:
+                encoded[index] = seconds
+                out_time = sum(encoded.values())
+            on_progress({
+                "out_time": out_time,
+                "fps": None,
+                "speed": None,
+                "progress": min(out_time / duration, 1.0) if duration else None,
+                "finished": False
+            })
+        
+        def render(segment: Tuple[int, float, float]) -> dict:
+            index, start, end = segment
+            source = f"source_{index:04d}{SEGMENT_EXTENSION}"
+            shifted = self.shift_subtitles(subtitles, start, end)
+            entry = {"index": index, "start": start, "end": end}
+            
+            # Nothing to burn in: reuse the losslessly cut segment as is
+            if not shifted and output_options is not None:
+                report(index, end - start)
+                return {**entry, "fingerprint": None, "output": source}
+            
+            fingerprint = self._fingerprint(shifted, style, encode_settings)
+            
+            # Unchanged since the last export: reuse its rendered segment
+            last = previous.get(index)
+            if last and last["fingerprint"] == fingerprint and os.path.exists(os.path.join(work_dir, last["output"])):
+                report(index, end - start)
+                return {**entry, "fingerprint": fingerprint, "output": last["output"]}
+            
+            output = f"rendered_{index:04d}_{fingerprint[:16]}{SEGMENT_EXTENSION}"
+            VideoService.overlay_subtitles(
+                video_path=os.path.join(work_dir, source),
+                subtitles=shifted,
+                style=style,
+                output_path=os.path.join(work_dir, output),
+                on_process=on_process,
+                on_progress=lambda r: report(index, r["out_time"] or 0.0),
+                duration=end - start,
+                threads=max(math.ceil((os.cpu_count() or 1) / workers), 1),
+                profile=profile,
+                output_options=output_options
+            )
+            return {**entry, "fingerprint": fingerprint, "output": output}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export-segment") as pool:
+            return list(pool.map(render, segments))
+    
+    # ========== SEGMENT STORAGE ==========
+    
+    @staticmethod
+    def _fingerprint(
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        encode_settings: dict
+    ) -> str:
+        """Hash of everything that determines a rendered segment"""
+        payload = {
+            "subtitles": [sub.model_dump() for sub in subtitles],
+            "style": style.model_dump(),
+            "encode": encode_settings
+        }
+        serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+    
+    def _session_dir(self, session_id: int) -> str:
+        """Directory holding a session's segments and manifest"""
+        return os.path.join(self.segments_dir, str(session_id))
+    
+    def _session_lock(self, session_id: int) -> threading.Lock:
+        """Lock serializing segment work for one session"""
+        with self._locks_guard:
+            return self._session_locks.setdefault(session_id, threading.Lock())
+    
+    @staticmethod
+    def _read_manifest(work_dir: str) -> Optional[dict]:
+        """Read the manifest left by the previous export"""
+        try:
+            with open(os.path.join(work_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    @staticmethod
+    def _write_manifest(work_dir: str, manifest: dict):
+        """Write the manifest for the next export"""
+        with open(os.path.join(work_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    
+    @staticmethod
+    def _remove_stale_renders(work_dir: str, segments: List[dict]):
+        """Delete rendered segments the latest export no longer uses"""
+        in_use = {segment["output"] for segment in segments}
+        
+        for name in os.listdir(work_dir):
+            if name.startswith("rendered_") and name not in in_use:
+                os.remove(os.path.join(work_dir, name))
\ No newline at end of file
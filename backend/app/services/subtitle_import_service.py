@@ -0,0 +1,286 @@
+import codecs
+import html
+import io
+import os
+import re
+from array import array
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from app.models import SubtitleTrack
+
+# "00:00:01,500 --> 00:00:03,000" in SRT, "00:01.500 --> 00:03.000 align:start" in
+# WebVTT; hours and fractions are optional, and either separator is accepted.
+# Without hours the first two groups of a timestamp are minutes and seconds.
+TIMING_LINE = re.compile(
+    r"^\s*(\d+):(\d{1,2})(?::(\d{1,2}))?(?:[,.](\d{1,3}))?\s*-->\s*"
+    r"(\d+):(\d{1,2})(?::(\d{1,2}))?(?:[,.](\d{1,3}))?"
+)
+
+# "0:00:01.50" in ASS Dialogue lines
+ASS_TIME = re.compile(r"^\s*(\d+):(\d{1,2}):(\d{1,2})(?:\.(\d{1,3}))?\s*$")
+
+# Field order of ASS Dialogue lines when the script has no Format line
+ASS_DEFAULT_FIELDS = ["layer", "start", "end", "style", "name", "marginl", "marginr", "marginv", "effect", "text"]
+
+# HTML-like markup in SRT and WebVTT cues: <i>, <font color=...>, <v Speaker>, <00:01.000>
+MARKUP_TAG = re.compile(r"<[^<>]*>")
+
+# Override blocks such as {\an8} or {\i1}, in ASS and often in SRT too
+OVERRIDE_BLOCK = re.compile(r"\{[^{}]*\}")
+
+# Bytes sniffed for the format and encoding
+SNIFF_BYTES = 64 * 1024
+
+class SubtitleImportError(Exception):
+    """Raised when a subtitle file cannot be imported"""
+    pass
+
+class SubtitleImportService:
+    """Service for importing SRT, WebVTT and ASS files as subtitle tracks"""
+    
+    FORMATS = ("srt", "vtt", "ass")
+    
+    @staticmethod
+    def parse(
+        fileobj: BinaryIO,
+        filename: str = "",
+        subtitle_format: Optional[str] = None
+    ) -> Tuple[SubtitleTrack, int, str]:
+        """
+        Parse a subtitle file into a track, one line at a time
+        
+        The file is decoded as it is read, so memory holds the parsed
+        cues and the current line rather than the whole file. Byte order
+        marks, CRLF or CR line endings and legacy Windows-1252 files are
+        handled; a file that stops being valid UTF-8 past the sniffed
+        start is read again as Windows-1252. Cues with unreadable or
+        inverted times or no text are skipped rather than failing the
+        import.
+        
+        Args:
+            fileobj: Seekable binary file
+            filename: Original filename, used to tell the format apart
+            subtitle_format: srt, vtt or ass; detected when not given
+        
+        Returns:
+            The cues in time order, the number of cues skipped and the format
+        
+        Raises:
+            SubtitleImportError: If the format is unknown, a UTF-16 file
+                does not decode or no cue could be read
+        """
+        head = fileobj.read(SNIFF_BYTES)
+        fileobj.seek(0)
+        
+        encoding = SubtitleImportService._sniff_encoding(head)
+        subtitle_format = subtitle_format or SubtitleImportService.detect_format(
+            filename, head.decode(encoding, errors="replace")
+        )
+        if subtitle_format not in SubtitleImportService.FORMATS:
+            raise SubtitleImportError(f"Unsupported subtitle format: {subtitle_format}")
+        
+        try:
+            track, skipped = SubtitleImportService._read_cues(fileobj, encoding, subtitle_format)
+        except UnicodeDecodeError as e:
+            if encoding != "utf-8-sig":
+                raise SubtitleImportError(f"File is not valid {encoding.upper()}: {e.reason}")
+            fileobj.seek(0)
+            track, skipped = SubtitleImportService._read_cues(fileobj, "cp1252", subtitle_format)
+        
+        if not track:
+            raise SubtitleImportError(f"No subtitles found in the {subtitle_format.upper()} file")
+        
+        return track.sorted(), skipped, subtitle_format
+    
+    @staticmethod
+    def _read_cues(fileobj: BinaryIO, encoding: str, subtitle_format: str) -> Tuple[SubtitleTrack, int]:
+        """Cues of a file in a known encoding and format, and the number skipped"""
+        lines = SubtitleImportService._lines(fileobj, encoding)
+        if subtitle_format == "ass":
+            cues = SubtitleImportService._ass_cues(lines)
+        else:
+            cues = SubtitleImportService._timed_cues(lines, unescape=subtitle_format == "vtt")
+        
+        starts, ends, texts = array("d"), array("d"), []
+        skipped = 0
+        for start, end, text in cues:
+            if start is None or end <= start or not text:
+                skipped += 1
+                continue
+            starts.append(start)
+            ends.append(end)
+            texts.append(text)
+        
+        return SubtitleTrack(starts, ends, texts), skipped
+    
+    @staticmethod
+    def detect_format(filename: str, head: str) -> str:
+        """
+        Subtitle format of a file from its extension, or else its content
+        
+        Args:
+            filename: Original filename
+            head: Decoded start of the file
+        
+        Returns:
+            srt, vtt or ass
+        """
+        extension = os.path.splitext(filename)[1].lower().lstrip(".")
+        if extension in ("srt", "vtt", "ass", "ssa"):
+            return "ass" if extension == "ssa" else extension
+        
+        head = head.lstrip("\ufeff \t\r\n")
+        if head.startswith("WEBVTT"):
+            return "vtt"
+        if head.lower().startswith("[script info]"):
+            return "ass"
+        return "srt"
+    
+    @staticmethod
+    def _sniff_encoding(head: bytes) -> str:
+        """UTF-16 or UTF-8 by byte order mark or validity, else Windows-1252"""
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return "utf-16"
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A character cut off at the end of the sniffed bytes is fine
+            if e.start < len(head) - 3:
+                return "cp1252"
+        return "utf-8-sig"
+    
+    @staticmethod
+    def _lines(fileobj: BinaryIO, encoding: str) -> Iterator[str]:
+        """
+        Decoded lines of a binary file, each ending in "\n" but the last
+        
+        Decoding is strict, except for Windows-1252, the last resort, whose
+        few undefined bytes are replaced.
+        """
+        errors = "replace" if encoding == "cp1252" else "strict"
+        text = io.TextIOWrapper(fileobj, encoding=encoding, errors=errors, newline=None)
+        try:
+            yield from text
+        finally:
+            # Leave the caller's file open
+            text.detach()
+    
+    @staticmethod
+    def _timed_cues(lines: Iterator[str], unescape: bool) -> Iterator[Tuple[Optional[float], float, str]]:
+        """
+        Cues of an SRT or WebVTT file
+        
+        A timing line starts a cue and a blank line ends it. Anything
+        outside a cue, such as SRT counters, the WEBVTT header, cue
+        identifiers and NOTE or STYLE blocks, is ignored. A number on its
+        own line is held back until the next line shows whether it is
+        subtitle text or the counter of a cue missing its blank line.
+        """
+        start = end = None
+        text: List[str] = []
+        held = None
+        
+        for line in lines:
+            # The substring test spares the regex on text lines
+            match = TIMING_LINE.match(line) if "-->" in line else None
+            if match:
+                if start is not None:
+                    yield start, end, SubtitleImportService._clean_markup(text, unescape)
+                start, end = SubtitleImportService._timing(match)
+                text, held = [], None
+                continue
+            
+            if start is None:
+                continue
+            
+            stripped = line.strip()
+            if held is not None:
+                text.append(held)
+                held = None
+            
+            if not stripped:
+                yield start, end, SubtitleImportService._clean_markup(text, unescape)
+                start = None
+            elif stripped.isdigit():
+                held = stripped
+            else:
+                text.append(stripped)
+        
+        if start is not None:
+            if held is not None:
+                text.append(held)
+            yield start, end, SubtitleImportService._clean_markup(text, unescape)
+    
+    @staticmethod
+    def _ass_cues(lines: Iterator[str]) -> Iterator[Tuple[Optional[float], float, str]]:
+        """Cues of the Dialogue lines in an ASS script's [Events] section"""
+        fields = ASS_DEFAULT_FIELDS
+        in_events = False
+        
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith("["):
+                in_events = stripped.lower() == "[events]"
+                continue
+            if not in_events:
+                continue
+            
+            key, _, value = stripped.partition(":")
+            key = key.strip().lower()
+            if key == "format":
+                fields = [field.strip().lower() for field in value.split(",")]
+                continue
+            if key != "dialogue":
+                continue
+            
+            # Text is the last field and may itself contain commas
+            values = dict(zip(fields, value.split(",", len(fields) - 1)))
+            start_match = ASS_TIME.match(values.get("start", ""))
+            end_match = ASS_TIME.match(values.get("end", ""))
+            if not (start_match and end_match and "text" in values):
+                yield None, 0.0, ""
+                continue
+            
+            text = (
+                OVERRIDE_BLOCK.sub("", values["text"])
+                .replace("\\N", "\n")
+                .replace("\\n", "\n")
+                .replace("\\h", " ")
+            )
+            yield (
+                SubtitleImportService._seconds(*start_match.groups()),
+                SubtitleImportService._seconds(*end_match.groups()),
+                "\n".join(part.strip() for part in text.split("\n") if part.strip())
+            )
+    
+    @staticmethod
+    def _timing(match: re.Match) -> Tuple[float, float]:
+        """Start and end seconds of a matched timing line"""
+        groups = match.groups()
+        return SubtitleImportService._seconds(*groups[:4]), SubtitleImportService._seconds(*groups[4:])
+    
+    @staticmethod
+    def _seconds(first: str, second: str, third: Optional[str], fraction: Optional[str]) -> float:
+        """Seconds from h:mm:ss or mm:ss parts; the fraction is read as decimal digits"""
+        if third is None:
+            total = int(first) * 60 + int(second)
+        else:
+            total = int(first) * 3600 + int(second) * 60 + int(third)
+        if fraction:
+            return total + int(fraction) / 10 ** len(fraction)
+        return float(total)
+    
+    @staticmethod
+    def _clean_markup(text: List[str], unescape: bool) -> str:
+        """Cue text without tags or override blocks, lines joined"""
+        cleaned = []
+        for line in text:
+            if "<" in line:
+                line = MARKUP_TAG.sub("", line)
+            if "{" in line:
+                line = OVERRIDE_BLOCK.sub("", line)
+            if unescape and "&" in line:
+                line = html.unescape(line)
+            line = line.strip()
+            if line:
+                cleaned.append(line)
+        return "\n".join(cleaned)
\ No newline at end of file
@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+from app.models import SubtitleTrack
+from app.config import settings
+from app.repositories import storage_repo
+
+class SubtitleIndex:
+    """
+    Sorted interval index over a subtitle track
+    
+    Cues are sorted by start time alongside a running maximum of their end
+    times, which never decreases. A query binary-searches both columns for
+    the window of cues that can reach it and filters that window in one
+    array operation, so lookups take O(log n + k) for k matches as long as
+    no single cue spans a long stretch of others.
+    
+    Queries return indices into the track, in track order.
+    """
+    
+    def __init__(self, track: SubtitleTrack):
+        self.track = track
+        self.order = np.argsort(track.starts, kind="stable")
+        self.starts = track.starts[self.order]
+        self.ends = track.ends[self.order]
+        self.max_ends = np.maximum.accumulate(self.ends) if len(track) else self.ends
+    
+    def __len__(self) -> int:
+        return len(self.track)
+    
+    def at(self, time: float) -> np.ndarray:
+        """Cues showing at `time`"""
+        low = np.searchsorted(self.max_ends, time, side="right")
+        high = np.searchsorted(self.starts, time, side="right")
+        matches = np.flatnonzero(self.ends[low:high] > time)
+        return np.sort(self.order[low + matches])
+    
+    def between(self, start: float, end: float, contained: bool = False) -> np.ndarray:
+        """
+        Cues showing at some point in [start, end)
+        
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+            contained: Only cues lying entirely within the range
+        """
+        low = np.searchsorted(self.max_ends, start, side="right")
+        high = np.searchsorted(self.starts, end, side="left")
+        ends = self.ends[low:high]
+        mask = ends > start
+        if contained:
+            mask &= (self.starts[low:high] >= start) & (ends <= end)
+        return np.sort(self.order[low + np.flatnonzero(mask)])
+    
+    def overlaps(self) -> np.ndarray:
+        """
+        Every pair of cues showing at the same time
+        
+        Returns:
+            (n, 2) array of index pairs, the earlier-starting cue first
+        """
+        count = len(self)
+        positions = np.arange(count)
+        # Cues after each one in start order that start before it ends
+        following = np.maximum(np.searchsorted(self.starts, self.ends, side="left") - positions - 1, 0)
+        first = np.repeat(positions, following)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(following) - following, following)
+        second = first + 1 + offsets
+        # Drop pairs with a cue that never shows
+        valid = (self.ends[second] > self.starts[second]) & (self.ends[first] > self.starts[first])
+        return np.column_stack((self.order[first[valid]], self.order[second[valid]]))
+    
+    def gaps(self, start: float = 0.0, end: Optional[float] = None, min_duration: float = 0.0) -> np.ndarray:
+        """
+        Stretches of [start, end) with no cue showing
+        
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds, e.g. the video duration; without it
+                the time after the last cue is not a gap
+            min_duration: Shortest gap to report in seconds
+        
+        Returns:
+            (n, 2) array of gap start and end times
+        """
+        end = np.inf if end is None else end
+        # A gap runs from the latest end so far to the next start
+        gap_starts = np.maximum(np.concatenate(([start], self.max_ends)), start)
+        gap_ends = np.minimum(np.concatenate((self.starts, [end])), end)
+        lengths = gap_ends - gap_starts
+        keep = (lengths > 0) & (lengths >= min_duration) & np.isfinite(lengths)
+        return np.column_stack((gap_starts[keep], gap_ends[keep]))
+
+class SubtitleIndexService:
+    """Service for interval indexes of edits' subtitles, kept in an LRU cache"""
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else settings.subtitle_index_cache_entries
+        self._cache: "OrderedDict[tuple, SubtitleIndex]" = OrderedDict()
+        # Latest edit of each session, by its edit revision
+        self._latest: "OrderedDict[int, Tuple[int, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, edit: dict) -> SubtitleIndex:
+        """
+        Index of an edit's subtitles
+        
+        Edits never change once created, so an index is built once per
+        edit and reused until it falls out of the cache.
+        
+        Args:
+            edit: Edit record as stored
+        
+        Returns:
+            The edit's subtitle index
+        """
+        # Edit IDs can be reused after a session is deleted; created_at tells them apart
+        key = (edit["id"], edit["created_at"])
+        
+        with self._lock:
+            index = self._cache.get(key)
+            if index is not None:
+                self._cache.move_to_end(key)
+                return index
+        
+        index = SubtitleIndex(SubtitleTrack.from_records(edit["subtitle_data"]))
+        
+        with self._lock:
+            self._cache[key] = index
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        
+        return index
+    
+    def get_latest(self, session_id: int) -> Optional[Tuple[dict, SubtitleIndex]]:
+        """
+        A session's latest edit and its index
+        
+        The edit is remembered with the session's edit revision, which the
+        storage repository bumps in memory when an edit is saved, so
+        edits.json is only read again after the session has changed.
+        
+        Args:
+            session_id: Session ID
+        
+        Returns:
+            The latest edit record and its index, or None if the session
+            has no edits
+        """
+        revision = storage_repo.get_edit_revision(session_id)
+        
+        with self._lock:
+            cached = self._latest.get(session_id)
+            if cached is not None and cached[0] == revision:
+                self._latest.move_to_end(session_id)
+                edit = cached[1]
+            else:
+                edit = None
+        
+        if edit is None:
+            edit = storage_repo.get_latest_edit_record(session_id)
+            if edit is None:
+                return None
+            
+            with self._lock:
+                self._latest[session_id] = (revision, edit)
+                self._latest.move_to_end(session_id)
+                while len(self._latest) > self.max_entries:
+                    self._latest.popitem(last=False)
+        
+        return edit, self.get(edit)
+
+# Singleton instance
+subtitle_index_service = SubtitleIndexService()
\ No newline at end of file
@@ -0,0 +1,190 @@
+from typing import Dict, List
+from app.models import SubtitleSegment, StyleConfig
+
+# libass lays out SRT-derived subtitles on a 384x288 canvas; generated ASS
+# tracks use the same one so sizes and margins match burned-in exports
+ASS_PLAY_RES_X = 384
+ASS_PLAY_RES_Y = 288
+
+class SubtitleService:
+    """Service for generating subtitle files from subtitle segments"""
+    
+    @staticmethod
+    def build_srt(subtitles: List[SubtitleSegment]) -> str:
+        """Render subtitles as SubRip (SRT)"""
+        blocks = []
+        for idx, subtitle in enumerate(subtitles, 1):
+            start_time = SubtitleService._format_timestamp(subtitle.start, ',')
+            end_time = SubtitleService._format_timestamp(subtitle.end, ',')
+            blocks.append(f"{idx}\n{start_time} --> {end_time}\n{subtitle.text}\n")
+        
+        return "\n".join(blocks)
+    
+    @staticmethod
+    def build_webvtt(subtitles: List[SubtitleSegment], style: StyleConfig) -> str:
+        """
+        Render subtitles as WebVTT
+        
+        WebVTT has no styling without CSS, so only the position and
+        vertical margin are carried over as cue settings.
+        """
+        settings = SubtitleService._webvtt_cue_settings(style)
+        blocks = ["WEBVTT\n"]
+        
+        for subtitle in subtitles:
+            start_time = SubtitleService._format_timestamp(subtitle.start, '.')
+            end_time = SubtitleService._format_timestamp(subtitle.end, '.')
+            text = (
+                subtitle.text
+                .replace('&', '&amp;')
+                .replace('<', '&lt;')
+                .replace('>', '&gt;')
+            )
+            blocks.append(f"{start_time} --> {end_time} {settings}\n{text}\n")
+        
+        return "\n".join(blocks)
+    
+    @staticmethod
+    def build_ass(subtitles: List[SubtitleSegment], style: StyleConfig) -> str:
+        """Render subtitles as a fully styled Advanced SubStation Alpha (ASS) script"""
+        fields = SubtitleService.ass_style_fields(style)
+        style_line = ",".join([
+            "Default",
+            fields["FontName"],
+            str(fields["FontSize"]),
+            fields["PrimaryColour"],
+            fields["PrimaryColour"],
+            fields["OutlineColour"],
+            fields["BackColour"],
+            "0", "0", "0", "0",       # Bold, Italic, Underline, StrikeOut
+            "100", "100", "0", "0",   # ScaleX, ScaleY, Spacing, Angle
+            str(fields["BorderStyle"]),
+            str(fields["Outline"]),
+            "0",                      # Shadow
+            str(fields["Alignment"]),
+            str(fields["MarginL"]),
+            str(fields["MarginR"]),
+            str(fields.get("MarginV", 0)),
+            "1"                       # Encoding
+        ])
+        
+        lines = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {ASS_PLAY_RES_X}",
+            f"PlayResY: {ASS_PLAY_RES_Y}",
+            "WrapStyle: 0",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+            "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+            "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            f"Style: {style_line}",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+        ]
+        
+        for subtitle in subtitles:
+            start_time = SubtitleService._format_ass_timestamp(subtitle.start)
+            end_time = SubtitleService._format_ass_timestamp(subtitle.end)
+            text = subtitle.text.replace('\r\n', '\n').replace('\n', '\\N')
+            lines.append(f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}")
+        
+        return "\n".join(lines) + "\n"
+    
+    @staticmethod
+    def ass_style_fields(style: StyleConfig) -> Dict[str, object]:
+        """
+        ASS style fields for a styling configuration
+        
+        Shared by the `force_style` of burned-in exports and generated ASS
+        tracks so both render the same way.
+        """
+        margin_v = style.margin_vertical
+        margin_h = style.margin_horizontal
+        
+        # Position mapping with custom margins
+        position_map = {
+            "top": {"Alignment": 8, "MarginV": margin_v},
+            "center": {"Alignment": 5},
+            "bottom": {"Alignment": 2, "MarginV": margin_v}
+        }
+        position = position_map.get(style.position, position_map["bottom"])
+        
+        # Determine border style (1 = outline only, 3 = opaque box, 4 = transparent box)
+        border_style = 1 if style.background_color == "#00000000" else 3
+        
+        return {
+            "FontName": style.font_family,
+            "FontSize": style.font_size,
+            "PrimaryColour": SubtitleService.hex_to_ass_color(style.font_color),
+            "BackColour": SubtitleService.hex_to_ass_color(style.background_color),
+            "OutlineColour": SubtitleService.hex_to_ass_color(style.outline_color),
+            "BorderStyle": border_style,
+            "Outline": style.outline_width,
+            **position,
+            "MarginL": margin_h,
+            "MarginR": margin_h
+        }
+    
+    @staticmethod
+    def force_style(style: StyleConfig) -> str:
+        """`force_style` value for FFmpeg's subtitles filter"""
+        return ",".join(
+            f"{name}={value}"
+            for name, value in SubtitleService.ass_style_fields(style).items()
+        )
+    
+    @staticmethod
+    def hex_to_ass_color(hex_color: str) -> str:
+        """Convert hex color to ASS format (&HAABBGGRR) with alpha support"""
+        hex_color = hex_color.lstrip('#')
+        
+        # Handle different hex formats
+        if len(hex_color) == 8:  # RRGGBBAA
+            r = int(hex_color[0:2], 16)
+            g = int(hex_color[2:4], 16)
+            b = int(hex_color[4:6], 16)
+            a = int(hex_color[6:8], 16)
+            # ASS uses inverted alpha (FF = transparent, 00 = opaque)
+            ass_alpha = 255 - a
+            return f"&H{ass_alpha:02X}{b:02X}{g:02X}{r:02X}"
+        elif len(hex_color) == 6:  # RRGGBB
+            r = int(hex_color[0:2], 16)
+            g = int(hex_color[2:4], 16)
+            b = int(hex_color[4:6], 16)
+            return f"&H00{b:02X}{g:02X}{r:02X}"
+        else:
+            # Default to white
+            return f"&H00FFFFFF"
+    
+    @staticmethod
+    def _webvtt_cue_settings(style: StyleConfig) -> str:
+        """WebVTT cue settings approximating the subtitle position"""
+        margin = round(100 * style.margin_vertical / ASS_PLAY_RES_Y)
+        
+        if style.position == "top":
+            return f"line:{margin}%,start align:center"
+        if style.position == "center":
+            return "line:50%,center align:center"
+        return f"line:{100 - margin}%,end align:center"
+    
+    @staticmethod
+    def _format_timestamp(seconds: float, separator: str) -> str:
+        """Convert seconds to HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)"""
+        millis = int(round(seconds * 1000))
+        hours, millis = divmod(millis, 3600000)
+        minutes, millis = divmod(millis, 60000)
+        secs, millis = divmod(millis, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+    
+    @staticmethod
+    def _format_ass_timestamp(seconds: float) -> str:
+        """Convert seconds to ASS timestamp format (H:MM:SS.cc)"""
+        centis = int(round(seconds * 100))
+        hours, centis = divmod(centis, 360000)
+        minutes, centis = divmod(centis, 6000)
+        secs, centis = divmod(centis, 100)
+        return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
\ No newline at end of file
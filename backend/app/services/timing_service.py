@@ -0,0 +1,253 @@
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from app.models import SubtitleTrack
+
+# Frame rates usually written rounded; conversions use the exact NTSC fractions
+NTSC_RATES = (24000 / 1001, 30000 / 1001, 48000 / 1001, 60000 / 1001)
+
+class TimingService:
+    """
+    Service for bulk subtitle timing changes
+    
+    Every change is a single array operation over a SubtitleTrack, so it
+    takes milliseconds however long the track is, and unlike asking the
+    LLM to rewrite timestamps it cannot garble cues it was not meant to
+    touch.
+    """
+    
+    @staticmethod
+    def apply(track: SubtitleTrack, operation: str, params: dict) -> Tuple[SubtitleTrack, str]:
+        """
+        Apply a timing change given by name, as the API and chat request it
+        
+        Args:
+            track: Subtitles to change
+            operation: shift, stretch, retime or snap
+            params: Arguments of the operation's method, by name
+        
+        Returns:
+            The changed track and a summary of the change
+        
+        Raises:
+            ValueError: If the operation is unknown or its parameters are
+                missing or invalid
+        """
+        try:
+            if operation == "shift":
+                offset = float(params["offset"])
+                start = TimingService._optional_time(params.get("start"))
+                end = TimingService._optional_time(params.get("end"))
+                summary = f"Shifted subtitles {'later' if offset >= 0 else 'earlier'} by {abs(offset):.3f}s"
+                if start is not None and end is not None:
+                    summary += f" between {start:.3f}s and {end:.3f}s"
+                elif start is not None:
+                    summary += f" from {start:.3f}s on"
+                elif end is not None:
+                    summary += f" before {end:.3f}s"
+                return TimingService.shift(track, offset, start, end), summary + "."
+            
+            if operation == "stretch":
+                anchors = [
+                    float(params[name])
+                    for name in ("source_start", "source_end", "target_start", "target_end")
+                ]
+                summary = (
+                    f"Stretched subtitles so {anchors[0]:.3f}s-{anchors[1]:.3f}s "
+                    f"now spans {anchors[2]:.3f}s-{anchors[3]:.3f}s."
+                )
+                return TimingService.stretch(track, *anchors), summary
+            
+            if operation == "retime":
+                source_fps = float(params["source_fps"])
+                target_fps = float(params["target_fps"])
+                summary = f"Converted subtitle timing from {source_fps:g} fps to {target_fps:g} fps."
+                return TimingService.retime(track, source_fps, target_fps), summary
+            
+            if operation == "snap":
+                tolerance = float(params["tolerance"])
+                snapped = TimingService.snap(track, params["cuts"], tolerance)
+                moved = (
+                    np.count_nonzero(snapped.starts != track.starts)
+                    + np.count_nonzero(snapped.ends != track.ends)
+                )
+                summary = f"Snapped {moved} subtitle boundaries to scene cuts within {tolerance:.3f}s."
+                return snapped, summary
+        
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Missing or invalid {operation} parameter: {e}")
+        
+        raise ValueError(f"Unknown timing operation: {operation}")
+    
+    @staticmethod
+    def shift(
+        track: SubtitleTrack,
+        offset: float,
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> SubtitleTrack:
+        """
+        Move subtitles earlier or later
+        
+        Args:
+            track: Subtitles to shift
+            offset: Seconds to add; negative moves subtitles earlier
+            start: Only shift subtitles starting at or after this time
+            end: Only shift subtitles starting before this time
+        
+        Returns:
+            The shifted track, without subtitles moved entirely before 0
+        """
+        selected = np.ones(len(track), dtype=bool)
+        if start is not None:
+            selected &= track.starts >= start
+        if end is not None:
+            selected &= track.starts < end
+        
+        shifted = SubtitleTrack(
+            np.where(selected, track.starts + offset, track.starts),
+            np.where(selected, track.ends + offset, track.ends),
+            track.texts
+        )
+        return TimingService.fit(shifted)
+    
+    @staticmethod
+    def stretch(
+        track: SubtitleTrack,
+        source_start: float,
+        source_end: float,
+        target_start: float,
+        target_end: float
+    ) -> SubtitleTrack:
+        """
+        Stretch subtitles linearly so two anchor times land on new times
+        
+        Fixes subtitles that drift out of sync: pick a line near the start
+        and one near the end, and where each should be. Times outside the
+        anchors are extrapolated.
+        
+        Args:
+            track: Subtitles to stretch
+            source_start: Current time of the first anchor
+            source_end: Current time of the second anchor
+            target_start: Where the first anchor should be
+            target_end: Where the second anchor should be
+        
+        Returns:
+            The stretched track, without subtitles moved entirely before 0
+        
+        Raises:
+            ValueError: If either pair of anchors is not in increasing order
+        """
+        if source_end <= source_start or target_end <= target_start:
+            raise ValueError("Anchor end times must be after their start times")
+        
+        scale = (target_end - target_start) / (source_end - source_start)
+        stretched = SubtitleTrack(
+            target_start + (track.starts - source_start) * scale,
+            target_start + (track.ends - source_start) * scale,
+            track.texts
+        )
+        return TimingService.fit(stretched)
+    
+    @staticmethod
+    def retime(track: SubtitleTrack, source_fps: float, target_fps: float) -> SubtitleTrack:
+        """
+        Convert subtitles between frame rates, e.g. 23.976 and 25 fps
+        
+        For subtitles timed against a video at `source_fps` that now plays
+        at `target_fps`, as after a PAL speed-up, each subtitle keeps its
+        frames and so its time scales by source_fps / target_fps.
+        
+        Args:
+            track: Subtitles to convert
+            source_fps: Frame rate the subtitles were timed for
+            target_fps: Frame rate of the video now
+        
+        Returns:
+            The converted track
+        
+        Raises:
+            ValueError: If a frame rate is not positive
+        """
+        if source_fps <= 0 or target_fps <= 0:
+            raise ValueError("Frame rates must be positive")
+        
+        scale = TimingService.exact_fps(source_fps) / TimingService.exact_fps(target_fps)
+        return SubtitleTrack(track.starts * scale, track.ends * scale, track.texts)
+    
+    @staticmethod
+    def snap(track: SubtitleTrack, cuts: Sequence[float], tolerance: float) -> SubtitleTrack:
+        """
+        Move subtitle starts and ends onto nearby scene cuts
+        
+        Each boundary moves to its nearest cut if that is within
+        `tolerance`, so subtitles stop flashing across a cut for a few
+        frames. All boundaries are matched at once by binary search.
+        Subtitles that would shrink to nothing, with both ends on the same
+        cut, keep their times.
+        
+        Args:
+            track: Subtitles to snap
+            cuts: Scene cut times in seconds, in increasing order
+            tolerance: Furthest a boundary may move, in seconds
+        
+        Returns:
+            The snapped track
+        
+        Raises:
+            ValueError: If the tolerance is negative
+        """
+        if tolerance < 0:
+            raise ValueError("Snap tolerance must not be negative")
+        
+        cuts = np.asarray(cuts, dtype=np.float64)
+        if not len(cuts):
+            return SubtitleTrack(track.starts.copy(), track.ends.copy(), track.texts)
+        
+        starts = TimingService._snap_times(track.starts, cuts, tolerance)
+        ends = TimingService._snap_times(track.ends, cuts, tolerance)
+        collapsed = ends <= starts
+        return SubtitleTrack(
+            np.where(collapsed, track.starts, starts),
+            np.where(collapsed, track.ends, ends),
+            track.texts
+        )
+    
+    @staticmethod
+    def fit(track: SubtitleTrack, duration: Optional[float] = None) -> SubtitleTrack:
+        """
+        Drop subtitles outside [0, duration) and cut the rest to fit
+        
+        Args:
+            track: Subtitles to fit
+            duration: Video duration in seconds, if known
+        
+        Returns:
+            The fitted track
+        """
+        fitted = track.take(track.ends > 0)
+        np.maximum(fitted.starts, 0.0, out=fitted.starts)
+        if duration is not None:
+            fitted = fitted.clamp(duration)
+        return fitted
+    
+    @staticmethod
+    def exact_fps(fps: float) -> float:
+        """A frame rate, with rounded NTSC rates such as 29.97 made exact"""
+        for rate in NTSC_RATES:
+            if abs(fps - rate) < 0.005:
+                return rate
+        return fps
+    
+    @staticmethod
+    def _snap_times(times: np.ndarray, cuts: np.ndarray, tolerance: float) -> np.ndarray:
+        """Times moved to the nearest of the sorted cuts, where one is within tolerance"""
+        after = np.searchsorted(cuts, times).clip(0, len(cuts) - 1)
+        before = (after - 1).clip(0)
+        nearest = np.where(np.abs(times - cuts[before]) <= np.abs(cuts[after] - times), cuts[before], cuts[after])
+        return np.where(np.abs(nearest - times) <= tolerance, nearest, times)
+    
+    @staticmethod
+    def _optional_time(value) -> Optional[float]:
+        """A time parameter that may be left out"""
+        return None if value is None else float(value)
\ No newline at end of file
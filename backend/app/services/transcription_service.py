@@ -1,6 +1,8 @@
 import os
 import tempfile
-from typing import List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
 from openai import OpenAI
 import ffmpeg
 from app.models import SubtitleSegment
@@ -11,6 +13,15 @@ class TranscriptionService:
     
     def __init__(self):
         self.client = OpenAI(api_key=settings.openai_api_key)
+        
+        # Dedicated, bounded pool so prefetching never competes with
+        # interactive transcriptions for more than a few workers
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=settings.transcription_prefetch_workers,
+            thread_name_prefix="transcription-prefetch"
+        )
+        self._prefetch_jobs: Dict[int, Future] = {}
+        self._prefetch_lock = threading.Lock()
     
     def extract_audio(self, video_path: str) -> str:
         """Extract audio from video file to temporary WAV file"""
@@ -96,6 +107,76 @@ class TranscriptionService:
             # Clean up temporary audio file
             if audio_path and os.path.exists(audio_path):
                 os.remove(audio_path)
+    
+    # ========== PREFETCH OPERATIONS ==========
+    
+    def prefetch(self, session_id: int, video_path: str) -> bool:
+        """
+        Start transcribing a session's video in the background
+        
+        Args:
+            session_id: Session the transcription belongs to
+            video_path: Path to video file
+            
+        Returns:
+            True if a prefetch is running or queued for the session,
+            False if the prefetch queue is full
+        """
+        with self._prefetch_lock:
+            if session_id in self._prefetch_jobs:
+                return True
+            
+            pending = sum(1 for job in self._prefetch_jobs.values() if not job.done())
+            if pending >= settings.transcription_prefetch_max_pending:
+                return False
+            
+            self._prefetch_jobs[session_id] = self._prefetch_executor.submit(
+                self.generate_subtitles_from_video, video_path
+            )
+            return True
+    
+    def get_subtitles_for_session(self, session_id: int, video_path: str) -> List[SubtitleSegment]:
+        """
+        Return subtitles for a session, reusing a prefetched transcription
+        
+        Joins the prefetch job if it is already running. A job that is still
+        queued is cancelled and the video is transcribed right away instead,
+        so interactive requests never wait behind other sessions' prefetches.
+        The job is dropped once its result is returned, as the caller saves
+        the subtitles in an edit.
+        
+        Args:
+            session_id: Session ID
+            video_path: Path to video file
+            
+        Returns:
+            List of subtitle segments with timestamps
+        """
+        with self._prefetch_lock:
+            job = self._prefetch_jobs.get(session_id)
+            if job is not None and job.cancel():
+                del self._prefetch_jobs[session_id]
+                job = None
+        
+        if job is not None:
+            try:
+                return job.result()
+            except Exception as e:
+                print(f"Transcription prefetch failed for session {session_id}: {e}")
+            finally:
+                with self._prefetch_lock:
+                    if self._prefetch_jobs.get(session_id) is job:
+                        del self._prefetch_jobs[session_id]
+        
+        return self.generate_subtitles_from_video(video_path)
+    
+    def discard_prefetch(self, session_id: int) -> None:
+        """Drop a session's prefetched transcription, cancelling it if queued"""
+        with self._prefetch_lock:
+            job = self._prefetch_jobs.pop(session_id, None)
+        
+        if job is not None:
+            job.cancel()
 
 # Singleton instance
 transcription_service = TranscriptionService()
\ No newline at end of file
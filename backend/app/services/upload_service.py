@@ -0,0 +1,280 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.models import Upload
+from app.config import settings
+from app.repositories import upload_repo, blob_repo
+
+class UploadConflictError(Exception):
+    """Raised when a chunk does not fit the upload's current state"""
+
+class UploadIntegrityError(Exception):
+    """Raised when a finished upload does not match its checksum"""
+
+class UploadService:
+    """Service for uploads, stored once per distinct content"""
+    
+    def __init__(self):
+        # Running SHA-256 of each upload, so finalizing does not re-read
+        # the file; lost on restart, in which case the file is re-hashed
+        self._hashers: Dict[str, "hashlib._Hash"] = {}
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def store_file(self, fileobj: BinaryIO, filename: str) -> Tuple[str, str]:
+        """
+        Store a complete uploaded file, e.g. a multipart upload's spool
+        
+        The content is hashed first, so a video that is already stored is
+        never written again.
+        
+        Args:
+            fileobj: Uploaded file, positioned at the start
+            filename: Original filename, whose extension a new blob keeps
+        
+        Returns:
+            The blob path and content hash; the caller holds a reference
+        """
+        content_hash = self._hash_stream(fileobj)
+        path = blob_repo.acquire(content_hash)
+        if path is not None:
+            return path, content_hash
+        
+        os.makedirs(settings.uploads_dir, exist_ok=True)
+        temp_path = os.path.join(settings.uploads_dir, f"{uuid.uuid4()}.part")
+        try:
+            fileobj.seek(0)
+            with open(temp_path, 'wb') as f:
+                shutil.copyfileobj(fileobj, f)
+            path = blob_repo.acquire(content_hash, temp_path, Path(filename).suffix)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        return path, content_hash
+    
+    # ========== RESUMABLE UPLOADS ==========
+    
+    def create(self, filename: str, length: Optional[int], sha256: Optional[str] = None) -> Upload:
+        """
+        Start an upload and create its empty target file
+        
+        A video that is already stored is only deduplicated on finalize,
+        once its bytes have been received and hashed: knowing a hash is
+        no proof of having the video.
+        
+        Args:
+            filename: Original filename, whose extension the video keeps
+            length: Total size in bytes, if known
+            sha256: Hex SHA-256 of the whole file, if known; checked on
+                finalize
+        
+        Returns:
+            The new upload
+        """
+        self.purge_expired()
+        
+        os.makedirs(settings.uploads_dir, exist_ok=True)
+        path = os.path.join(settings.uploads_dir, f"{uuid.uuid4()}{Path(filename).suffix}")
+        open(path, 'wb').close()
+        
+        upload = upload_repo.create_upload(
+            uuid.uuid4().hex, filename, path, length,
+            sha256=sha256.lower() if sha256 else None
+        )
+        with self._lock:
+            self._hashers[upload.id] = hashlib.sha256()
+        return upload
+    
+    async def append(self, upload: Upload, offset: int, chunks: AsyncIterator[bytes]) -> Upload:
+        """
+        Append a request body to an upload
+        
+        Chunks are buffered up to upload_write_buffer_bytes and written and
+        hashed in a worker thread, so the event loop only moves bytes. The
+        offset is saved even if the client disconnects part way, so the
+        next request resumes from whatever was written.
+        
+        Args:
+            upload: Upload to append to
+            offset: Offset the client believes it is at
+            chunks: Request body
+        
+        Returns:
+            The upload with its new offset
+        
+        Raises:
+            UploadConflictError: If the offset is wrong, the body runs past
+                the declared length or another request is appending
+        """
+        with self._lock:
+            if upload.id in self._active:
+                raise UploadConflictError("Another request is appending to this upload")
+            self._active.add(upload.id)
+            hasher = self._hashers.get(upload.id)
+        
+        written = None
+        buffer = bytearray()
+        
+        try:
+            # Read again now that no other request can append: the caller's
+            # copy may predate one that just finished, and a stale offset
+            # would rewrite bytes the running hash already has
+            upload = upload_repo.get_upload(upload.id) or upload
+            if upload.content_hash:
+                raise UploadConflictError("Upload duplicates a stored video and needs no data")
+            if offset != upload.offset:
+                raise UploadConflictError(f"Upload is at offset {upload.offset}, not {offset}")
+            
+            written = upload.offset
+            f = await run_in_threadpool(self._open_at, upload.path, upload.offset)
+            try:
+                async for chunk in chunks:
+                    if upload.length is not None and written + len(buffer) + len(chunk) > upload.length:
+                        raise UploadConflictError(f"Upload is {upload.length} bytes long")
+                    
+                    buffer += chunk
+                    if len(buffer) >= settings.upload_write_buffer_bytes:
+                        await run_in_threadpool(self._write, f, hasher, bytes(buffer))
+                        written += len(buffer)
+                        buffer.clear()
+            finally:
+                # Keep what arrived before a disconnect or a rejected chunk
+                if buffer:
+                    await run_in_threadpool(self._write, f, hasher, bytes(buffer))
+                    written += len(buffer)
+                await run_in_threadpool(f.close)
+        
+        finally:
+            if written is not None:
+                upload = upload_repo.update_upload(upload.id, offset=written) or upload
+            with self._lock:
+                self._active.discard(upload.id)
+        
+        return upload
+    
+    async def finalize(self, upload: Upload, sha256: Optional[str] = None) -> Upload:
+        """
+        Finish an upload, checking its size and checksum
+        
+        The received file is stored as a blob, or deleted if a video with
+        the same content is already stored.
+        
+        Args:
+            upload: Upload to finish
+            sha256: Expected hex SHA-256 of the whole file, if the client
+                sent one; defaults to the one sent on creation
+        
+        Returns:
+            The finished upload, now pointing at its blob with its content
+            hash set; the caller holds a reference to the blob
+        
+        Raises:
+            UploadConflictError: If bytes are still missing
+            UploadIntegrityError: If the checksum does not match, in which
+                case the upload is discarded
+        """
+        if upload.length is not None and not upload.is_complete:
+            raise UploadConflictError(f"Upload has {upload.offset} of {upload.length} bytes")
+        
+        with self._lock:
+            if upload.id in self._active:
+                raise UploadConflictError("Upload is still being appended to")
+            hasher = self._hashers.pop(upload.id, None)
+        
+        # Deduplicated at creation by earlier versions; the reference is
+        # already held
+        if upload.content_hash:
+            upload_repo.delete_upload(upload.id)
+            return upload
+        
+        sha256 = sha256 or upload.sha256
+        digest = hasher.hexdigest() if hasher else await run_in_threadpool(self._hash_file, upload.path)
+        if sha256 and digest != sha256.lower():
+            self.abort(upload)
+            raise UploadIntegrityError(f"SHA-256 mismatch: expected {sha256.lower()}, got {digest}")
+        
+        path = blob_repo.acquire(digest, upload.path, Path(upload.path).suffix)
+        upload_repo.delete_upload(upload.id)
+        return upload.model_copy(update={"path": path, "content_hash": digest})
+    
+    def abort(self, upload: Upload) -> None:
+        """Discard an upload and its partial file"""
+        with self._lock:
+            self._hashers.pop(upload.id, None)
+        upload_repo.delete_upload(upload.id)
+        
+        if upload.content_hash:
+            blob_repo.release(upload.content_hash)
+        elif os.path.exists(upload.path):
+            os.remove(upload.path)
+    
+    def purge_expired(self) -> int:
+        """
+        Discard uploads that have not received data for upload_expiry_hours
+        
+        Returns:
+            Number of uploads discarded
+        """
+        cutoff = (datetime.utcnow() - timedelta(hours=settings.upload_expiry_hours)).isoformat()
+        uploads = upload_repo.get_all_uploads()
+        
+        # Claimed like an append, so none can start while it is discarded
+        with self._lock:
+            expired = [
+                upload for upload in uploads
+                if upload.updated_at < cutoff and upload.id not in self._active
+            ]
+            self._active.update(upload.id for upload in expired)
+        
+        try:
+            for upload in expired:
+                self.abort(upload)
+        finally:
+            with self._lock:
+                self._active.difference_update(upload.id for upload in expired)
+        return len(expired)
+    
+    @staticmethod
+    def _open_at(path: str, offset: int):
+        """
+        Open an upload's file for writing at `offset`
+        
+        Bytes past the saved offset, left by a crash between a write and
+        saving the offset, are cut off. The running hash is then also
+        stale, which finalize detects by its absence after a restart.
+        """
+        f = open(path, 'r+b')
+        f.truncate(offset)
+        f.seek(offset)
+        return f
+    
+    @staticmethod
+    def _write(f, hasher, data: bytes) -> None:
+        """Write and hash one buffered block"""
+        f.write(data)
+        if hasher is not None:
+            hasher.update(data)
+    
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        """SHA-256 of a file"""
+        with open(path, 'rb') as f:
+            return UploadService._hash_stream(f)
+    
+    @staticmethod
+    def _hash_stream(fileobj: BinaryIO) -> str:
+        """SHA-256 of a file object from its current position, read in blocks"""
+        hasher = hashlib.sha256()
+        for block in iter(lambda: fileobj.read(1024 * 1024), b''):
+            hasher.update(block)
+        return hasher.hexdigest()
+
+# Singleton instance
+upload_service = UploadService()
\ No newline at end of file
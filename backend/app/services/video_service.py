@@ -1,7 +1,22 @@
 import ffmpeg
 import os
-from typing import List
-from app.models import SubtitleSegment, StyleConfig
+import re
+import subprocess
+import threading
+from typing import Callable, List, Optional, Tuple
+from app.models import SubtitleSegment, StyleConfig, MediaInfo
+from app.config import EncodeProfile
+from .subtitle_service import SubtitleService
+
+# Subtitle track file and codec used to mux soft subtitles into each container
+SOFT_SUBTITLE_TRACKS = {
+    "mp4": ("ass", "mov_text"),
+    "mkv": ("ass", "copy"),
+    "webm": ("vtt", "copy")
+}
+
+# Codecs a WebM file may carry
+WEBM_CODECS = {"vp8", "vp9", "av1", "opus", "vorbis"}
 
 class VideoService:
     """Service for video processing operations"""
@@ -10,124 +25,757 @@ class VideoService:
     def create_srt_file(subtitles: List[SubtitleSegment], output_path: str) -> None:
         """Generate SRT subtitle file"""
         with open(output_path, 'w', encoding='utf-8') as f:
-            for idx, subtitle in enumerate(subtitles, 1):
-                start_time = VideoService._format_timestamp(subtitle.start)
-                end_time = VideoService._format_timestamp(subtitle.end)
-                
-                f.write(f"{idx}\n")
-                f.write(f"{start_time} --> {end_time}\n")
-                f.write(f"{subtitle.text}\n\n")
-    
-    @staticmethod
-    def _format_timestamp(seconds: float) -> str:
-        """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+            f.write(SubtitleService.build_srt(subtitles))
     
     @staticmethod
     def overlay_subtitles(
         video_path: str, 
         subtitles: List[SubtitleSegment], 
         style: StyleConfig, 
-        output_path: str
+        output_path: str,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        duration: Optional[float] = None,
+        threads: Optional[int] = None,
+        profile: Optional[EncodeProfile] = None,
+        output_options: Optional[dict] = None
     ) -> None:
-        """Burn subtitles into video using FFmpeg"""
+        """
+        Burn subtitles into video using FFmpeg
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitle segments to burn in
+            style: Subtitle styling
+            output_path: Destination video path
+            on_process: Called with the running FFmpeg process, e.g. so
+                callers can terminate it to cancel the export
+            on_progress: Called with each FFmpeg progress report
+            duration: Source duration in seconds, used to compute progress
+            threads: Encoder thread limit, e.g. when several exports share
+                the CPU; overrides the profile's thread count
+            profile: Video codec, preset, CRF and scale; FFmpeg's defaults
+                at the source resolution if omitted
+            output_options: Further FFmpeg output options, e.g. an H.264
+                profile and level to match other segments
+        """
         # Create temporary SRT file
-        srt_path = output_path.replace('.mp4', '.srt')
+        srt_path = os.path.splitext(output_path)[0] + '.srt'
         VideoService.create_srt_file(subtitles, srt_path)
         
-        # FFmpeg subtitle styling
-        font_size = style.font_size
-        primary_color = VideoService._hex_to_ass_color(style.font_color)
-        outline_color = VideoService._hex_to_ass_color(style.outline_color)
-        back_color = VideoService._hex_to_ass_color(style.background_color)
+        # libass cannot open an empty SRT file, so a stretch of video
+        # without subtitles is only re-encoded
+        filters = []
+        if subtitles:
+            filters.append(f"subtitles={srt_path}:force_style='{SubtitleService.force_style(style)}'")
+        output_args = VideoService._encoder_args(profile)
         
-        # Position mapping with custom margins
-        margin_v = style.margin_vertical
-        margin_h = style.margin_horizontal
+        # Scale first so subtitles are rendered at the output resolution
+        if profile and profile.height:
+            filters.insert(0, f"scale=-2:{profile.height}")
         
-        position_map = {
-            "top": f"Alignment=8,MarginV={margin_v},MarginL={margin_h},MarginR={margin_h}",
-            "center": f"Alignment=5,MarginL={margin_h},MarginR={margin_h}",
-            "bottom": f"Alignment=2,MarginV={margin_v},MarginL={margin_h},MarginR={margin_h}"
-        }
-        position_style = position_map.get(style.position, f"Alignment=2,MarginV={margin_v},MarginL={margin_h},MarginR={margin_h}")
-        
-        # Determine border style (1 = outline only, 3 = opaque box, 4 = transparent box)
-        border_style = 1 if style.background_color == "#00000000" else 3
-        
-        # Build subtitle style
-        subtitle_style = (
-            f"FontName={style.font_family},"
-            f"FontSize={font_size},"
-            f"PrimaryColour={primary_color},"
-            f"BackColour={back_color},"
-            f"OutlineColour={outline_color},"
-            f"BorderStyle={border_style},"
-            f"Outline={style.outline_width},"
-            f"{position_style}"
-        )
+        if threads:
+            output_args['threads'] = threads
+        if output_options:
+            output_args.update(output_options)
+        
+        if filters:
+            output_args['vf'] = ','.join(filters)
+        output_args.update(VideoService._container_args(output_path))
         
         try:
             # Run FFmpeg
-            (
+            stream = (
                 ffmpeg
                 .input(video_path)
                 .output(
                     output_path,
-                    vf=f"subtitles={srt_path}:force_style='{subtitle_style}'",
-                    **{'c:a': 'copy'}
+                    **output_args
                 )
                 .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True)
             )
+            VideoService.run_ffmpeg(stream, on_process, on_progress, duration)
             
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        
+        finally:
             # Clean up SRT file
             if os.path.exists(srt_path):
                 os.remove(srt_path)
+    
+    @staticmethod
+    def render_renditions(
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        outputs: List[Tuple[str, EncodeProfile]],
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        duration: Optional[float] = None
+    ) -> None:
+        """
+        Burn subtitles once and encode several renditions in one FFmpeg run
+        
+        The source is decoded and the subtitles rendered a single time at
+        the source resolution; a split filter then feeds one scaler and
+        encoder per rendition.
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitle segments to burn in
+            style: Subtitle styling
+            outputs: Destination path and encode profile of each rendition
+            on_process: Called with the running FFmpeg process
+            on_progress: Called with each FFmpeg progress report
+            duration: Source duration in seconds, used to compute progress
+        """
+        srt_path = os.path.splitext(outputs[0][0])[0] + '.srt'
+        VideoService.create_srt_file(subtitles, srt_path)
+        
+        source = ffmpeg.input(video_path)
+        branches = VideoService._burn_and_split(
+            source, subtitles, style, srt_path, [profile for _, profile in outputs]
+        )
+        
+        streams = [
+            ffmpeg.output(
+                branch,
+                source['a?'],
+                output_path,
+                **VideoService._encoder_args(profile),
+                **VideoService._container_args(output_path)
+            )
+            for branch, (output_path, profile) in zip(branches, outputs)
+        ]
+        
+        try:
+            stream = ffmpeg.merge_outputs(*streams).overwrite_output()
+            VideoService.run_ffmpeg(stream, on_process, on_progress, duration)
+        
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        
+        finally:
+            if os.path.exists(srt_path):
+                os.remove(srt_path)
+    
+    @staticmethod
+    def render_hls(
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        output_dir: str,
+        variants: List[Tuple[str, EncodeProfile]],
+        segment_seconds: float,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        duration: Optional[float] = None,
+        has_audio: Optional[bool] = None
+    ) -> None:
+        """
+        Burn subtitles and package the result as HLS with fMP4 segments
+        
+        Writes master.m3u8 plus, per variant, a media playlist, an init
+        segment and media segments under <output_dir>/<variant name>/.
+        Variants share one AAC audio rendition and are decoded and
+        subtitled once, as in render_renditions. Keyframes are forced on
+        segment boundaries so every segment starts independently.
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitle segments to burn in
+            style: Subtitle styling
+            output_dir: Directory to write the playlists and segments to
+            variants: Name and encode profile of each variant
+            segment_seconds: Target segment duration
+            on_process: Called with the running FFmpeg process
+            on_progress: Called with each FFmpeg progress report
+            duration: Source duration in seconds, used to compute progress
+            has_audio: Whether the source has audio; probed if omitted
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        srt_path = os.path.join(output_dir, 'subtitles.srt')
+        VideoService.create_srt_file(subtitles, srt_path)
+        
+        source = ffmpeg.input(video_path)
+        branches = VideoService._burn_and_split(
+            source, subtitles, style, srt_path, [profile for _, profile in variants]
+        )
+        if has_audio is None:
+            has_audio = 'audio' in VideoService._stream_types(video_path)
+        
+        stream_map = [f"v:{index},name:{name}" for index, (name, _) in enumerate(variants)]
+        output_args = {
+            'f': 'hls',
+            'hls_time': segment_seconds,
+            'hls_playlist_type': 'vod',
+            'hls_segment_type': 'fmp4',
+            'hls_flags': 'independent_segments',
+            'hls_fmp4_init_filename': 'init.mp4',
+            'hls_segment_filename': os.path.join(output_dir, '%v', 'segment_%05d.m4s'),
+            'master_pl_name': 'master.m3u8',
+            'force_key_frames': f"expr:gte(t,n_forced*{segment_seconds})",
+            'pix_fmt': 'yuv420p'
+        }
+        
+        for index, (_, profile) in enumerate(variants):
+            output_args.update({
+                f'c:v:{index}': profile.video_codec,
+                f'preset:v:{index}': profile.preset,
+                f'crf:v:{index}': profile.crf
+            })
+        
+        streams = list(branches)
+        if has_audio:
+            streams.append(source['a:0'])
+            stream_map = ["a:0,agroup:audio,name:audio"] + [
+                f"{entry},agroup:audio" for entry in stream_map
+            ]
+            output_args.update({'c:a': 'aac', 'b:a': '128k'})
+        output_args['var_stream_map'] = " ".join(stream_map)
+        
+        try:
+            stream = (
+                ffmpeg
+                .output(*streams, os.path.join(output_dir, '%v', 'index.m3u8'), **output_args)
+                .overwrite_output()
+            )
+            VideoService.run_ffmpeg(stream, on_process, on_progress, duration)
+        
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        
+        finally:
+            if os.path.exists(srt_path):
+                os.remove(srt_path)
+        
+        VideoService._set_hls_bandwidth(output_dir)
+    
+    @staticmethod
+    def _set_hls_bandwidth(output_dir: str) -> None:
+        """
+        Replace the master playlist's bandwidth figures with measured ones
+        
+        CRF encodes have no nominal bitrate, so FFmpeg can only advertise
+        the audio bitrate; players need real peak and average bitrates to
+        pick a variant.
+        """
+        master_path = os.path.join(output_dir, 'master.m3u8')
+        with open(master_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        audio = re.search(r'URI="([^"]+)"', next((entry for entry in lines if entry.startswith('#EXT-X-MEDIA:TYPE=AUDIO')), ''))
+        audio_peak, audio_average = VideoService._hls_bitrates(output_dir, audio.group(1)) if audio else (0, 0)
+        
+        for index, line in enumerate(lines):
+            if not line.startswith('#EXT-X-STREAM-INF:') or index + 1 >= len(lines):
+                continue
             
+            peak, average = VideoService._hls_bitrates(output_dir, lines[index + 1])
+            if 'AUDIO=' in line and (not audio or lines[index + 1] != audio.group(1)):
+                peak, average = peak + audio_peak, average + audio_average
+            
+            attributes = re.sub(r',AVERAGE-BANDWIDTH=\d+', '', line)
+            lines[index] = re.sub(
+                r'BANDWIDTH=\d+',
+                f'BANDWIDTH={peak},AVERAGE-BANDWIDTH={average}',
+                attributes,
+                count=1
+            )
+        
+        with open(master_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    
+    @staticmethod
+    def _hls_bitrates(output_dir: str, playlist: str) -> Tuple[int, int]:
+        """Peak and average bitrate (bits/s) of a media playlist's segments"""
+        playlist_path = os.path.join(output_dir, playlist)
+        playlist_dir = os.path.dirname(playlist_path)
+        peak, total_bits, total_seconds = 0, 0, 0.0
+        segment_seconds = None
+        
+        with open(playlist_path, 'r', encoding='utf-8') as f:
+            for line in f.read().splitlines():
+                if line.startswith('#EXTINF:'):
+                    segment_seconds = float(line[len('#EXTINF:'):].split(',')[0])
+                elif line and not line.startswith('#') and segment_seconds:
+                    bits = os.path.getsize(os.path.join(playlist_dir, line)) * 8
+                    peak = max(peak, int(bits / segment_seconds))
+                    total_bits += bits
+                    total_seconds += segment_seconds
+                    segment_seconds = None
+        
+        average = int(total_bits / total_seconds) if total_seconds else 0
+        return peak, average
+    
+    @staticmethod
+    def _burn_and_split(
+        source,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        srt_path: str,
+        profiles: List[EncodeProfile]
+    ) -> list:
+        """Filter graph burning subtitles once, then scaling a copy per profile"""
+        video = source['v:0']
+        if subtitles:
+            video = video.filter('subtitles', srt_path, force_style=SubtitleService.force_style(style))
+        
+        split = video.filter_multi_output('split', len(profiles))
+        branches = []
+        for index, profile in enumerate(profiles):
+            branch = split.stream(index)
+            if profile.height:
+                branch = branch.filter('scale', -2, profile.height)
+            branches.append(branch)
+        
+        return branches
+    
+    @staticmethod
+    def create_proxy(
+        video_path: str,
+        output_path: str,
+        height: int,
+        keyframe_seconds: float
+    ) -> None:
+        """
+        Encode a small, quickly seekable copy of a video for playback in the editor
+        
+        Args:
+            video_path: Source video path
+            output_path: Destination MP4 path
+            height: Maximum output height; smaller sources are not upscaled
+            keyframe_seconds: Keyframe interval, which bounds seek latency
+        """
+        try:
+            (
+                ffmpeg
+                .input(video_path)
+                .output(
+                    output_path,
+                    vf=f"scale=-2:'min({height},ih)'",
+                    force_key_frames=f"expr:gte(t,n_forced*{keyframe_seconds})",
+                    sc_threshold=0,
+                    pix_fmt='yuv420p',
+                    **{'c:v': 'libx264', 'preset': 'veryfast', 'crf': 28,
+                       'c:a': 'aac', 'b:a': '96k'},
+                    **VideoService._container_args(output_path)
+                )
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
         except ffmpeg.Error as e:
-            # Clean up on error
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+    
+    @staticmethod
+    def render_frame(
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        time: float,
+        srt_path: str
+    ) -> bytes:
+        """
+        Render a single JPEG frame with subtitles burned in
+        
+        Seeks on the input side, so only the frames from the nearest
+        preceding keyframe are decoded. The seeked frame is at timestamp 0,
+        so subtitles must be given relative to `time`.
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitles to draw, timed relative to `time`
+            style: Subtitle styling
+            time: Frame position in seconds
+            srt_path: Temporary SRT file path, removed afterwards
+        
+        Returns:
+            The encoded JPEG
+        """
+        output_args = {'vframes': 1, 'format': 'image2', 'vcodec': 'mjpeg', 'q:v': 3}
+        if subtitles:
+            VideoService.create_srt_file(subtitles, srt_path)
+            output_args['vf'] = f"subtitles={srt_path}:force_style='{SubtitleService.force_style(style)}'"
+        
+        try:
+            frame, _ = (
+                ffmpeg
+                .input(video_path, ss=time)
+                .output('pipe:', **output_args)
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
             if os.path.exists(srt_path):
                 os.remove(srt_path)
+        
+        if not frame:
+            raise Exception(f"No frame at {time:.3f}s")
+        return frame
+    
+    @staticmethod
+    def _container_args(output_path: str) -> dict:
+        """Muxer arguments by output type; MP4s get their index up front for fast playback start"""
+        if os.path.splitext(output_path)[1].lower() in ('.mp4', '.m4v', '.mov'):
+            return {'movflags': '+faststart'}
+        return {}
+    
+    @staticmethod
+    def _encoder_args(profile: Optional[EncodeProfile]) -> dict:
+        """FFmpeg output arguments for an encode profile, audio stream-copied"""
+        output_args = {'c:a': 'copy'}
+        
+        if profile:
+            output_args.update({
+                'c:v': profile.video_codec,
+                'preset': profile.preset,
+                'crf': profile.crf,
+                'pix_fmt': 'yuv420p'
+            })
+            if profile.threads:
+                output_args['threads'] = profile.threads
+        
+        return output_args
+    
+    @staticmethod
+    def mux_subtitles(
+        video_path: str,
+        subtitles: List[SubtitleSegment],
+        style: StyleConfig,
+        output_path: str,
+        container: str,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        duration: Optional[float] = None
+    ) -> None:
+        """
+        Add subtitles as a selectable track without re-encoding audio or video
+        
+        MP4 gets a mov_text track (colour and size survive the conversion
+        from ASS), MKV a fully styled ASS track and WebM a WebVTT track
+        with positioning cue settings.
+        
+        Args:
+            video_path: Source video path
+            subtitles: Subtitle segments to mux
+            style: Subtitle styling
+            output_path: Destination video path
+            container: Output container: mp4, mkv or webm
+            on_process: Called with the running FFmpeg process
+            on_progress: Called with each FFmpeg progress report
+            duration: Source duration in seconds, used to compute progress
+        """
+        if container not in SOFT_SUBTITLE_TRACKS:
+            raise Exception(f"Unsupported container for soft subtitles: {container}")
+        
+        if container == "webm":
+            codecs = VideoService._stream_codecs(video_path)
+            unsupported = [codec for codec in codecs if codec not in WEBM_CODECS]
+            if unsupported:
+                raise Exception(
+                    f"WebM export needs VP8/VP9/AV1 video and Opus/Vorbis audio, got {', '.join(unsupported)}"
+                )
+        
+        track_format, subtitle_codec = SOFT_SUBTITLE_TRACKS[container]
+        track_path = f"{os.path.splitext(output_path)[0]}.{track_format}"
+        
+        with open(track_path, 'w', encoding='utf-8') as f:
+            if track_format == "vtt":
+                f.write(SubtitleService.build_webvtt(subtitles, style))
+            else:
+                f.write(SubtitleService.build_ass(subtitles, style))
+        
+        source = ffmpeg.input(video_path)
+        track = ffmpeg.input(track_path)
+        
+        try:
+            stream = (
+                ffmpeg
+                .output(
+                    source['v:0'],
+                    source['a?'],
+                    track['s'],
+                    output_path,
+                    c='copy',
+                    **{'c:s': subtitle_codec, 'disposition:s:0': 'default'},
+                    **VideoService._container_args(output_path)
+                )
+                .overwrite_output()
+            )
+            VideoService.run_ffmpeg(stream, on_process, on_progress, duration)
+        
+        except ffmpeg.Error as e:
             raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        
+        finally:
+            if os.path.exists(track_path):
+                os.remove(track_path)
     
     @staticmethod
-    def _hex_to_ass_color(hex_color: str) -> str:
-        """Convert hex color to ASS format (&HAABBGGRR) with alpha support"""
-        hex_color = hex_color.lstrip('#')
-        
-        # Handle different hex formats
-        if len(hex_color) == 8:  # RRGGBBAA
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16)
-            b = int(hex_color[4:6], 16)
-            a = int(hex_color[6:8], 16)
-            # ASS uses inverted alpha (FF = transparent, 00 = opaque)
-            ass_alpha = 255 - a
-            return f"&H{ass_alpha:02X}{b:02X}{g:02X}{r:02X}"
-        elif len(hex_color) == 6:  # RRGGBB
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16)
-            b = int(hex_color[4:6], 16)
-            return f"&H00{b:02X}{g:02X}{r:02X}"
+    def _stream_types(video_path: str) -> List[str]:
+        """Codec types (video, audio, subtitle...) of a file's streams"""
+        probe = ffmpeg.probe(video_path)
+        return [stream.get('codec_type') for stream in probe['streams']]
+    
+    @staticmethod
+    def _stream_codecs(video_path: str) -> List[str]:
+        """Codec names of a file's audio and video streams"""
+        probe = ffmpeg.probe(video_path)
+        return [
+            stream.get('codec_name', 'unknown')
+            for stream in probe['streams']
+            if stream.get('codec_type') in ('video', 'audio')
+        ]
+    
+    @staticmethod
+    def run_ffmpeg(
+        stream,
+        on_process: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        duration: Optional[float] = None
+    ) -> None:
+        """
+        Run an FFmpeg command, optionally reporting its progress
+        
+        Progress is read from FFmpeg's machine-readable `-progress` output
+        on stdout while stderr is drained on a separate thread.
+        
+        Args:
+            stream: ffmpeg-python output stream to run
+            on_process: Called with the running FFmpeg process
+            on_progress: Called with each parsed progress report
+            duration: Expected output duration in seconds
+            
+        Raises:
+            ffmpeg.Error: If FFmpeg exits with a non-zero status
+        """
+        if on_progress:
+            stream = stream.global_args('-progress', 'pipe:1', '-nostats')
+        
+        process = stream.run_async(pipe_stdout=True, pipe_stderr=True)
+        
+        if on_process:
+            on_process(process)
+        
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()),
+            daemon=True
+        )
+        stderr_reader.start()
+        
+        stdout = b''
+        if on_progress:
+            report = {}
+            for line in process.stdout:
+                key, _, value = line.decode(errors='replace').strip().partition('=')
+                report[key] = value
+                
+                # Each report block ends with a "progress" line
+                if key == 'progress':
+                    on_progress(VideoService._parse_progress(report, duration))
+                    report = {}
         else:
-            # Default to white
-            return f"&H00FFFFFF"
+            stdout = process.stdout.read()
+        
+        process.wait()
+        stderr_reader.join()
+        
+        if process.returncode != 0:
+            raise ffmpeg.Error('ffmpeg', stdout, b''.join(stderr_chunks))
+    
+    @staticmethod
+    def _parse_progress(report: dict, duration: Optional[float]) -> dict:
+        """Convert an FFmpeg progress block into seconds, fps, speed and fraction"""
+        def to_float(value: Optional[str]) -> Optional[float]:
+            try:
+                return float(value.rstrip('x'))
+            except (AttributeError, ValueError):
+                return None
+        
+        out_time_us = to_float(report.get('out_time_us'))
+        out_time = max(out_time_us / 1_000_000, 0.0) if out_time_us is not None else None
+        finished = report.get('progress') == 'end'
+        
+        progress = None
+        if finished:
+            progress = 1.0
+        elif out_time is not None and duration:
+            progress = min(out_time / duration, 1.0)
+        
+        return {
+            "out_time": out_time,
+            "fps": to_float(report.get('fps')),
+            "speed": to_float(report.get('speed')),
+            "progress": progress,
+            "finished": finished
+        }
+    
+    @staticmethod
+    def file_identity(video_path: str) -> dict:
+        """Path, size and modification time identifying a video file's content"""
+        stat = os.stat(video_path)
+        return {
+            "path": os.path.abspath(video_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
     
     @staticmethod
     def get_video_duration(video_path: str) -> float:
         """Get video duration in seconds"""
         try:
             probe = ffmpeg.probe(video_path)
-            duration = float(probe['streams'][0]['duration'])
-            return duration
+            return VideoService._probe_duration(probe)
         except Exception as e:
             raise Exception(f"Failed to get video duration: {str(e)}")
     
+    @staticmethod
+    def probe_media(video_path: str) -> MediaInfo:
+        """
+        Probe a video's properties and keyframe index
+        
+        Args:
+            video_path: Video path
+        
+        Returns:
+            Duration, resolution, frame rate, codecs, codec profile and
+            level, pixel format, aspect ratio, bitrate, size and keyframe
+            timestamps
+        """
+        try:
+            probe = ffmpeg.probe(video_path)
+        except ffmpeg.Error as e:
+            # ffprobe prints its banner first; the reason is on the last line
+            reason = e.stderr.decode().strip().splitlines()[-1] if e.stderr else str(e)
+            raise Exception(f"Failed to probe video: {reason}")
+        
+        video = next((s for s in probe['streams'] if s.get('codec_type') == 'video'), None)
+        audio = next((s for s in probe['streams'] if s.get('codec_type') == 'audio'), None)
+        if video is None:
+            raise Exception("File has no video stream")
+        
+        bit_rate = probe.get('format', {}).get('bit_rate')
+        
+        return MediaInfo(
+            duration=VideoService._probe_duration(probe),
+            width=int(video['width']),
+            height=int(video['height']),
+            fps=VideoService._parse_rate(video.get('avg_frame_rate')),
+            video_codec=video.get('codec_name', 'unknown'),
+            video_profile=video.get('profile'),
+            video_level=video.get('level') if video.get('level', -99) > 0 else None,
+            pix_fmt=video.get('pix_fmt'),
+            sample_aspect_ratio=video.get('sample_aspect_ratio'),
+            audio_codec=audio.get('codec_name', 'unknown') if audio else None,
+            bit_rate=int(bit_rate) if bit_rate else None,
+            size=os.path.getsize(video_path),
+            keyframes=VideoService.get_keyframe_times(video_path)
+        )
+    
+    @staticmethod
+    def _probe_duration(probe: dict) -> float:
+        """Duration from ffprobe output: the container's, else the video stream's"""
+        duration = probe.get('format', {}).get('duration')
+        if duration is None:
+            video = next(s for s in probe['streams'] if s.get('codec_type') == 'video')
+            duration = video['duration']
+        return float(duration)
+    
+    @staticmethod
+    def _parse_rate(rate: Optional[str]) -> Optional[float]:
+        """Parse an ffprobe frame rate such as 30000/1001"""
+        try:
+            numerator, denominator = (rate or '').split('/')
+            return round(int(numerator) / int(denominator), 3) if int(denominator) else None
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def get_keyframe_times(video_path: str) -> List[float]:
+        """Get timestamps (seconds) of the video stream's keyframes"""
+        try:
+            probe = ffmpeg.probe(
+                video_path,
+                select_streams='v:0',
+                show_entries='packet=pts_time,flags'
+            )
+            return sorted(
+                float(packet['pts_time'])
+                for packet in probe.get('packets', [])
+                if 'K' in packet.get('flags', '') and packet.get('pts_time') not in (None, 'N/A')
+            )
+        except Exception as e:
+            raise Exception(f"Failed to read keyframes: {str(e)}")
+    
+    @staticmethod
+    def split_at_keyframes(
+        video_path: str,
+        split_times: List[float],
+        output_pattern: str,
+        segment_format: str = 'mpegts'
+    ) -> None:
+        """
+        Losslessly split a video into segments
+        
+        Args:
+            video_path: Source video path
+            split_times: Keyframe timestamps to cut at
+            output_pattern: printf-style segment path, e.g. "seg_%04d.ts"
+            segment_format: Segment container; MPEG-TS keeps codec parameters
+                in-band so re-encoded and copied segments can be joined
+        """
+        source = ffmpeg.input(video_path)
+        
+        # Cut slightly before each keyframe so float rounding never pushes
+        # the cut to the following keyframe
+        segment_times = ",".join(f"{max(t - 0.001, 0):.3f}" for t in split_times)
+        
+        try:
+            (
+                ffmpeg
+                .output(
+                    source['v:0'],
+                    source['a?'],
+                    output_pattern,
+                    c='copy',
+                    f='segment',
+                    segment_times=segment_times,
+                    segment_format=segment_format,
+                    reset_timestamps=1
+                )
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+    
+    @staticmethod
+    def concat_segments(segment_paths: List[str], output_path: str) -> None:
+        """Losslessly join segments with the concat demuxer"""
+        list_path = os.path.splitext(output_path)[0] + '.txt'
+        
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        try:
+            (
+                ffmpeg
+                .input(list_path, f='concat', safe=0)
+                .output(output_path, c='copy', **VideoService._container_args(output_path))
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+    
     @staticmethod
     def validate_video_file(filename: str) -> bool:
         """Validate video file extension"""
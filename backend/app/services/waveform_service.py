@@ -0,0 +1,252 @@
+import os
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import ffmpeg
+import numpy as np
+from app.models import VideoSession
+from app.config import settings
+from app.repositories import storage_repo
+
+# .peaks files are little-endian:
+#   header  magic, format version, sample rate, level count
+#   levels  per level: samples per peak, peak count, byte offset of its data
+#   data    per level: peak count (min, max) pairs of int8
+PEAKS_MAGIC = b"VPKS"
+PEAKS_VERSION = 1
+PEAKS_HEADER = struct.Struct("<4sHIH")
+PEAKS_LEVEL = struct.Struct("<III")
+
+class WaveformError(Exception):
+    """Raised when a video's waveform peaks could not be computed"""
+    pass
+
+class WaveformService:
+    """Service for the audio waveform peaks shown on the editor timeline"""
+    
+    def __init__(self):
+        self.waveforms_dir = os.path.join(settings.data_dir, "waveforms")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.waveform_workers,
+            thread_name_prefix="waveform"
+        )
+        # Keyed by peaks path, which sessions of the same upload share
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def peaks_path(self, session: VideoSession) -> str:
+        """Path of a session's peaks file, whether or not it exists yet"""
+        return os.path.join(self.waveforms_dir, f"{Path(session.video_path).stem}.peaks")
+    
+    @staticmethod
+    def _failure_path(peaks_path: str) -> str:
+        """Path of the marker recording why computing a peaks file failed"""
+        return os.path.splitext(peaks_path)[0] + ".failed"
+    
+    def schedule(self, session: VideoSession) -> bool:
+        """
+        Start computing a session's peaks in the background
+        
+        Args:
+            session: Video session
+        
+        Returns:
+            True if the peaks are being computed, False if they already
+            exist or computing them failed
+        """
+        path = self.peaks_path(session)
+        if os.path.exists(path) or os.path.exists(self._failure_path(path)):
+            return False
+        
+        has_audio = session.media_info.has_audio if session.media_info else True
+        with self._lock:
+            if path not in self._jobs:
+                self._jobs[path] = self._executor.submit(
+                    self._build, session.video_path, path, has_audio
+                )
+        return True
+    
+    def get_peaks(self, session: VideoSession, retry: bool = False) -> Optional[str]:
+        """
+        Path of a session's peaks file, computing it in the background if needed
+        
+        A failed computation is remembered, so audio FFmpeg cannot decode
+        is not decoded again on every request; it is only run again when
+        a retry is asked for.
+        
+        Args:
+            session: Video session
+            retry: Compute again if an earlier computation failed
+        
+        Returns:
+            Path of the peaks file, or None while it is being computed
+        
+        Raises:
+            WaveformError: If computing failed and no retry was asked for
+        """
+        path = self.peaks_path(session)
+        failure_path = self._failure_path(path)
+        if retry and os.path.exists(failure_path):
+            os.remove(failure_path)
+        
+        if self.schedule(session):
+            return None
+        if os.path.exists(path):
+            return path
+        
+        with open(failure_path, 'r', encoding='utf-8') as f:
+            raise WaveformError(f"Waveform failed: {f.read()}")
+    
+    def discard(self, session: VideoSession) -> None:
+        """Cancel pending peaks and delete computed ones, once the video itself is deleted"""
+        path = self.peaks_path(session)
+        with self._lock:
+            job = self._jobs.pop(path, None)
+        if job is not None:
+            job.cancel()
+        
+        for stale in (path, self._failure_path(path)):
+            if os.path.exists(stale):
+                os.remove(stale)
+    
+    def _build(self, video_path: str, output_path: str, has_audio: bool) -> None:
+        """Compute and write peaks for a background job, or the reason it failed"""
+        try:
+            try:
+                self.write_peaks(video_path, output_path, has_audio)
+                written = output_path
+            except Exception as e:
+                written = self._failure_path(output_path)
+                os.makedirs(os.path.dirname(written), exist_ok=True)
+                with open(written + ".part", 'w', encoding='utf-8') as f:
+                    f.write(str(e) or type(e).__name__)
+                os.replace(written + ".part", written)
+            
+            # The video may have been deleted while computing
+            if not any(s.video_path == video_path for s in storage_repo.get_all_sessions()):
+                os.remove(written)
+        finally:
+            with self._lock:
+                self._jobs.pop(output_path, None)
+    
+    # ========== PEAKS ==========
+    
+    def write_peaks(self, video_path: str, output_path: str, has_audio: bool = True) -> None:
+        """
+        Compute a video's peaks and write them as a .peaks file
+        
+        Args:
+            video_path: Source video path
+            output_path: Destination .peaks path
+            has_audio: Whether the video has audio; a file without levels
+                is written if not
+        """
+        levels = self.compute_levels(video_path) if has_audio else []
+        
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        part_path = output_path + ".part"
+        try:
+            with open(part_path, 'wb') as f:
+                f.write(PEAKS_HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, settings.waveform_sample_rate, len(levels)))
+                
+                offset = PEAKS_HEADER.size + PEAKS_LEVEL.size * len(levels)
+                for samples_per_peak, peaks in levels:
+                    f.write(PEAKS_LEVEL.pack(samples_per_peak, len(peaks), offset))
+                    offset += peaks.nbytes
+                
+                for _, peaks in levels:
+                    f.write(peaks.tobytes())
+            os.replace(part_path, output_path)
+        
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    def compute_levels(self, video_path: str) -> List[tuple]:
+        """
+        Compute min/max peaks of a video's audio at every zoom level
+        
+        The audio is decoded to mono 16-bit PCM and read from FFmpeg in
+        fixed-size chunks, so memory use is bounded by the chunk size plus
+        the peaks themselves. Coarser levels are reduced from the finest.
+        
+        Args:
+            video_path: Source video path
+        
+        Returns:
+            (samples per peak, peaks) per level, finest first; peaks are an
+            (n, 2) int8 array of minimum and maximum
+        """
+        base = settings.waveform_samples_per_peak
+        chunk_samples = max(1, int(settings.waveform_sample_rate * settings.waveform_chunk_seconds) // base) * base
+        
+        process = (
+            ffmpeg
+            .input(video_path)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=settings.waveform_sample_rate, vn=None)
+            .global_args('-v', 'error')
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+        
+        chunks = []
+        carry = np.empty(0, dtype='<i2')
+        try:
+            while True:
+                data = process.stdout.read(chunk_samples * 2)
+                if not data:
+                    break
+                samples = np.frombuffer(data[:len(data) // 2 * 2], dtype='<i2')
+                if carry.size:
+                    samples = np.concatenate((carry, samples))
+                
+                whole = samples.size // base * base
+                if whole:
+                    chunks.append(self._min_max(samples[:whole], base))
+                carry = samples[whole:]
+            
+            # A final partial peak covers the last few samples
+            if carry.size:
+                chunks.append(self._min_max(carry, carry.size))
+            
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise Exception(f"FFmpeg error: {stderr.decode(errors='replace').strip()}")
+        
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        
+        finest = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype='<i2')
+        levels = [(base, finest)]
+        for _ in range(1, settings.waveform_levels):
+            samples_per_peak, peaks = levels[-1]
+            levels.append((
+                samples_per_peak * settings.waveform_level_factor,
+                self._reduce(peaks, settings.waveform_level_factor)
+            ))
+        
+        # int16 to int8 keeps the shape and halves the file
+        return [(samples_per_peak, (peaks >> 8).astype(np.int8)) for samples_per_peak, peaks in levels]
+    
+    @staticmethod
+    def _min_max(samples: np.ndarray, samples_per_peak: int) -> np.ndarray:
+        """Minimum and maximum of each block of samples"""
+        blocks = samples.reshape(-1, samples_per_peak)
+        return np.stack((blocks.min(axis=1), blocks.max(axis=1)), axis=1)
+    
+    @staticmethod
+    def _reduce(peaks: np.ndarray, factor: int) -> np.ndarray:
+        """Merge every `factor` peaks into one, including a partial last group"""
+        if not len(peaks):
+            return peaks
+        starts = np.arange(0, len(peaks), factor)
+        return np.stack((
+            np.minimum.reduceat(peaks[:, 0], starts),
+            np.maximum.reduceat(peaks[:, 1], starts)
+        ), axis=1)
+
+# Singleton instance
+waveform_service = WaveformService()
\ No newline at end of file
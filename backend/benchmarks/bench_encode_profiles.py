@@ -0,0 +1,66 @@
+"""
+Benchmark the configured encode profiles against each other
+
+Generates a synthetic video with FFmpeg's lavfi sources and burns the same
+subtitles in with every profile in Settings.encode_profiles. Run from the
+backend directory:
+
+    python -m benchmarks.bench_encode_profiles --duration 120 --size 1920x1080
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.config import settings
+from app.models import StyleConfig
+from app.services import VideoService
+from benchmarks.bench_parallel_export import make_source, make_subtitles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=int, default=60, help="Video length in seconds")
+    parser.add_argument("--size", default="1920x1080", help="Video resolution")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--gop", type=int, default=60, help="Keyframe interval in frames")
+    parser.add_argument("--profiles", nargs="*", default=list(settings.encode_profiles),
+                        help="Profiles to compare")
+    args = parser.parse_args()
+    
+    style = StyleConfig()
+    subtitles = make_subtitles(args.duration, 1.0)
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.mp4")
+        print(f"Generating {args.duration}s {args.size}@{args.fps} source...")
+        make_source(source, args.duration, args.size, args.fps, args.gop)
+        
+        print(f"{'profile':<12} {'time':>9} {'speed':>9} {'size':>10} {'vs ' + settings.default_encode_profile:>12}")
+        results = {}
+        
+        for name in args.profiles:
+            output = os.path.join(work_dir, f"{name}.mp4")
+            started = time.perf_counter()
+            VideoService.overlay_subtitles(
+                video_path=source,
+                subtitles=subtitles,
+                style=style,
+                output_path=output,
+                profile=settings.encode_profiles[name]
+            )
+            elapsed = time.perf_counter() - started
+            results[name] = elapsed
+            
+            baseline = results.get(settings.default_encode_profile)
+            relative = f"{elapsed / baseline:11.2f}x" if baseline else f"{'-':>12}"
+            print(
+                f"{name:<12} {elapsed:8.2f}s {args.duration / elapsed:8.2f}x "
+                f"{os.path.getsize(output) / 1024 ** 2:8.1f}MB {relative}"
+            )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
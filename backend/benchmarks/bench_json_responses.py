@@ -0,0 +1,145 @@
+"""
+Benchmark JSON rendering and compression of subtitle-heavy responses
+
+Renders a chat history response for tracks of 1k to 10k segments the way
+FastAPI does by default (jsonable_encoder and json.dumps) and with the
+app's orjson response class, then compresses it as the middleware would.
+Run from the backend directory:
+    
+    python -m benchmarks.bench_json_responses --sizes 1000 5000 10000 --edits 5
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+from app.config import settings
+from app.middleware import CompressionMiddleware
+from app.models import Edit, StyleConfig, SubtitleSegment
+from app.responses import JSONResponse
+
+
+# Words transcript lines are drawn from
+VOCABULARY = (
+    "the a we you they it this that and but so because when then here there "
+    "video editor subtitle timeline scene camera light sound voice music cut "
+    "frame moment story idea people city morning night really just maybe "
+    "going looking thinking making saying want need know see think feel "
+    "about around into over after before again still never always quite"
+).split()
+
+
+def make_line(rng: random.Random) -> str:
+    """A spoken line of 4 to 14 words"""
+    words = rng.choices(VOCABULARY, k=rng.randint(4, 14))
+    return " ".join(words).capitalize() + rng.choice([".", ".", ",", "?", "!"])
+
+
+def make_history(segments: int, edits: int, seed: int = 0) -> dict:
+    """
+    A chat history response with `edits` edits of `segments` cues each
+    
+    The first edit is a transcript with varied lines and timings; each
+    later one changes it the way chat edits do, retiming every cue,
+    rewording about a fifth of the lines and restyling, so that
+    compression sees the redundancy of a real history and no more.
+    """
+    rng = random.Random(seed)
+    
+    subtitles = []
+    time_point = 0.0
+    for _ in range(segments):
+        time_point += rng.uniform(0.0, 0.8)
+        duration = rng.uniform(1.0, 4.5)
+        subtitles.append(SubtitleSegment(start=round(time_point, 3), end=round(time_point + duration, 3), text=make_line(rng)))
+        time_point += duration
+    
+    history = []
+    for index in range(edits):
+        if index:
+            offset = rng.uniform(-0.5, 0.5)
+            scale = rng.uniform(0.98, 1.02)
+            subtitles = [
+                SubtitleSegment(
+                    start=round(max(0.0, sub.start * scale + offset), 3),
+                    end=round(max(0.0, sub.start * scale + offset) + (sub.end - sub.start) * scale, 3),
+                    text=make_line(rng) if rng.random() < 0.2 else sub.text
+                )
+                for sub in subtitles
+            ]
+        history.append(Edit(
+            id=index + 1,
+            session_id=1,
+            user_message=make_line(rng),
+            subtitle_data=subtitles,
+            style_config=StyleConfig(
+                font_size=rng.randint(18, 48),
+                font_color=f"#{rng.randrange(0x1000000):06X}",
+                position=rng.choice(["top", "center", "bottom"])
+            ),
+            created_at=f"2025-11-07T{10 + index // 60:02d}:{index % 60:02d}:00"
+        ))
+    return {
+        "session_id": 1,
+        "total_edits": len(history),
+        "edits": [
+            {
+                "id": edit.id,
+                "user_message": edit.user_message,
+                "subtitle_data": edit.subtitle_data,
+                "style_config": edit.style_config,
+                "created_at": edit.created_at
+            }
+            for edit in history
+        ]
+    }
+
+
+def timed(fn, repeat: int):
+    """Best time of `repeat` calls and the last result"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 5000, 10000], help="Segments per track")
+    parser.add_argument("--edits", type=int, default=5, help="Edits in the history")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    compression = CompressionMiddleware(
+        app=None,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+    
+    print(f"{'segments':>8} {'default':>9} {'orjson':>9} {'speedup':>8} {'json':>9} {'gzip':>9} {'br':>9} {'br time':>8}")
+    for size in args.sizes:
+        content = make_history(size, args.edits)
+        
+        default_time, _ = timed(
+            lambda: StarletteJSONResponse(jsonable_encoder(content)).body, args.repeat
+        )
+        orjson_time, body = timed(lambda: JSONResponse(content).body, args.repeat)
+        _, gzipped = timed(lambda: compression.compress("gzip", body), 1)
+        br_time, brotlied = timed(lambda: compression.compress("br", body), args.repeat)
+        
+        print(
+            f"{size:>8} {default_time * 1000:7.1f}ms {orjson_time * 1000:7.1f}ms "
+            f"{default_time / orjson_time:7.1f}x {len(body) / 1024:7.0f}KB "
+            f"{len(gzipped) / 1024:7.0f}KB {len(brotlied) / 1024:7.0f}KB {br_time * 1000:6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Benchmark concurrent seeks into a large file: MediaFiles vs StaticFiles
+
+Serves the same file with both apps from a local uvicorn server and has
+several clients seek to random offsets, as video players do. StaticFiles
+ignores Range, so a client seeking with it has to read everything up to
+the offset. Run from the backend directory:
+
+    python -m benchmarks.bench_media_serving --size-mb 1024 --clients 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.media import MediaFiles
+
+
+def make_file(path: str, size_mb: int) -> None:
+    """Write `size_mb` MiB of random bytes"""
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def free_port() -> int:
+    """An unused local TCP port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(directory: str, port: int) -> uvicorn.Server:
+    """Serve `directory` at /media and /static in a background thread"""
+    app = Starlette(routes=[
+        Mount("/media", MediaFiles(directory=directory)),
+        Mount("/static", StaticFiles(directory=directory))
+    ])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def seek(client: httpx.AsyncClient, url: str, offset: int, length: int, ranged: bool) -> float:
+    """Fetch `length` bytes at `offset`; returns seconds until they arrived"""
+    started = time.perf_counter()
+    headers = {"Range": f"bytes={offset}-{offset + length - 1}"} if ranged else {}
+    needed = length if ranged else offset + length
+    
+    async with client.stream("GET", url, headers=headers) as response:
+        received = 0
+        async for chunk in response.aiter_raw():
+            received += len(chunk)
+            if received >= needed:
+                break
+    return time.perf_counter() - started
+
+
+async def run_clients(url: str, size: int, args, ranged: bool) -> list:
+    """Latencies of every seek by every client"""
+    rng = random.Random(42)
+    offsets = [
+        [rng.randrange(0, size - args.range_kb * 1024) for _ in range(args.seeks)]
+        for _ in range(args.clients)
+    ]
+    
+    async def client_seeks(client_offsets):
+        async with httpx.AsyncClient(timeout=None) as client:
+            return [await seek(client, url, offset, args.range_kb * 1024, ranged) for offset in client_offsets]
+    
+    results = await asyncio.gather(*(client_seeks(o) for o in offsets))
+    return [latency for client_latencies in results for latency in client_latencies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256, help="File size in MiB")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--seeks", type=int, default=5, help="Seeks per client")
+    parser.add_argument("--range-kb", type=int, default=512, help="Bytes fetched per seek, in KiB")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"Writing {args.size_mb}MiB file...")
+        make_file(os.path.join(work_dir, "video.mp4"), args.size_mb)
+        size = args.size_mb * 1024 * 1024
+        
+        port = free_port()
+        server = start_server(work_dir, port)
+        
+        print(f"{args.clients} clients x {args.seeks} seeks of {args.range_kb}KiB")
+        print(f"{'app':<12} {'wall':>8} {'p50':>9} {'p95':>9} {'seeks/s':>9}")
+        for name, ranged in (("MediaFiles", True), ("StaticFiles", False)):
+            url = f"http://127.0.0.1:{port}/{'media' if ranged else 'static'}/video.mp4"
+            started = time.perf_counter()
+            latencies = asyncio.run(run_clients(url, size, args, ranged))
+            wall = time.perf_counter() - started
+            
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(
+                f"{name:<12} {wall:7.2f}s {statistics.median(latencies) * 1000:7.1f}ms "
+                f"{p95 * 1000:7.1f}ms {len(latencies) / wall:9.1f}"
+            )
+        
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Benchmark single-process vs segment-parallel subtitle burn-in
+
+Generates a synthetic video with FFmpeg's lavfi sources and exports it
+both ways. Run from the backend directory:
+
+    python -m benchmarks.bench_parallel_export --duration 300 --size 1920x1080
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import ffmpeg
+
+from app.models import SubtitleSegment, StyleConfig
+from app.services import VideoService, SegmentedExportService
+
+
+def make_source(path: str, duration: int, size: str, fps: int, gop: int) -> None:
+    """Render a test pattern with a sine tone"""
+    video = ffmpeg.input(f"testsrc2=size={size}:rate={fps}", f="lavfi", t=duration)
+    audio = ffmpeg.input("sine=frequency=440:sample_rate=48000", f="lavfi", t=duration)
+    (
+        ffmpeg
+        .output(video, audio, path, vcodec="libx264", preset="veryfast", g=gop, acodec="aac")
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+
+def make_subtitles(duration: int, coverage: float) -> list:
+    """One 3 second cue every 10 seconds over the first `coverage` of the video"""
+    return [
+        SubtitleSegment(start=t, end=t + 3, text=f"Subtitle at {t} seconds")
+        for t in range(0, int(duration * coverage), 10)
+    ]
+
+
+def timed(label: str, fn) -> float:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=int, default=120, help="Video length in seconds")
+    parser.add_argument("--size", default="1920x1080", help="Video resolution")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--gop", type=int, default=60, help="Keyframe interval in frames")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--coverage", type=float, default=1.0,
+                        help="Fraction of the video that has subtitles")
+    args = parser.parse_args()
+    
+    style = StyleConfig()
+    subtitles = make_subtitles(args.duration, args.coverage)
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.mp4")
+        print(f"Generating {args.duration}s {args.size}@{args.fps} source...")
+        make_source(source, args.duration, args.size, args.fps, args.gop)
+        
+        single = timed("single process", lambda: VideoService.overlay_subtitles(
+            video_path=source,
+            subtitles=subtitles,
+            style=style,
+            output_path=os.path.join(work_dir, "single.mp4")
+        ))
+        
+        parallel = timed(f"segment-parallel ({args.workers})", lambda: SegmentedExportService().export(
+            video_path=source,
+            subtitles=subtitles,
+            style=style,
+            output_path=os.path.join(work_dir, "parallel.mp4"),
+            duration=float(args.duration),
+            workers=args.workers
+        ))
+        
+        print(f"{'speedup':<28} {single / parallel:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark scene cut detection and snapping
+
+Generates a clip of test patterns that cut every few seconds, times the
+frame-difference detection pass and checks it finds the cuts, then times
+snapping tracks of 1k to 1M cues against a loop over each cue. Run from
+the backend directory:
+    
+    python -m benchmarks.bench_scene_cuts --seconds 60 --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import numpy as np
+
+from app.models import SubtitleTrack
+from app.services import SceneService, TimingService
+
+SOURCES = ["testsrc", "smptebars", "rgbtestsrc", "mandelbrot", "testsrc2"]
+
+
+def make_clip(path: str, seconds: float, shot_seconds: float, fps: int) -> np.ndarray:
+    """Write a clip cycling through test sources; returns the true cut times"""
+    shots = max(2, int(seconds / shot_seconds))
+    args = ["ffmpeg", "-v", "error", "-y"]
+    for i in range(shots):
+        source = SOURCES[i % len(SOURCES)]
+        args += ["-f", "lavfi", "-t", str(shot_seconds), "-i", f"{source}=size=640x360:rate={fps}"]
+    inputs = "".join(f"[{i}]" for i in range(shots))
+    args += ["-filter_complex", f"{inputs}concat=n={shots}:v=1:a=0,format=yuv420p", "-preset", "ultrafast", path]
+    subprocess.run(args, check=True)
+    return np.arange(1, shots) * shot_seconds
+
+
+def make_track(cues: int) -> SubtitleTrack:
+    """Back-to-back cues of 2 to 4 seconds with short pauses"""
+    rng = random.Random(42)
+    starts, ends = [], []
+    position = 0.0
+    for _ in range(cues):
+        position += rng.uniform(0.0, 0.5)
+        starts.append(position)
+        position += rng.uniform(2.0, 4.0)
+        ends.append(position)
+    return SubtitleTrack(starts, ends, [f"Line {i}" for i in range(cues)])
+
+
+def snap_loop(starts: list, ends: list, cuts: list, tolerance: float) -> tuple:
+    """Snap every boundary by checking each cut, as a hand-written pass would"""
+    def nearest(time):
+        best = min(cuts, key=lambda cut: abs(cut - time))
+        return best if abs(best - time) <= tolerance else time
+    return [nearest(t) for t in starts], [nearest(t) for t in ends]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the generated clip")
+    parser.add_argument("--shot-seconds", type=float, default=4.0)
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 100000, 1000000], help="Cues per track")
+    parser.add_argument("--loop-limit", type=int, default=10000, help="Largest track to snap with the loop")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "clip.mp4")
+        expected = make_clip(clip, args.seconds, args.shot_seconds, args.fps)
+        
+        started = time.perf_counter()
+        cuts = SceneService().detect_cuts(clip, args.fps)
+        elapsed = time.perf_counter() - started
+    
+    found = sum(np.any(np.abs(cuts - cut) <= 1.5 / args.fps) for cut in expected)
+    print(
+        f"detect: {args.seconds:.0f}s clip in {elapsed:.2f}s ({args.seconds * args.fps / elapsed:.0f} frames/s), "
+        f"{found}/{len(expected)} cuts found, {len(cuts) - found} extra"
+    )
+    
+    print(f"\n{'cues':>8} {'cuts':>7} {'loop':>10} {'vectorized':>11}")
+    for size in args.sizes:
+        track = make_track(size)
+        duration = float(track.ends[-1])
+        scene_cuts = np.arange(args.shot_seconds, duration, args.shot_seconds)
+        
+        if size <= args.loop_limit:
+            started = time.perf_counter()
+            snap_loop(track.starts.tolist(), track.ends.tolist(), scene_cuts.tolist(), 0.25)
+            loop = f"{(time.perf_counter() - started) * 1000:8.0f}ms"
+        else:
+            loop = f"{'-':>10}"
+        
+        started = time.perf_counter()
+        TimingService.snap(track, scene_cuts, 0.25)
+        vectorized = time.perf_counter() - started
+        
+        print(f"{size:>8} {len(scene_cuts):>7} {loop} {vectorized * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Benchmark subtitle time queries: interval index vs scanning the list
+
+For tracks of 1k to 1M cues, times building the index and answering
+point and two-minute range queries at random times, against a scan over
+the SubtitleSegment list as callers did before. Run from the backend
+directory:
+
+    python -m benchmarks.bench_subtitle_index --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.models import SubtitleTrack
+from app.services import SubtitleIndex
+
+
+def make_track(cues: int) -> SubtitleTrack:
+    """Back-to-back cues of 2 to 4 seconds with short pauses"""
+    rng = random.Random(42)
+    starts, ends = [], []
+    position = 0.0
+    for _ in range(cues):
+        position += rng.uniform(0.0, 0.5)
+        starts.append(position)
+        position += rng.uniform(2.0, 4.0)
+        ends.append(position)
+    return SubtitleTrack(starts, ends, [f"Line {i}" for i in range(cues)])
+
+
+def per_query(fn, points: list) -> float:
+    """Mean seconds per call of `fn` over `points`"""
+    started = time.perf_counter()
+    for point in points:
+        fn(point)
+    return (time.perf_counter() - started) / len(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 100000, 1000000], help="Cues per track")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    
+    print(f"{'cues':>8} {'build':>9} {'at scan':>10} {'at index':>10} {'range scan':>11} {'range index':>12}")
+    for size in args.sizes:
+        track = make_track(size)
+        segments = track.to_segments()
+        duration = float(track.ends[-1])
+        rng = random.Random(7)
+        points = [rng.uniform(0, duration) for _ in range(args.queries)]
+        
+        started = time.perf_counter()
+        index = SubtitleIndex(track)
+        build = time.perf_counter() - started
+        
+        at_scan = per_query(lambda t: [sub for sub in segments if sub.start <= t < sub.end], points)
+        at_index = per_query(index.at, points)
+        range_scan = per_query(lambda t: [sub for sub in segments if sub.start < t + 120 and sub.end > t], points)
+        range_index = per_query(lambda t: index.between(t, t + 120), points)
+        
+        print(
+            f"{size:>8} {build * 1000:7.1f}ms {at_scan * 1e6:8.0f}us {at_index * 1e6:8.1f}us "
+            f"{range_scan * 1e6:9.0f}us {range_index * 1e6:10.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
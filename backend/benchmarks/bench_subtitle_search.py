@@ -0,0 +1,99 @@
+"""
+Benchmark cross-session subtitle search: FTS index vs scanning edits
+
+Builds an index over the latest subtitles of thousands of sessions, then
+times word and phrase queries against loading edits.json and scanning
+each session's latest edit, which is all there was before. Run from the
+backend directory:
+    
+    python -m benchmarks.bench_subtitle_search --sessions 1000 20000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.repositories import SearchRepository
+
+WORDS = (
+    "the a to and of you it is that in we this what for on are with be have not but so just "
+    "know like can do was all your they get there go right here about one now think out really "
+    "video camera light music street morning coffee weekend travel mountain river kitchen garden"
+).split()
+
+QUERIES = ["coffee", "mountain river", '"the weekend"', "camera light music", "zebra"]
+
+
+def make_sessions(sessions: int, cues: int) -> dict:
+    """Latest edit record of each session, with random sentences"""
+    rng = random.Random(42)
+    latest = {}
+    for session_id in range(1, sessions + 1):
+        subtitles = [
+            {"start": i * 3.0, "end": i * 3.0 + 2.5, "text": " ".join(rng.choices(WORDS, k=rng.randint(4, 10)))}
+            for i in range(cues)
+        ]
+        latest[session_id] = {"id": session_id, "session_id": session_id, "subtitle_data": subtitles}
+    return latest
+
+
+def scan(edits_file: str, query: str, limit: int) -> list:
+    """Load every edit and keep the latest per session, then scan their text"""
+    with open(edits_file) as f:
+        edits = json.load(f)
+    latest = {}
+    for edit in edits:
+        latest[edit["session_id"]] = edit
+    words = query.replace('"', "").lower().split()
+    hits = []
+    for edit in latest.values():
+        for sub in edit["subtitle_data"]:
+            tokens = sub["text"].lower().split()
+            if all(word in tokens for word in words):
+                hits.append(sub)
+    return hits[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1000, 20000], help="Sessions to index")
+    parser.add_argument("--cues", type=int, default=40, help="Subtitles per session")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    
+    print(f"{'sessions':>8} {'segments':>9} {'build':>8} {'query':>24} {'hits':>5} {'scan':>9} {'index':>9}")
+    for size in args.sessions:
+        latest = make_sessions(size, args.cues)
+        with tempfile.TemporaryDirectory() as tmp:
+            edits_file = os.path.join(tmp, "edits.json")
+            with open(edits_file, "w") as f:
+                json.dump(list(latest.values()), f)
+            
+            repo = SearchRepository(os.path.join(tmp, "search.db"))
+            started = time.perf_counter()
+            repo.sync(latest)
+            build = time.perf_counter() - started
+            
+            for query in QUERIES:
+                started = time.perf_counter()
+                scan(edits_file, query, args.limit)
+                scanned = time.perf_counter() - started
+                
+                started = time.perf_counter()
+                for _ in range(10):
+                    hits = repo.search(query, args.limit)
+                searched = (time.perf_counter() - started) / 10
+                
+                print(
+                    f"{size:>8} {size * args.cues:>9} {build:7.1f}s {query:>24} {len(hits):>5} "
+                    f"{scanned * 1000:7.0f}ms {searched * 1000:7.2f}ms"
+                )
+            repo._connection.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
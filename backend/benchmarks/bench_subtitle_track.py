@@ -0,0 +1,109 @@
+"""
+Benchmark columnar subtitle tracks against lists of SubtitleSegment
+
+For tracks of 1k to 100k cues, compares finding the cues showing at a
+time in a stored edit (the preview endpoint's lookup), validating and
+clamping a track and the memory held per track, with a pydantic model
+per cue and with SubtitleTrack. Validation and clamping start from what
+the services hold, stored records and SubtitleSegment lists, and end in
+the same form, so the track timings include converting to and from it.
+Run from the backend directory:
+    
+    python -m benchmarks.bench_subtitle_track --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.models import Edit, StyleConfig, SubtitleSegment, SubtitleTrack
+from app.services import MediaService
+
+
+def make_record(segments: int) -> dict:
+    """A stored edit record with `segments` cues"""
+    return {
+        "id": 1,
+        "session_id": 1,
+        "user_message": "Transcribe the audio",
+        "subtitle_data": [
+            {"start": i * 2.5, "end": i * 2.5 + 2.0, "text": f"Line {i} of a long transcript, spoken here"}
+            for i in range(segments)
+        ],
+        "style_config": StyleConfig().model_dump(),
+        "created_at": "2025-11-07T10:30:00"
+    }
+
+
+def timed(fn, repeat: int):
+    """Best time of `repeat` calls and the last result"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def allocated(fn) -> int:
+    """Bytes still allocated by the result of `fn`"""
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000], help="Cues per track")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    print(
+        f"{'cues':>7} {'lookup models':>14} {'lookup track':>13} {'check models':>13} {'check track':>12} "
+        f"{'clamp models':>13} {'clamp track':>12} {'models mem':>11} {'track mem':>10}"
+    )
+    for size in args.sizes:
+        record = make_record(size)
+        time_point = size * 2.5 / 2
+        duration = size * 2.5 * 0.9
+        
+        model_lookup, _ = timed(
+            lambda: [sub for sub in Edit(**record).subtitle_data if sub.start <= time_point < sub.end],
+            args.repeat
+        )
+        track_lookup, _ = timed(
+            lambda: SubtitleTrack.from_records(record["subtitle_data"]).at(time_point).to_segments(),
+            args.repeat
+        )
+        
+        segments = Edit(**record).subtitle_data
+        model_check, _ = timed(lambda: [SubtitleSegment(**r) for r in record["subtitle_data"]], args.repeat)
+        track_check, _ = timed(
+            lambda: SubtitleTrack.from_records(record["subtitle_data"]).validate().to_segments(),
+            args.repeat
+        )
+        
+        model_clamp, _ = timed(lambda: MediaService.clamp_subtitles(segments, duration), args.repeat)
+        track_clamp, _ = timed(
+            lambda: SubtitleTrack.from_segments(segments).clamp(duration).to_segments(),
+            args.repeat
+        )
+        
+        # Texts are shared with the record, so only the per-cue overhead counts
+        model_memory = allocated(lambda: [SubtitleSegment(**r) for r in record["subtitle_data"]])
+        track_memory = allocated(lambda: SubtitleTrack.from_records(record["subtitle_data"]))
+        
+        print(
+            f"{size:>7} {model_lookup * 1000:12.1f}ms {track_lookup * 1000:11.1f}ms "
+            f"{model_check * 1000:11.1f}ms {track_check * 1000:10.1f}ms "
+            f"{model_clamp * 1000:11.2f}ms {track_clamp * 1000:10.2f}ms "
+            f"{model_memory / 1024:9.0f}KB {track_memory / 1024:8.0f}KB"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
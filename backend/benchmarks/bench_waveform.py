@@ -0,0 +1,57 @@
+"""
+Benchmark waveform peaks computation
+
+Generates a synthetic audio track with FFmpeg's lavfi sources and computes
+its peaks at every configured zoom level. Run from the backend directory:
+
+    python -m benchmarks.bench_waveform --duration 3600
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import ffmpeg
+
+from app.services import WaveformService
+
+
+def make_audio(path: str, duration: int) -> None:
+    """Render pink noise with a slow volume swell, encoded as AAC"""
+    (
+        ffmpeg
+        .input(f"anoisesrc=color=pink:sample_rate=48000:duration={duration}", f="lavfi")
+        .filter("volume", "0.5+0.4*sin(t/5)", eval="frame")
+        .output(path, acodec="aac", ac=2)
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=int, default=600, help="Audio length in seconds")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.m4a")
+        print(f"Generating {args.duration}s source...")
+        make_audio(source, args.duration)
+        
+        output = os.path.join(work_dir, "source.peaks")
+        started = time.perf_counter()
+        WaveformService().write_peaks(source, output)
+        elapsed = time.perf_counter() - started
+        
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(
+            f"peaks: {elapsed:.2f}s ({args.duration / elapsed:.0f}x realtime), "
+            f"{os.path.getsize(output) / 1024:.0f}KB, peak RSS {peak_rss:.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
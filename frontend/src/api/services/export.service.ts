@@ -1,11 +1,19 @@
 import { apiClient } from "../client";
 import { API_CONFIG } from "../../config/api.config";
-import type { ExportVideoResponse } from "../../types";
+import type { ExportJob } from "../../types";
 
 export const exportService = {
-  exportVideo: async (sessionId: number): Promise<ExportVideoResponse> => {
-    return apiClient.post<ExportVideoResponse>(
+  exportVideo: async (sessionId: number): Promise<ExportJob> => {
+    return apiClient.post<ExportJob>(
       API_CONFIG.ENDPOINTS.EXPORT.EXPORT(sessionId)
     );
   },
+
+  getJob: async (jobId: string): Promise<ExportJob> => {
+    return apiClient.get<ExportJob>(API_CONFIG.ENDPOINTS.EXPORT.JOB(jobId));
+  },
+
+  cancelJob: async (jobId: string): Promise<ExportJob> => {
+    return apiClient.delete<ExportJob>(API_CONFIG.ENDPOINTS.EXPORT.JOB(jobId));
+  },
 };
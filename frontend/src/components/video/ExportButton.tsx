@@ -4,6 +4,22 @@ import { exportService } from '../../api/services';
 import { useAppDispatch } from '../../store/hooks';
 import { showNotification } from '../../store/slices/uiSlice';
 import { API_CONFIG } from '../../config/api.config';
+import type { ExportJob } from '../../types';
+
+const POLL_INTERVAL_MS = 1000;
+
+const waitForExport = async (
+  job: ExportJob,
+  onProgress: (progress: number) => void
+): Promise<ExportJob> => {
+  let current = job;
+  while (current.status === 'queued' || current.status === 'running') {
+    onProgress(current.progress);
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    current = await exportService.getJob(current.id);
+  }
+  return current;
+};
 
 interface ExportButtonProps {
   sessionId: number;
@@ -13,11 +29,18 @@ interface ExportButtonProps {
 const ExportButton = ({ sessionId, disabled = false }: ExportButtonProps) => {
   const dispatch = useAppDispatch();
   const [exporting, setExporting] = useState(false);
+  const [progress, setProgress] = useState(0);
 
   const handleExport = async () => {
     setExporting(true);
+    setProgress(0);
     try {
-      const result = await exportService.exportVideo(sessionId);
+      const queued = await exportService.exportVideo(sessionId);
+      const result = await waitForExport(queued, setProgress);
+
+      if (result.status !== 'done' || !result.download_url) {
+        throw new Error(result.error || `Export ${result.status}`);
+      }
       
       dispatch(
         showNotification({
@@ -62,7 +85,7 @@ const ExportButton = ({ sessionId, disabled = false }: ExportButtonProps) => {
       className="px-4 py-2 bg-blue-600 hover:bg-blue-700 disabled:bg-blue-300 text-white rounded-lg transition-colors flex items-center gap-2 text-sm font-medium"
     >
       <Download size={16} />
-      {exporting ? 'Exporting...' : 'Export Video'}
+      {exporting ? `Exporting... ${Math.round(progress * 100)}%` : 'Export Video'}
     </button>
   );
 };
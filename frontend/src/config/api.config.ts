@@ -15,6 +15,7 @@ export const API_CONFIG = {
     EXPORT: {
       EXPORT: (sessionId: number) => `/api/export/${sessionId}/export`,
       STATUS: (sessionId: number) => `/api/export/${sessionId}/status`,
+      JOB: (jobId: string) => `/api/export/jobs/${jobId}`,
     },
   },
   TIMEOUT: 120000, // Increased for audio transcription
@@ -78,7 +78,7 @@ const EditorPage = () => {
           {/* Video Player - 1 column */}
           <div className="flex flex-col min-h-0">
             <VideoPlayer
-              videoUrl={currentSession.video_url}
+              videoUrl={currentSession.proxy_url ?? currentSession.video_url}
               subtitles={currentSubtitles}
               style={currentStyle}
             />
@@ -19,6 +19,7 @@ export interface VideoSession {
   id: number;
   video_filename: string;
   video_url: string;
+  proxy_url?: string | null;
   created_at: string;
 }
 
@@ -53,8 +54,19 @@ export interface ChatMessageResponse {
   style: StyleConfig;
 }
 
-export interface ExportVideoResponse {
-  message: string;
-  download_url: string;
+export type ExportStatus = "queued" | "running" | "done" | "failed" | "cancelled";
+
+export interface ExportJob {
+  id: string;
+  session_id: number;
+  edit_id: number;
+  status: ExportStatus;
+  progress: number;
+  download_url: string | null;
+  error: string | null;
+  superseded_by: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 }
 